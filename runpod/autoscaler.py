@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+RunPod Autoscaler - Sizes the transcription worker fleet to the SQS backlog
+"""
+
+import sys
+import json
+import math
+import time
+import uuid
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from pod_pool import (WarmPool, PodRegistry, DEFAULT_WARM_PODS, DEFAULT_SYNC_INTERVAL,
+                      DEFAULT_REGISTRY_FILE, STATUS_RUNNING, STATUS_EXITED, STATUS_TERMINATED)
+
+logger = logging.getLogger("runpod-autoscaler")
+
+DEFAULT_POD_NAME_PREFIX = "transcriber-worker"
+DEFAULT_INTERVAL = 60  # seconds between reconciliations
+DEFAULT_DRAIN_SECONDS = 1800  # the fleet is sized to clear the backlog in this time
+DEFAULT_THROUGHPUT = 10.0  # audio seconds per second per pod, until heartbeats measure it
+DEFAULT_MESSAGE_SECONDS = 600  # audio seconds per message, until heartbeats measure it
+DEFAULT_MAX_PODS = 10
+DEFAULT_MAX_STEP = 4  # pods created per reconciliation at most
+DEFAULT_SCALE_UP_COOLDOWN = 180  # new pods take minutes to boot and show up in heartbeats
+DEFAULT_SCALE_DOWN_DELAY = 600  # the target must stay below the fleet this long
+DEFAULT_BOOT_TIMEOUT = 1200  # a pod without a heartbeat after this long is replaced
+DEFAULT_STOPPED_TTL = 3600  # stopped pods are terminated after this long
+
+# Heartbeats with less busy time than this do not measure throughput yet
+MIN_BUSY_SECONDS = 300
+# Heartbeats older than this are ignored for throughput
+HEARTBEAT_HISTORY_SECONDS = 86400
+
+def heartbeat_time(heartbeat: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds of a worker heartbeat's last_heartbeat, or None"""
+    try:
+        return datetime.fromisoformat(heartbeat["last_heartbeat"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def measure_fleet(heartbeats: List[Dict[str, Any]], now: float) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Per-pod throughput and audio per message from worker heartbeats
+
+    Throughput is audio seconds processed per second a worker had a job in
+    flight, so idle time does not dilute it; the median over workers keeps
+    one odd pod (a slow GPU, a cold cache) from skewing the fleet estimate.
+
+    Returns:
+        (throughput, message_seconds), None where there is no data yet
+    """
+    rates = []
+    audio_seconds = 0.0
+    jobs = 0
+    for heartbeat in heartbeats:
+        updated = heartbeat_time(heartbeat)
+        if updated is None or now - updated > HEARTBEAT_HISTORY_SECONDS:
+            continue
+        # Workers that do not report audio would count jobs without their audio
+        if heartbeat.get("audio_seconds_processed") is None:
+            continue
+        audio = heartbeat.get("audio_seconds_processed") or 0
+        busy = heartbeat.get("busy_seconds") or 0
+        if busy >= MIN_BUSY_SECONDS and audio > 0:
+            rates.append(audio / busy)
+        audio_seconds += audio
+        jobs += heartbeat.get("jobs_processed") or 0
+
+    throughput = None
+    if rates:
+        rates.sort()
+        middle = len(rates) // 2
+        throughput = rates[middle] if len(rates) % 2 else (rates[middle - 1] + rates[middle]) / 2
+    message_seconds = audio_seconds / jobs if jobs and audio_seconds else None
+    return throughput, message_seconds
+
+class ScalingPolicy:
+    """Target pod count from the backlog, the fleet's throughput and the limits"""
+
+    def __init__(self,
+                 min_pods: int = 0,
+                 max_pods: int = DEFAULT_MAX_PODS,
+                 drain_seconds: float = DEFAULT_DRAIN_SECONDS,
+                 max_hourly_cost: Optional[float] = None):
+        """
+        Args:
+            min_pods: Pods kept running with an empty queue
+            max_pods: Upper bound on running pods
+            drain_seconds: Time in which the fleet should clear the backlog
+            max_hourly_cost: Budget in dollars per hour for running pods (None for no limit)
+        """
+        self.min_pods = min_pods
+        self.max_pods = max_pods
+        self.drain_seconds = drain_seconds
+        self.max_hourly_cost = max_hourly_cost
+
+    def target(self,
+               visible: int,
+               in_flight: int,
+               throughput: float,
+               message_seconds: float,
+               pod_cost: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Compute the number of pods the fleet should have
+
+        The backlog in audio seconds (waiting and in-flight messages times
+        the average audio per message) divided by what one pod clears in
+        drain_seconds. Never more pods than messages, since a pod without a
+        job only costs money.
+
+        Args:
+            visible: Messages waiting in the queues
+            in_flight: Messages being processed
+            throughput: Audio seconds one pod processes per second
+            message_seconds: Average audio seconds per message
+            pod_cost: Dollars per hour of one pod, for the budget (None if unknown)
+
+        Returns:
+            (target, reason)
+        """
+        messages = visible + in_flight
+        if messages == 0:
+            target, reason = 0, "queues are empty"
+        else:
+            work = messages * message_seconds
+            target = min(math.ceil(work / (throughput * self.drain_seconds)), messages)
+            reason = (f"{messages} messages (~{work / 3600:.1f}h of audio) at {throughput:.1f}x per pod "
+                      f"in {self.drain_seconds / 60:.0f} min")
+
+        target = max(self.min_pods, min(self.max_pods, target))
+        if self.max_hourly_cost is not None:
+            if not pod_cost:
+                # Start one pod to learn the price rather than overrun the budget
+                if target > 1:
+                    target = 1
+                    reason += ", one pod until the pod price is known"
+            elif target > self.max_hourly_cost // pod_cost:
+                target = int(self.max_hourly_cost // pod_cost)
+                reason += f", capped by the ${self.max_hourly_cost:.2f}/h budget"
+        return target, reason
+
+class SQSBacklog:
+    """Visible and in-flight message counts over one or more SQS queues"""
+
+    def __init__(self, sqs, queue_urls: List[str]):
+        self.sqs = sqs
+        self.queue_urls = queue_urls
+
+    def depth(self) -> Tuple[int, int]:
+        """(visible, in_flight) summed over the queues"""
+        visible = in_flight = 0
+        for queue_url in self.queue_urls:
+            attributes = self.sqs.get_queue_attributes(
+                QueueUrl=queue_url,
+                AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
+            )['Attributes']
+            visible += int(attributes.get('ApproximateNumberOfMessages', '0'))
+            in_flight += int(attributes.get('ApproximateNumberOfMessagesNotVisible', '0'))
+        return visible, in_flight
+
+class S3Heartbeats:
+    """Worker heartbeats (workers/{worker_id}.json) from the results bucket"""
+
+    def __init__(self, s3, bucket: str, prefix: str = "workers/"):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Heartbeats written in the last HEARTBEAT_HISTORY_SECONDS; unreadable ones are skipped"""
+        heartbeats = []
+        cutoff = time.time() - HEARTBEAT_HISTORY_SECONDS
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get('Contents', []):
+                if obj['LastModified'].timestamp() < cutoff:
+                    continue
+                try:
+                    body = self.s3.get_object(Bucket=self.bucket, Key=obj['Key'])['Body'].read()
+                    heartbeats.append(json.loads(body))
+                except Exception as e:
+                    logger.warning(f"Skipping heartbeat {obj['Key']}: {str(e)}")
+        return heartbeats
+
+class Autoscaler:
+    """
+    Reconciles the RunPod worker fleet with the SQS backlog
+
+    Each reconcile() reads the queue depth, the worker heartbeats and the
+    managed pods (those named '<name_prefix>-...'), asks the policy for a
+    target and moves the fleet one step towards it:
+
+    - Scaling up creates pods (or resumes stopped ones from a WarmPool),
+      at most max_step at a time and no sooner than scale_up_cooldown
+      after the last scale-up, because new pods take minutes to boot and
+      the backlog does not shrink meanwhile.
+    - Scaling down stops idle pods (heartbeat with no job in flight, or no
+      heartbeat yet) once the target has stayed below the fleet for
+      scale_down_delay. Busy pods are never stopped.
+    - Pods that have not sent a heartbeat boot_timeout after they were
+      first seen are terminated, and stopped pods are terminated after
+      stopped_ttl, except those the WarmPool keeps warm.
+
+    Booting pods count towards the fleet, so a burst is not answered twice.
+    """
+
+    def __init__(self,
+                 manager,
+                 backlog,
+                 heartbeats,
+                 policy: ScalingPolicy,
+                 pod_spec: Dict[str, Any],
+                 name_prefix: str = DEFAULT_POD_NAME_PREFIX,
+                 default_throughput: float = DEFAULT_THROUGHPUT,
+                 default_message_seconds: float = DEFAULT_MESSAGE_SECONDS,
+                 pod_hourly_cost: Optional[float] = None,
+                 max_step: int = DEFAULT_MAX_STEP,
+                 scale_up_cooldown: float = DEFAULT_SCALE_UP_COOLDOWN,
+                 scale_down_delay: float = DEFAULT_SCALE_DOWN_DELAY,
+                 boot_timeout: float = DEFAULT_BOOT_TIMEOUT,
+                 stopped_ttl: float = DEFAULT_STOPPED_TTL,
+                 pool=None,
+                 dry_run: bool = False,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            manager: RunPodManager (or anything with its pod methods)
+            backlog: Object with depth() -> (visible, in_flight)
+            heartbeats: Object with read() -> list of worker heartbeats
+            policy: ScalingPolicy
+            pod_spec: create_pod arguments except name (image, gpu_type_id, ...)
+            name_prefix: Prefix of the names of the pods this autoscaler manages
+            default_throughput: Per-pod throughput until heartbeats measure it
+            default_message_seconds: Audio per message until heartbeats measure it
+            pod_hourly_cost: Dollars per hour of a pod (default: the running pods' average costPerHr)
+            max_step: Pods created per reconciliation at most
+            scale_up_cooldown: Seconds between scale-ups
+            scale_down_delay: Seconds the target must stay below the fleet before stopping pods
+            boot_timeout: Seconds a pod may run without a heartbeat
+            stopped_ttl: Seconds a stopped pod is kept before it is terminated
+            pool: WarmPool over manager; pods are then listed from its registry
+                and resumed before new ones are created
+            dry_run: Log actions without calling the RunPod API
+            clock: Time source (epoch seconds), replaceable for simulations
+        """
+        self.manager = manager
+        self.pool = pool
+        self.pods_api = pool or manager
+        self.backlog = backlog
+        self.heartbeats = heartbeats
+        self.policy = policy
+        self.pod_spec = pod_spec
+        self.name_prefix = name_prefix
+        self.default_throughput = default_throughput
+        self.default_message_seconds = default_message_seconds
+        self.pod_hourly_cost = pod_hourly_cost
+        self.max_step = max_step
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_delay = scale_down_delay
+        self.boot_timeout = boot_timeout
+        self.stopped_ttl = stopped_ttl
+        self.dry_run = dry_run
+        self.clock = clock
+
+        self._last_scale_up = None
+        self._pod_cost = pod_hourly_cost
+        self._below_since = None
+        self._first_seen = {}  # pod id -> when it was first seen running
+        self._stopped_since = {}  # pod id -> when it was first seen stopped
+
+    def managed_pods(self) -> List[Dict[str, Any]]:
+        """Pods of this fleet that are not terminated"""
+        return [pod for pod in self.pods_api.list_pods() or []
+                if (pod.get('name') or '').startswith(self.name_prefix + "-")
+                and pod.get('desiredStatus') != STATUS_TERMINATED]
+
+    def observe(self) -> Dict[str, Any]:
+        """Read the queues, heartbeats and pods"""
+        now = self.clock()
+        visible, in_flight = self.backlog.depth()
+        heartbeats = self.heartbeats.read()
+        pods = self.managed_pods()
+
+        # Latest heartbeat per pod (a restarted worker writes a new file).
+        # A resumed pod's last word is its old worker's shutdown, so it
+        # counts as booting until the new worker reports.
+        latest = {}
+        for heartbeat in heartbeats:
+            pod_id = heartbeat.get('pod_id')
+            updated = heartbeat_time(heartbeat)
+            if pod_id and updated is not None and (pod_id not in latest or updated > latest[pod_id][0]):
+                latest[pod_id] = (updated, heartbeat)
+        reported = bool(latest)
+        latest = {pod_id: entry for pod_id, entry in latest.items() if entry[1].get('status') != "shutdown"}
+
+        throughput, message_seconds = measure_fleet(heartbeats, now)
+        running = [pod for pod in pods if pod.get('desiredStatus') == STATUS_RUNNING]
+        costs = [pod['costPerHr'] for pod in running if pod.get('costPerHr')]
+        if costs and not self.pod_hourly_cost:
+            self._pod_cost = sum(costs) / len(costs)
+
+        return {
+            "now": now,
+            "visible": visible,
+            "in_flight": in_flight,
+            "running": running,
+            "stopped": [pod for pod in pods if pod.get('desiredStatus') == STATUS_EXITED],
+            "heartbeats": {pod_id: heartbeat for pod_id, (_, heartbeat) in latest.items()},
+            "pod_ids_reported": reported,
+            "throughput": throughput or self.default_throughput,
+            "message_seconds": message_seconds or self.default_message_seconds,
+            "pod_cost": self._pod_cost,
+        }
+
+    def reconcile(self) -> Dict[str, Any]:
+        """
+        Run one control step
+
+        Returns:
+            Dict with the observation summary, target, reason and the actions taken
+        """
+        state = self.observe()
+        now = state["now"]
+        actions = []
+
+        for pod in state["running"]:
+            self._first_seen.setdefault(pod['id'], now)
+            self._stopped_since.pop(pod['id'], None)
+        for pod in state["stopped"]:
+            self._stopped_since.setdefault(pod['id'], pod.get('stopped_at') or now)
+            self._first_seen.pop(pod['id'], None)
+
+        # Pods that never came up. Only when workers report pod ids at all,
+        # so an image without them does not have every pod replaced.
+        fleet = []
+        for pod in state["running"]:
+            if (state["pod_ids_reported"] and pod['id'] not in state["heartbeats"]
+                    and now - self._first_seen[pod['id']] > self.boot_timeout):
+                logger.warning(f"Pod {pod['id']} sent no heartbeat in {self.boot_timeout:.0f}s")
+                self._act(actions, "terminate", pod['id'])
+            else:
+                fleet.append(pod)
+
+        warm = self.pool.warm_ids(self.pod_spec) if self.pool else set()
+        for pod in state["stopped"]:
+            if pod['id'] not in warm and now - self._stopped_since[pod['id']] > self.stopped_ttl:
+                self._act(actions, "terminate", pod['id'])
+
+        target, reason = self.policy.target(state["visible"], state["in_flight"], state["throughput"],
+                                            state["message_seconds"], state["pod_cost"])
+        current = len(fleet)
+
+        if target > current:
+            self._below_since = None
+            if self._last_scale_up is None or now - self._last_scale_up >= self.scale_up_cooldown:
+                for _ in range(min(target - current, self.max_step)):
+                    self._act(actions, "create")
+                self._last_scale_up = now
+        elif target < current:
+            if self._below_since is None:
+                self._below_since = now
+            if now - self._below_since >= self.scale_down_delay:
+                for pod in self._idle_pods(fleet, state["heartbeats"])[:current - target]:
+                    self._act(actions, "stop", pod['id'])
+                self._below_since = None
+        else:
+            self._below_since = None
+
+        booting = sum(1 for pod in fleet if pod['id'] not in state["heartbeats"])
+        logger.info(f"Backlog {state['visible']} visible / {state['in_flight']} in flight, "
+                    f"{current} pods ({booting} booting), {len(state['stopped'])} stopped; "
+                    f"target {target}: {reason}"
+                    + (f" -> {', '.join(a['action'] for a in actions)}" if actions else ""))
+
+        return {
+            "time": now,
+            "visible": state["visible"],
+            "in_flight": state["in_flight"],
+            "pods": current,
+            "booting": booting,
+            "stopped": len(state["stopped"]),
+            "throughput": round(state["throughput"], 2),
+            "message_seconds": round(state["message_seconds"], 1),
+            "target": target,
+            "reason": reason,
+            "actions": actions,
+        }
+
+    def _idle_pods(self, fleet: List[Dict[str, Any]], heartbeats: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pods that can be stopped without losing work: idle ones first, then booting ones (newest first)"""
+        idle = [pod for pod in fleet
+                if pod['id'] in heartbeats and not heartbeats[pod['id']].get('jobs_in_flight')]
+        booting = sorted((pod for pod in fleet if pod['id'] not in heartbeats),
+                         key=lambda pod: self._first_seen.get(pod['id'], 0), reverse=True)
+        return idle + booting
+
+    def _act(self, actions: List[Dict[str, Any]], action: str, pod_id: Optional[str] = None):
+        """Call the RunPod API for one action (unless dry_run) and record it"""
+        record = {"action": action, "pod_id": pod_id}
+        if self.dry_run:
+            logger.info(f"[dry run] {action} {pod_id or ''}")
+            actions.append(record)
+            return
+        try:
+            if action == "create":
+                name = f"{self.name_prefix}-{uuid.uuid4().hex[:8]}"
+                if self.pool:
+                    pod, resumed = self.pool.launch(name, self.pod_spec)
+                    record["action"] = "start" if resumed else "create"
+                else:
+                    pod = self.manager.create_pod(name=name, **self.pod_spec)
+                record["pod_id"] = pod.get('id') if isinstance(pod, dict) else None
+            elif action == "stop":
+                self.pods_api.stop_pod(pod_id)
+            elif action == "terminate":
+                self.pods_api.terminate_pod(pod_id)
+                self._stopped_since.pop(pod_id, None)
+                self._first_seen.pop(pod_id, None)
+            actions.append(record)
+        except Exception as e:
+            logger.error(f"Could not {action} pod {pod_id or ''}: {str(e)}")
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scale RunPod transcription workers with the SQS backlog")
+
+    parser.add_argument("--api-key", help="RunPod API key (defaults to RUNPOD_API_KEY env var)")
+    parser.add_argument("--queue-url", action="append", default=[],
+                        help="SQS queue the workers read (repeat for every lane)")
+    parser.add_argument("--region", default="us-east-1", help="AWS region (default: us-east-1)")
+    parser.add_argument("--s3-bucket", default="youtube-transcripts",
+                        help="Bucket with the workers/ heartbeats (default: youtube-transcripts)")
+
+    # Pods
+    parser.add_argument("--name-prefix", default=DEFAULT_POD_NAME_PREFIX,
+                        help=f"Name prefix of the managed pods (default: {DEFAULT_POD_NAME_PREFIX})")
+    parser.add_argument("--image", help="Worker Docker image")
+    parser.add_argument("--gpu-type", help="GPU type ID for new pods")
+    parser.add_argument("--cloud-type", default="COMMUNITY", choices=["COMMUNITY", "SECURE"],
+                        help="Cloud type (COMMUNITY or SECURE)")
+    parser.add_argument("--env", action="append", help="Environment variables for new pods in KEY=VALUE format")
+    parser.add_argument("--secret", action="append", help="Secret names for new pods")
+    parser.add_argument("--volume-gb", type=int, default=0,
+                        help="Pod volume in GB; model caches are kept on it across stop/start (default: 0)")
+    parser.add_argument("--volume-mount-path", default="/workspace",
+                        help="Mount path of the pod volume (default: /workspace)")
+
+    # Warm pool
+    parser.add_argument("--warm-pods", type=int, default=DEFAULT_WARM_PODS,
+                        help=f"Stopped pods kept to resume on scale-up (default: {DEFAULT_WARM_PODS})")
+    parser.add_argument("--registry-file", default=DEFAULT_REGISTRY_FILE,
+                        help=f"Local record of the pods' state (default: {DEFAULT_REGISTRY_FILE})")
+    parser.add_argument("--sync-interval", type=float, default=DEFAULT_SYNC_INTERVAL,
+                        help=f"Seconds between list-pods calls to refresh the registry (default: {DEFAULT_SYNC_INTERVAL})")
+
+    # Policy
+    parser.add_argument("--min-pods", type=int, default=0, help="Pods kept running with empty queues (default: 0)")
+    parser.add_argument("--max-pods", type=int, default=DEFAULT_MAX_PODS,
+                        help=f"Most pods running at once (default: {DEFAULT_MAX_PODS})")
+    parser.add_argument("--max-hourly-cost", type=float, default=None,
+                        help="Budget in dollars per hour for running pods (default: no limit)")
+    parser.add_argument("--pod-hourly-cost", type=float, default=None,
+                        help="Dollars per hour of one pod (default: average costPerHr of running pods)")
+    parser.add_argument("--drain-minutes", type=float, default=DEFAULT_DRAIN_SECONDS / 60,
+                        help=f"Size the fleet to clear the backlog in this time (default: {DEFAULT_DRAIN_SECONDS // 60})")
+    parser.add_argument("--default-throughput", type=float, default=DEFAULT_THROUGHPUT,
+                        help=f"Audio seconds per second per pod until measured (default: {DEFAULT_THROUGHPUT})")
+    parser.add_argument("--default-message-seconds", type=float, default=DEFAULT_MESSAGE_SECONDS,
+                        help=f"Audio seconds per message until measured (default: {DEFAULT_MESSAGE_SECONDS})")
+    parser.add_argument("--max-step", type=int, default=DEFAULT_MAX_STEP,
+                        help=f"Pods created per step at most (default: {DEFAULT_MAX_STEP})")
+    parser.add_argument("--scale-up-cooldown", type=float, default=DEFAULT_SCALE_UP_COOLDOWN,
+                        help=f"Seconds between scale-ups (default: {DEFAULT_SCALE_UP_COOLDOWN})")
+    parser.add_argument("--scale-down-delay", type=float, default=DEFAULT_SCALE_DOWN_DELAY,
+                        help=f"Seconds below target before stopping pods (default: {DEFAULT_SCALE_DOWN_DELAY})")
+    parser.add_argument("--boot-timeout", type=float, default=DEFAULT_BOOT_TIMEOUT,
+                        help=f"Seconds a pod may go without a heartbeat (default: {DEFAULT_BOOT_TIMEOUT})")
+    parser.add_argument("--stopped-ttl", type=float, default=DEFAULT_STOPPED_TTL,
+                        help=f"Seconds before a stopped pod is terminated (default: {DEFAULT_STOPPED_TTL})")
+
+    # Loop
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Seconds between steps (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--once", action="store_true", help="Run a single step and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Log actions without calling the RunPod API")
+    parser.add_argument("--json", action="store_true", help="Print every step as JSON")
+
+    # Offline simulation against a fake RunPod API (see autoscaler_sim.py)
+    parser.add_argument("--simulate", action="store_true", help="Run the policy against a simulated fleet")
+    parser.add_argument("--sim-hours", type=float, default=6, help="Simulated hours (default: 6)")
+    parser.add_argument("--sim-burst", action="append",
+                        help="COUNT@HOUR: messages arriving at once (default: 300@0)")
+    parser.add_argument("--sim-rate", type=float, default=1.0, help="Messages per minute arriving steadily (default: 1)")
+    parser.add_argument("--sim-message-seconds", type=float, default=900,
+                        help="Mean audio seconds per message (default: 900)")
+    parser.add_argument("--sim-throughput", type=float, default=15.0,
+                        help="Actual audio seconds per second of a pod (default: 15)")
+    parser.add_argument("--sim-boot-seconds", type=float, default=300, help="Pod boot time (default: 300)")
+    parser.add_argument("--sim-resume-seconds", type=float, default=30,
+                        help="Time for a stopped pod to resume (default: 30)")
+    parser.add_argument("--sim-start-failure-rate", type=float, default=0.0,
+                        help="Share of start-pod calls refused for lack of GPUs on the host (default: 0)")
+    parser.add_argument("--sim-pod-cost", type=float, default=0.44, help="Dollars per hour of a pod (default: 0.44)")
+    parser.add_argument("--sim-boot-failure-rate", type=float, default=0.0,
+                        help="Share of pods that never start a worker (default: 0)")
+    parser.add_argument("--sim-seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--sim-report-minutes", type=float, default=15, help="Timeline resolution (default: 15)")
+
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_arguments()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    policy = ScalingPolicy(
+        min_pods=args.min_pods,
+        max_pods=args.max_pods,
+        drain_seconds=args.drain_minutes * 60,
+        max_hourly_cost=args.max_hourly_cost
+    )
+    settings = dict(
+        default_throughput=args.default_throughput,
+        default_message_seconds=args.default_message_seconds,
+        pod_hourly_cost=args.pod_hourly_cost,
+        max_step=args.max_step,
+        scale_up_cooldown=args.scale_up_cooldown,
+        scale_down_delay=args.scale_down_delay,
+        boot_timeout=args.boot_timeout,
+        stopped_ttl=args.stopped_ttl,
+        name_prefix=args.name_prefix
+    )
+
+    if args.simulate:
+        from autoscaler_sim import run_simulation
+        run_simulation(args, policy, settings)
+        return 0
+
+    if not args.queue_url or not args.image or not args.gpu_type:
+        print("Error: --queue-url, --image and --gpu-type are required (or use --simulate)")
+        return 1
+
+    # Imported here so --simulate runs without the runpod package or AWS credentials
+    import boto3
+    from dotenv import load_dotenv
+    from runpod_manager import RunPodManager
+
+    load_dotenv()
+    env_vars = dict(env_var.split('=', 1) for env_var in args.env or [])
+    pod_spec = {
+        "image": args.image,
+        "gpu_type_id": args.gpu_type,
+        "cloud_type": args.cloud_type,
+        "env_vars": env_vars,
+        "secrets": args.secret or [],
+    }
+    if args.volume_gb:
+        # Models are downloaded to the volume once and survive stop/start
+        pod_spec["volume_in_gb"] = args.volume_gb
+        pod_spec["volume_mount_path"] = args.volume_mount_path
+        env_vars.setdefault("HF_HOME", f"{args.volume_mount_path}/huggingface")
+        env_vars.setdefault("TORCH_HOME", f"{args.volume_mount_path}/torch")
+
+    manager = RunPodManager(api_key=args.api_key)
+    pool = WarmPool(manager, args.name_prefix, warm_size=args.warm_pods,
+                    registry=PodRegistry(args.registry_file), sync_interval=args.sync_interval)
+
+    autoscaler = Autoscaler(
+        manager,
+        SQSBacklog(boto3.client('sqs', region_name=args.region), args.queue_url),
+        S3Heartbeats(boto3.client('s3', region_name=args.region), args.s3_bucket),
+        policy,
+        pod_spec,
+        pool=pool,
+        dry_run=args.dry_run,
+        **settings
+    )
+
+    while True:
+        try:
+            step = autoscaler.reconcile()
+            if args.json:
+                print(json.dumps(step))
+        except Exception as e:
+            logger.error(f"Autoscaler step failed: {str(e)}")
+            if args.once:
+                return 1
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    sys.exit(main())
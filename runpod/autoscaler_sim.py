@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Autoscaler Simulation - Runs the scaling policy against a fake RunPod API and queue
+"""
+
+import json
+import random
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from autoscaler import Autoscaler, ScalingPolicy
+from pod_pool import WarmPool, PodStartError, STATUS_RUNNING, STATUS_EXITED
+
+logger = logging.getLogger("runpod-autoscaler")
+
+SIM_START = 1700000000.0  # epoch seconds of simulated time 0
+SIM_STEP_SECONDS = 10
+
+class SimClock:
+    """Simulated epoch time, advanced by the simulation"""
+
+    def __init__(self, start: float = SIM_START):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+class FakeRunPodAPI:
+    """
+    In-memory stand-in for RunPodManager's pod methods
+
+    Pods start a worker boot_seconds after create_pod (resume_seconds after
+    start_pod). A share of pods (failure_rate) never start one, like a pod
+    stuck pulling the image, and a share of start_pod calls
+    (start_failure_rate) are refused as when the host's GPUs were taken.
+    Running pods are billed by the simulated time.
+    """
+
+    def __init__(self,
+                 clock: SimClock,
+                 boot_seconds: float = 300,
+                 resume_seconds: Optional[float] = None,
+                 pod_cost: float = 0.44,
+                 failure_rate: float = 0.0,
+                 start_failure_rate: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        self.clock = clock
+        self.boot_seconds = boot_seconds
+        self.resume_seconds = boot_seconds if resume_seconds is None else resume_seconds
+        self.pod_cost = pod_cost
+        self.failure_rate = failure_rate
+        self.start_failure_rate = start_failure_rate
+        self.rng = rng or random.Random(1)
+        self.pods = {}
+        self.calls = {"list_pods": 0, "create_pod": 0, "start_pod": 0, "stop_pod": 0, "terminate_pod": 0}
+        self.cost = 0.0
+        self.pod_seconds = 0.0
+        self._next_id = 1
+
+    def _public(self, pod: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in pod.items() if not key.startswith('_')}
+
+    def list_pods(self) -> List[Dict[str, Any]]:
+        self.calls["list_pods"] += 1
+        return [self._public(pod) for pod in self.pods.values()]
+
+    def get_pod(self, pod_id: str) -> Dict[str, Any]:
+        return self._public(self.pods[pod_id])
+
+    def create_pod(self, name: str, image: str, gpu_type_id: str, gpu_count: int = 1,
+                   **options) -> Dict[str, Any]:
+        self.calls["create_pod"] += 1
+        pod_id = f"sim{self._next_id:04d}"
+        self._next_id += 1
+        self.pods[pod_id] = {
+            "id": pod_id,
+            "name": name,
+            "imageName": image,
+            "gpuCount": gpu_count,
+            "desiredStatus": STATUS_RUNNING,
+            "costPerHr": self.pod_cost,
+            "_ready_at": self.clock() + self.boot_seconds,
+            "_launched_at": self.clock(),
+            "_launch": "created",
+            "_broken": self.rng.random() < self.failure_rate,
+        }
+        return self._public(self.pods[pod_id])
+
+    def start_pod(self, pod_id: str, gpu_count: int) -> Dict[str, Any]:
+        self.calls["start_pod"] += 1
+        pod = self.pods[pod_id]
+        if pod["desiredStatus"] != STATUS_EXITED or gpu_count != pod["gpuCount"]:
+            raise ValueError(f"Cannot resume pod {pod_id} with {gpu_count} GPUs")
+        if self.rng.random() < self.start_failure_rate:
+            raise PodStartError("There are not enough free GPUs on the host machine to start this pod")
+        pod["desiredStatus"] = STATUS_RUNNING
+        pod["_ready_at"] = self.clock() + self.resume_seconds
+        pod["_launched_at"] = self.clock()
+        pod["_launch"] = "resumed"
+        return self._public(pod)
+
+    def stop_pod(self, pod_id: str) -> Dict[str, Any]:
+        self.calls["stop_pod"] += 1
+        pod = self.pods[pod_id]
+        pod["desiredStatus"] = STATUS_EXITED
+        return self._public(pod)
+
+    def terminate_pod(self, pod_id: str) -> Dict[str, Any]:
+        self.calls["terminate_pod"] += 1
+        self.pods.pop(pod_id)
+        return {}
+
+    def accrue(self, seconds: float):
+        """Bill running pods for a step"""
+        for pod in self.pods.values():
+            if pod["desiredStatus"] == STATUS_RUNNING:
+                self.cost += pod["costPerHr"] * seconds / 3600
+                self.pod_seconds += seconds
+
+    def ready_pods(self) -> List[str]:
+        """Ids of running pods whose worker is up"""
+        now = self.clock()
+        return [pod_id for pod_id, pod in self.pods.items()
+                if pod["desiredStatus"] == STATUS_RUNNING and not pod["_broken"] and pod["_ready_at"] <= now]
+
+class FakeQueue:
+    """Messages (enqueue time, audio seconds) waiting or in flight"""
+
+    def __init__(self):
+        self.visible = deque()
+        self.in_flight = {}
+
+    def depth(self):
+        return len(self.visible), len(self.in_flight)
+
+class FakeHeartbeats:
+    """Heartbeats written by the simulated workers"""
+
+    def __init__(self):
+        self.by_worker = {}
+
+    def read(self) -> List[Dict[str, Any]]:
+        return [dict(heartbeat) for heartbeat in self.by_worker.values()]
+
+class Simulation:
+    """
+    A simulated fleet: message arrivals, pods running one job at a time at a
+    fixed throughput, and the autoscaler stepping every interval
+
+    A job on a pod that is stopped or terminated goes back to the queue, as
+    its SQS message would once the visibility timeout ran out.
+    """
+
+    def __init__(self,
+                 api: FakeRunPodAPI,
+                 autoscaler_factory,
+                 clock: SimClock,
+                 throughput: float = 15.0,
+                 interval: float = 60):
+        """
+        Args:
+            api: FakeRunPodAPI
+            autoscaler_factory: Callable(manager, backlog, heartbeats, clock) -> autoscaler
+            clock: SimClock shared with the api
+            throughput: Audio seconds a pod processes per second
+            interval: Seconds between autoscaler steps
+        """
+        self.api = api
+        self.clock = clock
+        self.throughput = throughput
+        self.interval = interval
+        self.queue = FakeQueue()
+        self.heartbeats = FakeHeartbeats()
+        self.autoscaler = autoscaler_factory(api, self.queue, self.heartbeats, clock)
+
+        self.workers = {}  # pod id -> worker state
+        self.waits = []
+        self.launch_delays = {"created": [], "resumed": []}
+        self.interrupted = 0
+        self.completed = 0
+        self.arrived = 0
+        self.steps = []
+        self._message_id = 0
+
+    def add_messages(self, audio_seconds: List[float]):
+        for audio in audio_seconds:
+            self._message_id += 1
+            self.queue.visible.append((self._message_id, self.clock(), audio))
+        self.arrived += len(audio_seconds)
+
+    def _run_workers(self):
+        now = self.clock()
+        ready = set(self.api.ready_pods())
+
+        # Workers on pods that were stopped or terminated lose their job
+        for pod_id in list(self.workers):
+            if pod_id not in ready:
+                worker = self.workers.pop(pod_id)
+                # The payload Worker.cleanup writes
+                self.heartbeats.by_worker[worker["worker_id"]] = {
+                    "worker_id": worker["worker_id"],
+                    "pod_id": pod_id,
+                    "last_heartbeat": datetime.fromtimestamp(now).isoformat(),
+                    "status": "shutdown",
+                    "jobs_processed": worker["jobs"],
+                    "audio_seconds_processed": worker["audio"],
+                    "busy_seconds": worker["busy"],
+                }
+                if worker["job"]:
+                    message = self.queue.in_flight.pop(worker["job"][0][0])
+                    self.queue.visible.appendleft(message)
+                    self.interrupted += 1
+
+        for pod_id in ready:
+            worker = self.workers.get(pod_id)
+            if worker is None:
+                # A restarted pod runs a new worker process, with new counters
+                worker = self.workers[pod_id] = {
+                    "worker_id": f"worker-{pod_id}-{int(now)}", "job": None,
+                    "audio": 0.0, "busy": 0.0, "jobs": 0,
+                }
+
+            if worker["job"] and worker["job"][1] <= now:
+                (message_id, _, audio), _ = worker["job"]
+                self.queue.in_flight.pop(message_id)
+                worker["audio"] += audio
+                worker["jobs"] += 1
+                worker["job"] = None
+                self.completed += 1
+
+            if worker["job"] is None and self.queue.visible:
+                message = self.queue.visible.popleft()
+                self.queue.in_flight[message[0]] = message
+                self.waits.append(now - message[1])
+
+                # Time from create_pod/start_pod to the pod's first job
+                pod = self.api.pods[pod_id]
+                if pod.get("_launched_at") is not None:
+                    self.launch_delays[pod["_launch"]].append(now - pod.pop("_launched_at"))
+                worker["job"] = (message, now + message[2] / self.throughput)
+
+            if worker["job"]:
+                worker["busy"] += SIM_STEP_SECONDS
+
+            self.heartbeats.by_worker[worker["worker_id"]] = {
+                "worker_id": worker["worker_id"],
+                "pod_id": pod_id,
+                "last_heartbeat": datetime.fromtimestamp(now).isoformat(),
+                "status": "active",
+                "jobs_processed": worker["jobs"],
+                "jobs_in_flight": 1 if worker["job"] else 0,
+                "audio_seconds_processed": worker["audio"],
+                "busy_seconds": worker["busy"],
+            }
+
+    def run(self, seconds: float, arrivals: Dict[int, List[float]]):
+        """
+        Simulate a stretch of time
+
+        Args:
+            seconds: Simulated seconds
+            arrivals: Step index -> audio seconds of the messages arriving then
+        """
+        start = self.clock()
+        next_step = start
+        for index in range(int(seconds // SIM_STEP_SECONDS)):
+            self.add_messages(arrivals.get(index, []))
+            self._run_workers()
+            if self.clock() >= next_step:
+                self.steps.append(self.autoscaler.reconcile())
+                next_step += self.interval
+            self.api.accrue(SIM_STEP_SECONDS)
+            self.clock.now += SIM_STEP_SECONDS
+
+    def summary(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            "arrived": self.arrived,
+            "completed": self.completed,
+            "waiting": len(self.queue.visible) + len(self.queue.in_flight),
+            "interrupted_jobs": self.interrupted,
+            "wait_mean_minutes": round(sum(waits) / len(waits) / 60, 1) if waits else None,
+            "wait_p95_minutes": round(waits[int(len(waits) * 0.95)] / 60, 1) if waits else None,
+            "wait_max_minutes": round(waits[-1] / 60, 1) if waits else None,
+            "launch_to_first_job_minutes": {
+                kind: round(sum(delays) / len(delays) / 60, 1) if delays else None
+                for kind, delays in self.launch_delays.items()
+            },
+            "pod_hours": round(self.api.pod_seconds / 3600, 1),
+            "cost": round(self.api.cost, 2),
+            "max_pods": max((step["pods"] for step in self.steps), default=0),
+            "api_calls": dict(self.api.calls),
+            "pool": self.autoscaler.pool.get_stats() if self.autoscaler.pool else None,
+        }
+
+def build_arrivals(hours: float, bursts: List[str], rate: float, mean_seconds: float,
+                   rng: random.Random) -> Dict[int, List[float]]:
+    """
+    Message arrivals per simulation step
+
+    Args:
+        hours: Simulated hours
+        bursts: 'COUNT@HOUR' specs for messages arriving at once
+        rate: Messages per minute arriving as a Poisson stream
+        mean_seconds: Mean audio seconds per message (exponentially distributed, at least 30)
+
+    Returns:
+        Step index -> audio seconds of the arriving messages
+    """
+    def duration():
+        return max(30.0, rng.expovariate(1 / mean_seconds))
+
+    arrivals = {}
+    for spec in bursts:
+        count, _, hour = spec.partition('@')
+        step = int(float(hour or 0) * 3600 // SIM_STEP_SECONDS)
+        arrivals.setdefault(step, []).extend(duration() for _ in range(int(count)))
+
+    if rate > 0:
+        t = rng.expovariate(rate / 60)
+        while t < hours * 3600:
+            arrivals.setdefault(int(t // SIM_STEP_SECONDS), []).append(duration())
+            t += rng.expovariate(rate / 60)
+    return arrivals
+
+def run_simulation(args, policy: ScalingPolicy, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Simulate the autoscaler with the command line's settings and print a timeline and summary"""
+    rng = random.Random(args.sim_seed)
+    clock = SimClock()
+    api = FakeRunPodAPI(clock, boot_seconds=args.sim_boot_seconds, resume_seconds=args.sim_resume_seconds,
+                        pod_cost=args.sim_pod_cost, failure_rate=args.sim_boot_failure_rate,
+                        start_failure_rate=args.sim_start_failure_rate, rng=rng)
+
+    def make_autoscaler(manager, backlog, heartbeats, sim_clock):
+        # The registry stays in memory; --warm-pods 0 still resumes pods stopped within --stopped-ttl
+        pool = WarmPool(manager, settings["name_prefix"], warm_size=args.warm_pods,
+                        sync_interval=args.sync_interval, clock=sim_clock)
+        return Autoscaler(manager, backlog, heartbeats, policy, {"image": "sim", "gpu_type_id": "sim"},
+                          pool=pool, clock=sim_clock, **settings)
+
+    # The per-step log lines would drown the timeline
+    logger.setLevel(logging.WARNING)
+    simulation = Simulation(api, make_autoscaler, clock, throughput=args.sim_throughput, interval=args.interval)
+    arrivals = build_arrivals(args.sim_hours, args.sim_burst or ["300@0"], args.sim_rate,
+                              args.sim_message_seconds, rng)
+    simulation.run(args.sim_hours * 3600, arrivals)
+    summary = simulation.summary()
+
+    if args.json:
+        print(json.dumps({"steps": simulation.steps, "summary": summary}, indent=2))
+        return summary
+
+    print(f"{'time':>6} {'visible':>8} {'in flight':>9} {'pods':>5} {'booting':>7} {'stopped':>7} "
+          f"{'target':>6} {'throughput':>10}")
+    every = max(1, int(args.sim_report_minutes * 60 // args.interval))
+    for step in simulation.steps[::every]:
+        minutes = int((step["time"] - SIM_START) // 60)
+        print(f"{minutes // 60:>3}:{minutes % 60:02d} {step['visible']:>8} {step['in_flight']:>9} "
+              f"{step['pods']:>5} {step['booting']:>7} {step['stopped']:>7} {step['target']:>6} "
+              f"{step['throughput']:>9.1f}x")
+    print()
+    print(json.dumps(summary, indent=2))
+    return summary
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Pod Pool - Warm pool of stopped RunPod workers, resumed instead of created
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger("runpod-pool")
+
+DEFAULT_WARM_PODS = 2  # stopped pods kept for resuming
+DEFAULT_SYNC_INTERVAL = 600  # seconds between list_pods calls
+DEFAULT_START_RETRY_SECONDS = 1800  # a pod that failed to start is not tried again for this long
+DEFAULT_REGISTRY_FILE = "pod_registry.json"
+
+STATUS_RUNNING = "RUNNING"
+STATUS_EXITED = "EXITED"
+STATUS_TERMINATED = "TERMINATED"
+
+# Fields of a RunPod pod kept in the registry
+POD_FIELDS = ("id", "name", "desiredStatus", "costPerHr", "imageName")
+
+class PodStartError(Exception):
+    """Raised by start_pod when RunPod refuses to start a stopped pod (e.g. its host's GPUs are taken)"""
+    pass
+
+class PodRegistry:
+    """
+    Local record of the managed pods and their state
+
+    Entries are the pod's RunPod fields plus the times this process saw it
+    created, started, stopped and fail to start. Saved as JSON after every
+    change when a path is given, so a restarted autoscaler keeps its pool.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: JSON file to keep the registry in (None keeps it in memory)
+        """
+        self.path = path
+        self.pods = {}
+        self.synced_at = None
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                self.pods = data.get("pods", {})
+                self.synced_at = data.get("synced_at")
+                logger.info(f"Loaded {len(self.pods)} pods from {path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable pod registry {path}: {str(e)}")
+
+    def save(self):
+        """Write the registry file (atomically)"""
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"synced_at": self.synced_at, "pods": self.pods}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def update(self, pod_id: str, **fields):
+        """Set fields of a pod's entry (creating it) and save"""
+        self.pods.setdefault(pod_id, {"id": pod_id}).update(fields)
+        self.save()
+
+    def remove(self, pod_id: str):
+        """Forget a pod and save"""
+        if self.pods.pop(pod_id, None) is not None:
+            self.save()
+
+class WarmPool:
+    """
+    RunPod pod operations through a pool of stopped pods
+
+    A new pod pulls the multi-GB worker image and downloads the models
+    before its first job; a stopped pod resumed on the same host has both
+    and is working within seconds. launch() therefore resumes the most
+    recently stopped pod of the same image and GPU type with start_pod and
+    only calls create_pod when no such pod can start (RunPod refuses when
+    the host's GPUs were taken meanwhile; such a pod is skipped for
+    start_retry_seconds). Pods stopped on scale-down refill the pool;
+    warm_ids() names the warm_size of them worth keeping, the rest
+    (including pods of an older image) can be terminated.
+
+    Pod state is tracked in a PodRegistry updated by every operation, and
+    list_pods() answers from it, calling the RunPod API only every
+    sync_interval seconds (or after a failed call) to catch pods changed
+    from elsewhere.
+    """
+
+    def __init__(self,
+                 manager,
+                 name_prefix: str,
+                 warm_size: int = DEFAULT_WARM_PODS,
+                 registry: Optional[PodRegistry] = None,
+                 sync_interval: float = DEFAULT_SYNC_INTERVAL,
+                 start_retry_seconds: float = DEFAULT_START_RETRY_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            manager: RunPodManager (or anything with its pod methods)
+            name_prefix: Prefix of the names of the pods in the pool
+            warm_size: Stopped pods to keep for resuming
+            registry: PodRegistry (default: in memory)
+            sync_interval: Seconds between list_pods calls
+            start_retry_seconds: Seconds before a pod that failed to start is tried again
+            clock: Time source (epoch seconds), replaceable for simulations
+        """
+        self.manager = manager
+        self.name_prefix = name_prefix
+        self.warm_size = warm_size
+        self.registry = registry or PodRegistry()
+        self.sync_interval = sync_interval
+        self.start_retry_seconds = start_retry_seconds
+        self.clock = clock
+        self.stats = {"resumed": 0, "created": 0, "start_failures": 0, "syncs": 0}
+
+    def sync(self, force: bool = False):
+        """Refresh the registry from list_pods if it is older than sync_interval"""
+        now = self.clock()
+        synced_at = self.registry.synced_at
+        if not force and synced_at is not None and now - synced_at < self.sync_interval:
+            return
+
+        listed = {pod['id']: pod for pod in self.manager.list_pods() or []
+                  if (pod.get('name') or '').startswith(self.name_prefix + "-")
+                  and pod.get('desiredStatus') != STATUS_TERMINATED}
+        for pod_id in list(self.registry.pods):
+            if pod_id not in listed:
+                self.registry.pods.pop(pod_id)
+        for pod_id, pod in listed.items():
+            entry = self.registry.pods.setdefault(pod_id, {"created_at": now})
+            if pod.get('desiredStatus') == STATUS_EXITED and entry.get('desiredStatus') != STATUS_EXITED:
+                entry["stopped_at"] = now
+            entry.update({field: pod.get(field) for field in POD_FIELDS})
+
+        self.registry.synced_at = now
+        self.registry.save()
+        self.stats["syncs"] += 1
+
+    def list_pods(self) -> List[Dict[str, Any]]:
+        """The pool's pods, from the registry"""
+        self.sync()
+        return [dict(pod) for pod in self.registry.pods.values()]
+
+    @staticmethod
+    def matches(pod: Dict[str, Any], pod_spec: Dict[str, Any]) -> bool:
+        """
+        Whether a pod runs the spec's image on the spec's GPU type
+
+        The GPU type is what create_pod was given, recorded in the registry;
+        pods the registry did not see created never match.
+        """
+        return (pod.get('imageName') == pod_spec.get('image')
+                and pod.get('gpu_type_id') == pod_spec.get('gpu_type_id'))
+
+    def stopped_pods(self, pod_spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Stopped pods of the current spec that may be resumed, most recently stopped first"""
+        now = self.clock()
+        pods = [pod for pod in self.registry.pods.values()
+                if pod.get('desiredStatus') == STATUS_EXITED
+                and self.matches(pod, pod_spec)
+                and now - (pod.get('start_failed_at') or 0) >= self.start_retry_seconds]
+        return sorted(pods, key=lambda pod: pod.get('stopped_at') or 0, reverse=True)
+
+    def warm_ids(self, pod_spec: Dict[str, Any]) -> set:
+        """
+        Ids of the stopped pods the pool keeps
+
+        Only pods of the current spec: after a new image is deployed, the
+        old image's stopped pods expire instead of being resumed.
+        """
+        return {pod['id'] for pod in self.stopped_pods(pod_spec)[:self.warm_size]}
+
+    def launch(self, name: str, pod_spec: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Get one more running pod: resume a stopped one, or create one
+
+        Args:
+            name: Name for a created pod
+            pod_spec: create_pod arguments except name
+
+        Returns:
+            (pod, resumed)
+        """
+        self.sync()
+        now = self.clock()
+        for pod in self.stopped_pods(pod_spec):
+            try:
+                self.manager.start_pod(pod['id'], pod.get('gpu_count') or 1)
+            except PodStartError as e:
+                logger.warning(f"Could not resume pod {pod['id']}, trying another: {str(e)}")
+                self.registry.update(pod['id'], start_failed_at=now)
+                self.stats["start_failures"] += 1
+                continue
+            self.registry.update(pod['id'], desiredStatus=STATUS_RUNNING, started_at=now, start_failed_at=None)
+            self.stats["resumed"] += 1
+            return dict(self.registry.pods[pod['id']]), True
+
+        created = self.manager.create_pod(name=name, **pod_spec)
+        fields = {field: created.get(field) for field in POD_FIELDS if created.get(field) is not None}
+        fields.update(name=fields.get("name", name), imageName=fields.get("imageName", pod_spec.get("image")),
+                      gpu_type_id=pod_spec.get("gpu_type_id"), gpu_count=pod_spec.get("gpu_count", 1),
+                      desiredStatus=STATUS_RUNNING,
+                      created_at=now, started_at=now)
+        self.registry.update(created['id'], **fields)
+        self.stats["created"] += 1
+        return dict(self.registry.pods[created['id']]), False
+
+    def stop_pod(self, pod_id: str) -> Dict[str, Any]:
+        """Stop a pod; it joins the pool"""
+        try:
+            result = self.manager.stop_pod(pod_id)
+        except Exception:
+            self.registry.synced_at = None
+            raise
+        self.registry.update(pod_id, desiredStatus=STATUS_EXITED, stopped_at=self.clock())
+        return result
+
+    def terminate_pod(self, pod_id: str) -> Dict[str, Any]:
+        """Terminate a pod and forget it"""
+        try:
+            result = self.manager.terminate_pod(pod_id)
+        except Exception:
+            self.registry.synced_at = None
+            raise
+        self.registry.remove(pod_id)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Launch counts and stopped pods"""
+        stats = dict(self.stats)
+        stats["stopped"] = sum(1 for pod in self.registry.pods.values() if pod.get('desiredStatus') == STATUS_EXITED)
+        return stats
@@ -49,6 +49,7 @@ def main():
     # Start pod command
     start_pod_parser = subparsers.add_parser("start-pod", help="Start a stopped pod")
     start_pod_parser.add_argument("pod_id", help="ID of the pod to start")
+    start_pod_parser.add_argument("--gpu-count", type=int, default=1, help="GPUs to resume the pod with (as created)")
     
     # Stop pod command
     stop_pod_parser = subparsers.add_parser("stop-pod", help="Stop a running pod")
@@ -153,7 +154,7 @@ def main():
                 pretty_print(result)
                 
         elif args.command == "start-pod":
-            result = manager.start_pod(args.pod_id)
+            result = manager.start_pod(args.pod_id, args.gpu_count)
             if not args.json:
                 print(f"Pod {args.pod_id} start initiated:")
                 print(f"  Status: {result.get('desiredStatus', 'unknown')}")
@@ -7,7 +7,9 @@ import os
 import json
 import logging
 import runpod
+from runpod.error import QueryError
 from typing import Dict, List, Any, Optional, Union
+from pod_pool import PodStartError
 
 # Configure logging
 logging.basicConfig(
@@ -69,9 +71,12 @@ class RunPodManager:
                  name: str, 
                  image: str, 
                  gpu_type_id: str,
+                 gpu_count: int = 1,
                  cloud_type: str = "COMMUNITY",
                  env_vars: Optional[Dict[str, str]] = None,
-                 secrets: Optional[List[str]] = None) -> Dict[str, Any]:
+                 secrets: Optional[List[str]] = None,
+                 volume_in_gb: Optional[int] = None,
+                 volume_mount_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a new pod
         
@@ -79,9 +84,12 @@ class RunPodManager:
             name: Name for the pod
             image: Docker image to use
             gpu_type_id: GPU type ID (get from list_gpu_types())
+            gpu_count: Number of GPUs
             cloud_type: Cloud type (COMMUNITY or SECURE)
             env_vars: Environment variables to set in the container
             secrets: List of secret names to use with the pod
+            volume_in_gb: Size of the pod volume, which persists across stop/start
+            volume_mount_path: Where the pod volume is mounted
             
         Returns:
             New pod information
@@ -93,12 +101,19 @@ class RunPodManager:
             "name": name,
             "image_name": image,
             "gpu_type_id": gpu_type_id,
+            "gpu_count": gpu_count,
         }
         
         # Add cloud type if specified
         if cloud_type:
             pod_params["cloud_type"] = cloud_type
         
+        # Add a pod volume if requested
+        if volume_in_gb:
+            pod_params["volume_in_gb"] = volume_in_gb
+            if volume_mount_path:
+                pod_params["volume_mount_path"] = volume_mount_path
+        
         # Process environment variables
         final_env_vars = {}
         if env_vars:
@@ -137,19 +152,26 @@ class RunPodManager:
             logger.error(f"Error stopping pod {pod_id}: {str(e)}")
             raise
     
-    def start_pod(self, pod_id: str) -> Dict[str, Any]:
+    def start_pod(self, pod_id: str, gpu_count: int = 1) -> Dict[str, Any]:
         """
-        Start a stopped pod
+        Start (resume) a stopped pod
         
         Args:
             pod_id: ID of the pod to start
+            gpu_count: Number of GPUs, as the pod was created with
             
         Returns:
             Response with pod status
+            
+        Raises:
+            PodStartError: If RunPod refuses to start the pod
         """
         logger.info(f"Starting pod {pod_id}")
         try:
-            return runpod.start_pod(pod_id)
+            return runpod.resume_pod(pod_id, gpu_count)
+        except QueryError as e:
+            logger.error(f"RunPod refused to start pod {pod_id}: {str(e)}")
+            raise PodStartError(str(e)) from e
         except Exception as e:
             logger.error(f"Error starting pod {pod_id}: {str(e)}")
             raise
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# scripts/benchmark_postprocess.py - Micro-benchmarks for phrase scanning and transcript post-processing
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scanner import PhraseScanner
+from src.transcript_format import CompactTranscript, TranscriptBuilder
+
+CHUNK_SECONDS = 30
+SEGMENTS_PER_CHUNK = 6
+WORDS_PER_SEGMENT = 12
+
+VOCABULARY = ("the", "and", "we", "you", "that", "it", "is", "work", "keep", "going", "never",
+              "done", "today", "people", "think", "really", "just", "know", "time", "right")
+
+def make_phrases(count):
+    """Generate distinct single- and two-word phrases to scan for"""
+    phrases = []
+    for i in range(count):
+        phrases.append(f"phrase{i}" if i % 2 == 0 else f"multi word{i}")
+    return phrases
+
+def generate_chunks(hours, phrases, phrase_rate=0.05, seed=0):
+    """
+    Generate per-chunk WhisperX-style segments with chunk-relative timestamps,
+    as the transcriber sees them before offsetting
+
+    Returns:
+        List of segment lists, one per 30-second chunk
+    """
+    rng = np.random.default_rng(seed)
+    num_chunks = int(hours * 3600 / CHUNK_SECONDS)
+    segment_length = CHUNK_SECONDS / SEGMENTS_PER_CHUNK
+    word_length = segment_length / WORDS_PER_SEGMENT
+
+    # Draw all random choices up front; per-word rng calls would dominate generation
+    word_ids = rng.integers(len(VOCABULARY), size=(num_chunks, SEGMENTS_PER_CHUNK, WORDS_PER_SEGMENT)).tolist()
+    scores = np.round(rng.uniform(0.5, 1.0, size=(num_chunks, SEGMENTS_PER_CHUNK, WORDS_PER_SEGMENT)), 3).tolist()
+    phrase_hits = (rng.random((num_chunks, SEGMENTS_PER_CHUNK)) < phrase_rate).tolist()
+    phrase_ids = rng.integers(len(phrases), size=(num_chunks, SEGMENTS_PER_CHUNK)).tolist()
+
+    chunks = []
+    for c in range(num_chunks):
+        segments = []
+        for s in range(SEGMENTS_PER_CHUNK):
+            seg_start = s * segment_length
+            texts = [VOCABULARY[w] for w in word_ids[c][s]]
+            if phrase_hits[c][s]:
+                texts[0] = phrases[phrase_ids[c][s]]
+            words = [{"word": text, "start": seg_start + k * word_length,
+                      "end": seg_start + (k + 1) * word_length, "score": scores[c][s][k]}
+                     for k, text in enumerate(texts)]
+            segments.append({"start": seg_start, "end": seg_start + segment_length,
+                             "text": " " + " ".join(texts), "words": words})
+        chunks.append(segments)
+    return chunks
+
+def write_segment_files(transcript, segments_dir):
+    """Write one text file per segment, as Worker.process_video does before scanning"""
+    os.makedirs(segments_dir, exist_ok=True)
+    transcript_files = []
+    for i, segment in enumerate(transcript.get("segments", [])):
+        txt_file = os.path.join(segments_dir, f"segment_{i:03d}.txt")
+        with open(txt_file, "w", encoding="utf-8") as f:
+            f.write(segment.get("text", ""))
+        transcript_files.append(txt_file)
+    return transcript_files
+
+def measure(fn, track_allocations, *args):
+    """
+    Run fn(*args) once for wall time, and once more under tracemalloc for peak allocation
+
+    Inputs are passed as arguments rather than captured by a closure, so
+    callers can delete them after the measurement to bound memory.
+
+    Returns:
+        Tuple of (fn result from the timed run, seconds, peak bytes or None)
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if track_allocations:
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = fn(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, seconds, peak
+
+def run_size(hours, phrases, args, work_dir):
+    """Benchmark every stage for one transcript size"""
+    results = {}
+    track = not args.no_alloc
+
+    def record(name, seconds, peak, **extra):
+        results[name] = dict(seconds=round(seconds, 4),
+                             peak_alloc_mb=round(peak / 1024 ** 2, 2) if peak is not None else None,
+                             **extra)
+        alloc = f"{results[name]['peak_alloc_mb']:>10} MB" if peak is not None else ""
+        print(f"  {hours:>7}h  {name:<22} {seconds:>10.3f}s {alloc}")
+
+    gen_start = time.perf_counter()
+    chunks = generate_chunks(hours, phrases)
+    num_segments = sum(len(c) for c in chunks)
+    print(f"  {hours:>7}h  generated {len(chunks)} chunks / {num_segments} segments "
+          f"in {time.perf_counter() - gen_start:.1f}s")
+
+    # Per-chunk conversion to columns with the chunk offset applied, as the
+    # transcriber does after each chunk
+    def add_all_chunks(chunks):
+        builder = TranscriptBuilder()
+        for i, segments in enumerate(chunks):
+            builder.add_chunk(i, segments, i * CHUNK_SECONDS)
+        return builder
+
+    builder, seconds, peak = measure(add_all_chunks, track, chunks)
+    record("offset", seconds, peak, segments=num_segments)
+
+    compact, seconds, peak = measure(lambda b: b.build("en", "benchmark", datetime.now().isoformat()), track,
+                                     builder)
+    record("merge", seconds, peak)
+    del chunks, builder
+
+    transcript, seconds, peak = measure(compact.to_dict, track)
+    record("export_dict", seconds, peak)
+
+    body, seconds, peak = measure(json.dumps, track, transcript)
+    record("json_dumps", seconds, peak, bytes=len(body))
+    _, seconds, peak = measure(json.loads, track, body)
+    record("json_loads", seconds, peak)
+    del body
+
+    data, seconds, peak = measure(lambda c: c.to_bytes(compress=True), track, compact)
+    record("compact_to_bytes", seconds, peak, bytes=len(data))
+    _, seconds, peak = measure(lambda d: CompactTranscript.from_bytes(d).to_dict(), track, data)
+    record("compact_to_dict", seconds, peak)
+    del compact, data
+
+    segments_dir = os.path.join(work_dir, f"segments_{hours}")
+    files, seconds, peak = measure(write_segment_files, track, transcript, segments_dir)
+    record("write_segment_files", seconds, peak, files=len(files))
+
+    def scan_all(files):
+        total = 0
+        for phrase in phrases:
+            total += PhraseScanner(phrase).scan_transcripts(files)["total_occurrences"]
+        return total
+
+    occurrences, seconds, peak = measure(scan_all, track, files)
+    record("scan", seconds, peak, phrases=len(phrases), occurrences=occurrences,
+           seconds_per_phrase=round(seconds / len(phrases), 4))
+
+    shutil.rmtree(segments_dir, ignore_errors=True)
+    return results
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Time phrase scanning and transcript post-processing on synthetic transcripts."
+    )
+    parser.add_argument("--hours", type=str, default="1,10,100",
+                        help="Comma-separated transcript lengths in hours, up to 1000 (Default: '1,10,100')")
+    parser.add_argument("--phrases", type=int, default=20,
+                        help="Number of phrases to scan for (Default: 20)")
+    parser.add_argument("--no_alloc", action="store_true",
+                        help="Skip the tracemalloc pass (halves the run time)")
+    parser.add_argument("--label", type=str, default=None,
+                        help="Free-form label stored with the result")
+    parser.add_argument("--output", "-o", type=str, default="benchmark_postprocess.jsonl",
+                        help="JSON-lines file the result is appended to (Default: 'benchmark_postprocess.jsonl')")
+    args = parser.parse_args()
+    args.hours = [float(h) if "." in h else int(h) for h in args.hours.split(",")]
+    return args
+
+def main():
+    """Main entry point"""
+    args = parse_arguments()
+    phrases = make_phrases(args.phrases)
+
+    work_dir = tempfile.mkdtemp(prefix="ytt-postprocess-")
+    try:
+        sizes = {}
+        for hours in args.hours:
+            sizes[str(hours)] = run_size(hours, phrases, args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "label": args.label,
+        "python": sys.version.split()[0],
+        "phrases": args.phrases,
+        "sizes": sizes,
+    }
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"\nResult appended to {args.output}")
+
+if __name__ == "__main__":
+    main()
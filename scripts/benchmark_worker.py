@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+# scripts/benchmark_worker.py - Offline end-to-end benchmark of the Worker with local S3/SQS stand-ins
+
+import argparse
+import io
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import transcriber as transcriber_module
+from src.downloader import YouTubeDownloader
+from src.utils import aws_clients
+from src.worker import Worker
+
+SAMPLE_RATE = 16000
+BENCH_BUCKET = "benchmark-bucket"
+BENCH_QUEUE_URL = "https://sqs.local/benchmark-queue"
+BENCH_REGION = "us-east-1"
+
+logger = logging.getLogger("benchmark")
+
+# ---------------------------------------------------------------------------
+# In-memory AWS stand-ins
+# ---------------------------------------------------------------------------
+
+class ClientError(Exception):
+    """Mimics botocore's ClientError closely enough for the worker's handlers"""
+
+    def __init__(self, code, operation):
+        super().__init__(f"An error occurred ({code}) when calling the {operation} operation")
+        self.response = {"Error": {"Code": code}}
+
+class NoSuchKey(ClientError):
+    def __init__(self, key):
+        super().__init__("NoSuchKey", "GetObject")
+        self.key = key
+
+class _CountingClient:
+    """Counts calls per operation and optionally adds simulated latency"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _call(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+class FakeS3(_CountingClient):
+    """Dict-backed S3 client supporting the calls the worker makes"""
+
+    exceptions = types.SimpleNamespace(NoSuchKey=NoSuchKey, ClientError=ClientError)
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.objects = {}
+        self.bytes_written = 0
+
+    def head_bucket(self, Bucket):
+        self._call("HeadBucket")
+        return {}
+
+    def create_bucket(self, Bucket, **kwargs):
+        self._call("CreateBucket")
+        return {}
+
+    def put_object(self, Bucket, Key, Body=b"", ContentEncoding=None, **kwargs):
+        self._call("PutObject")
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        elif hasattr(Body, "read"):
+            Body = Body.read()
+        with self._lock:
+            self.objects[(Bucket, Key)] = (bytes(Body), ContentEncoding, datetime.now())
+            self.bytes_written += len(Body)
+        return {}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self._call("GetObject")
+        with self._lock:
+            entry = self.objects.get((Bucket, Key))
+        if entry is None:
+            raise NoSuchKey(Key)
+        body, encoding, _ = entry
+        response = {"Body": io.BytesIO(body), "ContentLength": len(body)}
+        if encoding:
+            response["ContentEncoding"] = encoding
+        return response
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._call("DeleteObject")
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        self._call("DeleteObjects")
+        with self._lock:
+            for obj in Delete["Objects"]:
+                self.objects.pop((Bucket, obj["Key"]), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix="", MaxKeys=1000, **kwargs):
+        self._call("ListObjectsV2")
+        with self._lock:
+            keys = sorted((key, len(body), modified) for (bucket, key), (body, _, modified)
+                          in self.objects.items() if bucket == Bucket and key.startswith(Prefix))
+        contents = [{"Key": key, "Size": size, "LastModified": modified} for key, size, modified in keys[:MaxKeys]]
+        response = {"KeyCount": len(contents), "IsTruncated": len(keys) > MaxKeys}
+        if contents:
+            response["Contents"] = contents
+        return response
+
+class FakeSQS(_CountingClient):
+    """In-memory SQS queue with visibility timeouts"""
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.visible = []
+        self.in_flight = {}  # receipt handle -> (message, visible again at)
+
+    def _requeue_expired(self):
+        now = time.monotonic()
+        for handle, (message, deadline) in list(self.in_flight.items()):
+            if deadline <= now:
+                del self.in_flight[handle]
+                self.visible.append(message)
+
+    def send_message(self, QueueUrl, MessageBody, **kwargs):
+        self._call("SendMessage")
+        message = {"MessageId": str(uuid.uuid4()), "Body": MessageBody}
+        with self._lock:
+            self.visible.append(message)
+        return {"MessageId": message["MessageId"]}
+
+    def get_queue_attributes(self, QueueUrl, AttributeNames=None):
+        self._call("GetQueueAttributes")
+        with self._lock:
+            self._requeue_expired()
+            return {"Attributes": {
+                "ApproximateNumberOfMessages": str(len(self.visible)),
+                "ApproximateNumberOfMessagesNotVisible": str(len(self.in_flight)),
+            }}
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages=1, VisibilityTimeout=30, **kwargs):
+        self._call("ReceiveMessage")
+        with self._lock:
+            self._requeue_expired()
+            messages = []
+            while self.visible and len(messages) < MaxNumberOfMessages:
+                message = dict(self.visible.pop(0), ReceiptHandle=str(uuid.uuid4()))
+                self.in_flight[message["ReceiptHandle"]] = (message, time.monotonic() + VisibilityTimeout)
+                messages.append(message)
+        return {"Messages": messages} if messages else {}
+
+    def delete_message(self, QueueUrl, ReceiptHandle):
+        self._call("DeleteMessage")
+        with self._lock:
+            self.in_flight.pop(ReceiptHandle, None)
+        return {}
+
+    def change_message_visibility(self, QueueUrl, ReceiptHandle, VisibilityTimeout):
+        self._call("ChangeMessageVisibility")
+        with self._lock:
+            entry = self.in_flight.get(ReceiptHandle)
+            if entry:
+                self.in_flight[ReceiptHandle] = (entry[0], time.monotonic() + VisibilityTimeout)
+        return {}
+
+# ---------------------------------------------------------------------------
+# Synthetic audio and a downloader that serves it
+# ---------------------------------------------------------------------------
+
+def write_synthetic_audio(path, duration, seed=0, block_seconds=60):
+    """
+    Write speech-like 16 kHz mono audio: syllable-rate modulated tones with
+    pauses and background noise. Written in blocks so long videos do not
+    need to fit in memory.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration * SAMPLE_RATE)
+    with sf.SoundFile(path, "w", samplerate=SAMPLE_RATE, channels=1, subtype="PCM_16") as f:
+        for start in range(0, total, block_seconds * SAMPLE_RATE):
+            n = min(block_seconds * SAMPLE_RATE, total - start)
+            t = (np.arange(n) + start) / SAMPLE_RATE
+            pitch = 120 + 40 * np.sin(2 * np.pi * 0.3 * t)
+            voice = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+            syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+            pauses = (np.sin(2 * np.pi * 0.1 * t + rng.uniform(0, 2 * np.pi)) > -0.6)
+            block = 0.3 * voice * syllables * pauses + 0.01 * rng.standard_normal(n)
+            f.write(block.astype(np.float32))
+
+class FakeAudioStream:
+    """
+    Stands in for a ProgressiveAudioStream: yields chunks of a local 16 kHz
+    WAV, each after the time its share of the file would take to download
+    """
+
+    def __init__(self, wav_file, chunk_size=30, fetch_seconds=0.0):
+        self.wav_file = wav_file
+        self.chunk_size = chunk_size
+        self.fetch_seconds = fetch_seconds
+        self.completed = False
+        self.bytes_downloaded = 0
+        self.download_seconds = None
+        self._closed = False
+
+    def __iter__(self):
+        started = time.perf_counter()
+        size = os.path.getsize(self.wav_file)
+        with sf.SoundFile(self.wav_file) as f:
+            frames = f.frames
+            blocks = f.blocks(blocksize=self.chunk_size * SAMPLE_RATE, dtype="float32", always_2d=True)
+            for i, block in enumerate(blocks):
+                if self._closed:
+                    return
+                if self.fetch_seconds:
+                    time.sleep(self.fetch_seconds * len(block) / frames)
+                self.bytes_downloaded += size * len(block) // frames
+                yield i, block.mean(axis=1)
+        self.download_seconds = time.perf_counter() - started
+        self.completed = not self._closed
+
+    def close(self):
+        self._closed = True
+
+class FakeDownloader(YouTubeDownloader):
+    """Serves synthetic or fixture audio instead of fetching from YouTube"""
+
+    def __init__(self, temp_dir, durations, fixture=None, download_mbps=0.0, use_ffmpeg=False):
+        super().__init__(temp_dir)
+        self.durations = durations
+        self.fixture = fixture
+        self.download_mbps = download_mbps
+        self.use_ffmpeg = use_ffmpeg
+
+    def _write_source(self, youtube_url, output_dir):
+        """Write the video's audio to output_dir and record its metadata"""
+        video_id = self.extract_video_id(youtube_url)
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, "source.wav")
+
+        if self.fixture:
+            shutil.copyfile(self.fixture, output_file)
+            duration = sf.info(self.fixture).duration
+        else:
+            duration = self.durations[video_id]
+            write_synthetic_audio(output_file, duration, seed=sum(map(ord, video_id)))
+
+        self.metadata_cache.put(video_id, {
+            "title": f"Benchmark video {video_id}",
+            "duration": duration,
+            "channel": "benchmark",
+            "upload_date": None,
+        })
+        return output_file
+
+    def _fetch_seconds(self, path):
+        """How long the file would take to download at download_mbps"""
+        if self.download_mbps <= 0:
+            return 0.0
+        return os.path.getsize(path) * 8 / (self.download_mbps * 1e6)
+
+    def download(self, youtube_url, output_dir):
+        output_file = self._write_source(youtube_url, output_dir)
+        # Simulate the network: sleep as long as the file would take to fetch
+        time.sleep(self._fetch_seconds(output_file))
+        return output_file
+
+    def convert_to_wav(self, input_file, output_dir=None):
+        if self.use_ffmpeg:
+            return super().convert_to_wav(input_file, output_dir)
+        return input_file  # already 16 kHz mono
+
+    def stream_audio(self, youtube_url, output_dir, chunk_size=30):
+        source = self._write_source(youtube_url, output_dir)
+        info = sf.info(source)
+        wav_file = source
+        if info.samplerate != SAMPLE_RATE or info.channels != 1:
+            wav_file = YouTubeDownloader.convert_to_wav(self, source, output_dir)
+        return FakeAudioStream(wav_file, chunk_size, fetch_seconds=self._fetch_seconds(source))
+
+# ---------------------------------------------------------------------------
+# Stub model
+# ---------------------------------------------------------------------------
+
+STUB_WORDS = ("we", "keep", "going", "and", "the", "work", "is", "never", "done", "today")
+
+def _audio_seconds(audio):
+    if isinstance(audio, np.ndarray):
+        return len(audio) / SAMPLE_RATE
+    return sf.info(audio).duration
+
+class StubModel:
+    """
+    Stands in for a WhisperX pipeline: sleeps for audio length x rtf and
+    returns one segment per 5 seconds, some of them containing the phrase.
+    """
+
+    def __init__(self, rtf, phrase, phrase_rate=0.1, seed=0):
+        self.rtf = rtf
+        self.phrase = phrase
+        self.phrase_rate = phrase_rate
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio, batch_size=16, language="en", **kwargs):
+        seconds = _audio_seconds(audio)
+        time.sleep(seconds * self.rtf)
+        segments = []
+        start = 0.0
+        while start < seconds:
+            end = min(start + 5.0, seconds)
+            with self._lock:
+                words = list(self._rng.choice(STUB_WORDS, size=10))
+                if self._rng.random() < self.phrase_rate:
+                    words[self._rng.integers(len(words))] = self.phrase
+            segments.append({"start": start, "end": end, "text": " " + " ".join(words)})
+            start = end
+        return {"segments": segments, "language": language}
+
+def stub_align(segments, alignment_model, metadata, audio, device="cpu", **kwargs):
+    """Spread each segment's words evenly over the segment"""
+    aligned = []
+    for segment in segments:
+        words = segment["text"].split()
+        step = (segment["end"] - segment["start"]) / max(len(words), 1)
+        aligned.append(dict(segment, words=[
+            {"word": w, "start": segment["start"] + i * step, "end": segment["start"] + (i + 1) * step, "score": 0.9}
+            for i, w in enumerate(words)
+        ]))
+    return {"segments": aligned}
+
+def install_stub_model(worker, rtf, phrase, draft_rtf=None):
+    """Replace the worker's WhisperX models (and the speculative draft model) with StubModel"""
+    worker.transcriber.model = StubModel(rtf, phrase)
+    worker.transcriber.draft_model = StubModel(rtf if draft_rtf is None else draft_rtf, phrase)
+    worker.transcriber.draft_model_name = worker.draft_model
+    # Any non-None value keeps load_model from loading the real alignment model
+    worker.transcriber.alignment_model = "stub"
+    worker.transcriber.metadata = None
+
+# ---------------------------------------------------------------------------
+# Benchmark run
+# ---------------------------------------------------------------------------
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def summarize_traces(trace_file):
+    """Aggregate per-stage latency from a JSON-lines trace file"""
+    stage_walls = defaultdict(list)
+    chunk_walls = []
+    statuses = Counter()
+    audio_seconds = 0.0
+    with open(trace_file, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            statuses[record["status"]] += 1
+            summary = record["summary"]
+            audio_seconds += summary.get("audio_duration") or 0
+            for stage, values in summary["stages"].items():
+                stage_walls[stage].append(values["wall"])
+            chunk_walls.extend(chunk["wall"] for chunk in record.get("chunks", []))
+
+    stages = {stage: {"mean": round(sum(v) / len(v), 4), "p50": percentile(v, 0.5), "p95": percentile(v, 0.95)}
+              for stage, v in sorted(stage_walls.items())}
+    chunks = {"count": len(chunk_walls), "p50": percentile(chunk_walls, 0.5), "p95": percentile(chunk_walls, 0.95)}
+    return dict(statuses), audio_seconds, stages, chunks
+
+def run_benchmark(args):
+    """Run one benchmark configuration and return its result record"""
+    work_dir = tempfile.mkdtemp(prefix="ytt-bench-")
+    trace_file = os.path.join(work_dir, "trace.jsonl")
+
+    s3 = FakeS3(latency=args.s3_latency)
+    sqs = FakeSQS(latency=args.s3_latency)
+    aws_clients.reset_clients()
+    aws_clients.register_client('s3', BENCH_REGION, s3)
+    aws_clients.register_client('sqs', BENCH_REGION, sqs)
+
+    # Enqueue the videos
+    durations = {}
+    for i in range(args.videos):
+        video_id = f"bench{i:06d}"
+        durations[video_id] = args.durations[i % len(args.durations)]
+        sqs.send_message(QueueUrl=BENCH_QUEUE_URL, MessageBody=json.dumps({
+            "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
+            "phrase": args.phrase,
+        }))
+
+    # Workers are built on the main thread (they install signal handlers)
+    workers = []
+    for _ in range(args.workers):
+        worker = Worker(
+            phrase=args.phrase,
+            temp_dir=os.path.join(work_dir, "temp"),
+            queue_url=BENCH_QUEUE_URL,
+            region=BENCH_REGION,
+            s3_bucket=BENCH_BUCKET,
+            batch_size=args.videos,
+            poll_interval=0,
+            use_gpu=not args.cpu,
+            audio_cache_gb=0,
+            s3_encoding=args.s3_encoding,
+            trace_file=trace_file,
+            low_memory=args.low_memory,
+            vad_prepass=args.vad_prepass,
+            vad_backend=args.vad_backend,
+            cpu_compute_type=args.cpu_compute_type,
+            model_name=args.model if args.model != "stub" else "small.en",
+            speculative=args.speculative,
+            progressive=args.progressive
+        )
+        worker.downloader = FakeDownloader(os.path.join(work_dir, "temp"), durations, fixture=args.fixture,
+                                           download_mbps=args.download_mbps, use_ffmpeg=args.ffmpeg)
+        if args.model == "stub":
+            install_stub_model(worker, args.stub_rtf, args.phrase, args.stub_draft_rtf)
+        workers.append(worker)
+
+    if args.model == "stub":
+        transcriber_module.whisperx = types.SimpleNamespace(align=stub_align)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker.process_batch, name=f"bench-worker-{i}")
+               for i, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for worker in workers:
+        worker.uploader.flush()
+    elapsed = time.perf_counter() - started
+
+    statuses, audio_seconds, stages, chunks = summarize_traces(trace_file) if os.path.exists(trace_file) \
+        else ({}, 0.0, {}, {})
+    completed = statuses.get("completed", 0)
+
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "label": args.label,
+        "config": {
+            "videos": args.videos,
+            "durations": args.durations,
+            "workers": args.workers,
+            "model": args.model,
+            "stub_rtf": args.stub_rtf if args.model == "stub" else None,
+            "download_mbps": args.download_mbps,
+            "s3_latency": args.s3_latency,
+            "s3_encoding": args.s3_encoding,
+            "ffmpeg": args.ffmpeg,
+            "low_memory": args.low_memory,
+            "cpu_compute_type": args.cpu_compute_type if args.cpu else None,
+            "speculative": args.speculative,
+            "progressive": args.progressive,
+            "vad_prepass": args.vad_backend if args.vad_prepass else None,
+            "fixture": args.fixture,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "jobs": statuses,
+        "jobs_per_hour": round(completed / elapsed * 3600, 2) if elapsed else None,
+        "audio_hours_per_hour": round(audio_seconds / elapsed, 2) if elapsed else None,
+        "stages": stages,
+        "chunks": chunks,
+        "api_calls": {"s3": dict(s3.calls), "sqs": dict(sqs.calls)},
+        "s3_bytes_written": s3.bytes_written,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    else:
+        result["work_dir"] = work_dir
+    return result
+
+def print_report(result):
+    """Print a human-readable summary"""
+    print(f"\nBenchmark: {result['config']['videos']} videos, {result['config']['workers']} worker(s), "
+          f"model={result['config']['model']}")
+    print(f"  Elapsed:          {result['elapsed_seconds']:.1f}s")
+    print(f"  Jobs:             {result['jobs']}")
+    print(f"  Jobs/hour:        {result['jobs_per_hour']}")
+    print(f"  Audio hours/hour: {result['audio_hours_per_hour']}")
+    print(f"  Peak RSS:         {result['peak_rss_mb']} MB")
+    print("  Stage latency (s):")
+    for stage, values in result["stages"].items():
+        print(f"    {stage:<14} mean={values['mean']:<9} p50={values['p50']:<9} p95={values['p95']}")
+    print(f"  Chunks:           {result['chunks']}")
+    print(f"  S3 calls:         {result['api_calls']['s3']}")
+    print(f"  SQS calls:        {result['api_calls']['sqs']}")
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the worker end to end against in-memory S3/SQS and synthetic audio."
+    )
+    parser.add_argument("--videos", "-n", type=int, default=10,
+                        help="Number of videos to enqueue (Default: 10)")
+    parser.add_argument("--durations", type=str, default="60,300",
+                        help="Comma-separated video lengths in seconds, cycled over videos (Default: '60,300')")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Worker instances polling the queue concurrently (Default: 1)")
+    parser.add_argument("--model", "-m", type=str, default="stub",
+                        help="'stub' for a sleep-based fake, or a WhisperX model name such as 'tiny.en' (Default: 'stub')")
+    parser.add_argument("--stub_rtf", type=float, default=0.02,
+                        help="Stub model processing time per second of audio (Default: 0.02)")
+    parser.add_argument("--fixture", type=str, default=None,
+                        help="Serve this audio file for every video instead of synthetic audio")
+    parser.add_argument("--download_mbps", type=float, default=0.0,
+                        help="Simulated download bandwidth in Mbit/s, 0 for instant (Default: 0)")
+    parser.add_argument("--s3_latency", type=float, default=0.0,
+                        help="Simulated latency per S3/SQS call in seconds (Default: 0)")
+    parser.add_argument("--s3_encoding", type=str, default="gzip",
+                        help="Content encoding for uploads (Default: 'gzip')")
+    parser.add_argument("--ffmpeg", action="store_true",
+                        help="Run the real ffmpeg WAV conversion")
+    parser.add_argument("--low_memory", action="store_true",
+                        help="Run the transcriber in low-memory (spill to disk) mode")
+    parser.add_argument("--speculative", action="store_true",
+                        help="Draft with a small model and refine only around phrase candidates")
+    parser.add_argument("--progressive", action="store_true",
+                        help="Transcribe chunks while the audio downloads (paced by --download_mbps)")
+    parser.add_argument("--stub_draft_rtf", type=float, default=0.002,
+                        help="Real-time factor of the stub draft model for --speculative (Default: 0.002)")
+    parser.add_argument("--vad_prepass", action="store_true",
+                        help="Run the whole-file VAD pre-pass and skip chunks without speech")
+    parser.add_argument("--vad_backend", type=str, default="energy", choices=["auto", "pyannote", "energy"],
+                        help="Speech detector for --vad_prepass (Default: 'energy', which the stub model supports)")
+    parser.add_argument("--cpu", action="store_true",
+                        help="Run a real model on CPU")
+    parser.add_argument("--cpu_compute_type", type=str, default="int8", choices=["int8", "int8_float32"],
+                        help="Compute type with --cpu (Default: 'int8')")
+    parser.add_argument("--phrase", "-p", type=str, default="hustle",
+                        help="Phrase to scan for (Default: 'hustle')")
+    parser.add_argument("--label", type=str, default=None,
+                        help="Free-form label stored with the result")
+    parser.add_argument("--output", "-o", type=str, default="benchmark_results.jsonl",
+                        help="JSON-lines file the result is appended to (Default: 'benchmark_results.jsonl')")
+    parser.add_argument("--keep", action="store_true",
+                        help="Keep the temporary work directory")
+    parser.add_argument("--log_level", type=str, default="WARNING",
+                        help="Log level during the run (Default: 'WARNING')")
+    args = parser.parse_args()
+    args.durations = [float(d) for d in args.durations.split(",")]
+    return args
+
+def main():
+    """Main entry point"""
+    args = parse_arguments()
+    logging.getLogger().setLevel(args.log_level)
+
+    result = run_benchmark(args)
+    print_report(result)
+
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"\nResult appended to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# scripts/bulk_enqueue.py - Expand files, channels and playlists into videos and enqueue them in bulk
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+# Add the parent directory to the Python path so we can import from src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.metadata_cache import VideoMetadataCache
+from src.scheduler import parse_lane, route, PRIORITIES, LANE_NORMAL, DEFAULT_LONG_VIDEO_SECONDS
+from src.utils import aws_clients
+from src.utils.retry import RetryPolicy
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SQS_BATCH_SIZE = 10  # send_message_batch limit
+DEFAULT_SENDERS = 16
+DEFAULT_LIST_TTL_HOURS = 24
+DEFAULT_METADATA_DIR = "./temp/.metadata"
+DEFAULT_S3_BUCKET = "youtube-transcripts"
+
+VIDEO_ID_PATTERN = re.compile(r'^[0-9A-Za-z_-]{11}$')
+VIDEO_URL_PATTERN = re.compile(r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|live/)|youtu\.be/)([0-9A-Za-z_-]{11})')
+
+def video_url(video_id):
+    """Canonical watch URL for a video ID"""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+def parse_source(line):
+    """
+    Classify one input line
+
+    Returns:
+        ('video', video_id) for a video URL or bare ID, ('list', url) for a
+        channel or playlist URL, or None for blank lines and comments
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if VIDEO_ID_PATTERN.match(line):
+        return ("video", line)
+    match = VIDEO_URL_PATTERN.search(line)
+    if match and "list=" not in line:
+        return ("video", match.group(1))
+    return ("list", line)
+
+class ListExpander:
+    """
+    Expands channels and playlists into videos with yt-dlp's flat extraction
+
+    Flat extraction reads the listing pages only (no per-video requests), so
+    a 5,000-video channel takes seconds. Each expansion is cached on disk
+    for list_ttl seconds, and the per-video title, duration and channel go
+    into a VideoMetadataCache (the downloader's cache format). Durations
+    route videos to lanes and let workers schedule by cost.
+    """
+
+    def __init__(self, metadata_cache, list_ttl=DEFAULT_LIST_TTL_HOURS * 3600, max_videos=None):
+        self.metadata_cache = metadata_cache
+        self.list_dir = os.path.join(metadata_cache.cache_dir, "lists")
+        self.list_ttl = list_ttl
+        self.max_videos = max_videos
+        os.makedirs(self.list_dir, exist_ok=True)
+
+    def _list_path(self, url):
+        return os.path.join(self.list_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def expand(self, url, refresh=False):
+        """
+        List the videos of a channel or playlist
+
+        Args:
+            url: Channel (/@name, /channel/...) or playlist URL
+            refresh: Ignore a cached expansion
+
+        Returns:
+            List of dicts with 'video_id', 'title', 'duration' and 'channel'
+        """
+        path = self._list_path(url)
+        if not refresh:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if time.time() - cached["expanded_at"] < self.list_ttl:
+                    logger.info(f"Using cached listing of {url} ({len(cached['videos'])} videos)")
+                    return cached["videos"]
+            except (FileNotFoundError, ValueError, KeyError):
+                pass
+
+        start = time.perf_counter()
+        info = self._extract(url)
+        videos = []
+        self._collect(info, videos, set())
+        logger.info(f"Expanded {url} to {len(videos)} videos in {time.perf_counter() - start:.1f}s")
+
+        for video in videos:
+            if video["duration"] and self.metadata_cache.get(video["video_id"]) is None:
+                self.metadata_cache.put(video["video_id"], {k: video[k] for k in ("title", "duration", "channel")})
+
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "expanded_at": time.time(), "videos": videos}, f)
+        os.replace(tmp_path, path)
+        return videos
+
+    def _extract(self, url):
+        """Flat info dict of a listing, in-process when yt_dlp is importable"""
+        if yt_dlp is not None:
+            options = {"extract_flat": "in_playlist", "quiet": True, "skip_download": True}
+            if self.max_videos:
+                options["playlistend"] = self.max_videos
+            with yt_dlp.YoutubeDL(options) as ydl:
+                return ydl.extract_info(url, download=False)
+
+        command = ["yt-dlp", "--flat-playlist", "-J", url]
+        if self.max_videos:
+            command[1:1] = ["--playlist-end", str(self.max_videos)]
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        return json.loads(result.stdout)
+
+    def _collect(self, info, videos, seen, depth=0):
+        """Walk nested listings (a channel lists its Videos/Shorts/Live tabs) and collect the videos"""
+        for entry in info.get("entries") or []:
+            if not entry:
+                continue
+            if self.max_videos and len(videos) >= self.max_videos:
+                return
+            if entry.get("entries") is not None:
+                self._collect(entry, videos, seen, depth + 1)
+                continue
+
+            entry_url = entry.get("url") or ""
+            video_id = entry.get("id")
+            if entry.get("ie_key") == "YoutubeTab" or entry.get("_type") == "playlist" \
+                    or not (video_id and VIDEO_ID_PATTERN.match(video_id)):
+                # A tab or sub-playlist that flat extraction did not open
+                if depth < 2 and entry_url:
+                    self._collect(self._extract(entry_url), videos, seen, depth + 1)
+                continue
+
+            if video_id not in seen:
+                seen.add(video_id)
+                videos.append({
+                    "video_id": video_id,
+                    "title": entry.get("title"),
+                    "duration": entry.get("duration"),
+                    "channel": entry.get("channel") or entry.get("uploader") or info.get("channel"),
+                })
+
+def existing_video_ids(s3, bucket, prefix="results/"):
+    """
+    Video IDs that already have results in S3
+
+    One list call per 1,000 videos (common prefixes only), instead of a
+    HEAD request per video.
+    """
+    ids = set()
+    kwargs = {"Bucket": bucket, "Prefix": prefix, "Delimiter": "/"}
+    while True:
+        response = s3.list_objects_v2(**kwargs)
+        for common in response.get("CommonPrefixes", []):
+            ids.add(common["Prefix"][len(prefix):].rstrip("/"))
+        if not response.get("IsTruncated"):
+            return ids
+        kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+def send_batch(sqs, queue_url, entries, retry_policy):
+    """
+    Send up to 10 messages with send_message_batch, retrying the entries SQS rejected
+
+    Entries rejected as the sender's fault (malformed) are not retried;
+    throttled and server-side failures are, with backoff.
+
+    Returns:
+        Set of entry Ids that could not be sent
+    """
+    rejected = set()
+    attempt = 1
+    while True:
+        response = sqs.send_message_batch(QueueUrl=queue_url, Entries=entries)
+        retry_ids = set()
+        for failure in response.get("Failed", []):
+            if failure.get("SenderFault"):
+                logger.error(f"Message rejected: {failure.get('Code')} {failure.get('Message')}")
+                rejected.add(failure["Id"])
+            else:
+                retry_ids.add(failure["Id"])
+
+        if not retry_ids:
+            return rejected
+        if not retry_policy.should_retry(attempt):
+            return rejected | retry_ids
+
+        time.sleep(retry_policy.delay(attempt))
+        attempt += 1
+        entries = [entry for entry in entries if entry["Id"] in retry_ids]
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Expand files, channels and playlists into videos and send them to the SQS queue in bulk."
+    )
+    parser.add_argument("--file", "-f", action="append", default=[],
+                        help="File with one video URL/ID, playlist URL or channel URL per line (repeatable)")
+    parser.add_argument("--channel", action="append", default=[],
+                        help="Channel URL, e.g. https://www.youtube.com/@name (repeatable)")
+    parser.add_argument("--playlist", action="append", default=[],
+                        help="Playlist URL (repeatable)")
+    parser.add_argument("--youtube_url", "-y", action="append", default=[],
+                        help="Single video URL or ID (repeatable)")
+    parser.add_argument("--queue_url", "-q", type=str, required=True,
+                        help="URL of the SQS queue (the 'normal' lane)")
+    parser.add_argument("--lane", action="append", default=[],
+                        help="Priority lane as 'name,weight,queue_url' (repeatable, same as the worker's --lane); "
+                             "videos are routed by --priority and their duration")
+    parser.add_argument("--region", "-r", type=str, default="us-east-2",
+                        help="AWS region for SQS and S3 (Default: 'us-east-2')")
+    parser.add_argument("--phrase", "-p", type=str,
+                        help="Optional custom phrase to search for in every video")
+    parser.add_argument("--quality", type=str, choices=["low", "normal", "high"],
+                        help="Optional quality hint for workers running with --adaptive_model")
+    parser.add_argument("--mode", type=str, choices=["full", "speculative", "keywords"],
+                        help="Optional transcription mode for every video")
+    parser.add_argument("--priority", type=str, choices=PRIORITIES,
+                        help="Optional priority for every video")
+    parser.add_argument("--long_video_seconds", type=float, default=DEFAULT_LONG_VIDEO_SECONDS,
+                        help=f"Videos at least this long go to the 'long' lane. "
+                             f"(Default: {DEFAULT_LONG_VIDEO_SECONDS})")
+    parser.add_argument("--s3_bucket", type=str, default=DEFAULT_S3_BUCKET,
+                        help=f"Bucket checked for existing results. (Default: '{DEFAULT_S3_BUCKET}')")
+    parser.add_argument("--no_dedupe", action="store_true",
+                        help="Also send videos that already have results in S3")
+    parser.add_argument("--sent_log", type=str,
+                        help="File of video IDs already sent; sent IDs are appended, so a re-run skips them")
+    parser.add_argument("--metadata_dir", type=str, default=DEFAULT_METADATA_DIR,
+                        help=f"Metadata cache directory. (Default: '{DEFAULT_METADATA_DIR}')")
+    parser.add_argument("--list_ttl_hours", type=float, default=DEFAULT_LIST_TTL_HOURS,
+                        help=f"How long channel/playlist listings are cached. (Default: {DEFAULT_LIST_TTL_HOURS})")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached channel/playlist listings")
+    parser.add_argument("--max_videos", type=int,
+                        help="Maximum videos taken from each channel or playlist")
+    parser.add_argument("--senders", type=int, default=DEFAULT_SENDERS,
+                        help=f"Concurrent send_message_batch calls. (Default: {DEFAULT_SENDERS})")
+    parser.add_argument("--dry_run", action="store_true",
+                        help="Expand and dedupe, but send nothing")
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_arguments()
+    start = time.perf_counter()
+
+    # 1. Collect sources in input order
+    sources = [("video", v) for v in args.youtube_url]
+    for path in args.file:
+        with open(path, "r", encoding="utf-8") as f:
+            sources += [source for source in map(parse_source, f) if source]
+    sources += [("list", url) for url in args.channel + args.playlist]
+    sources = [parse_source(value) if kind == "video" else (kind, value) for kind, value in sources]
+    sources = [source for source in sources if source]
+
+    # 2. Expand channels and playlists; dedupe within the input
+    metadata_cache = VideoMetadataCache(args.metadata_dir)
+    expander = ListExpander(metadata_cache, list_ttl=args.list_ttl_hours * 3600, max_videos=args.max_videos)
+    video_ids = []
+    durations = {}
+    seen = set()
+    for kind, value in sources:
+        if kind == "video":
+            found = [{"video_id": value, "duration": None}]
+        else:
+            try:
+                found = expander.expand(value, refresh=args.refresh)
+            except Exception as e:
+                logger.error(f"Could not expand {value}: {str(e)}")
+                continue
+        for video in found:
+            if video["video_id"] not in seen:
+                seen.add(video["video_id"])
+                video_ids.append(video["video_id"])
+                durations[video["video_id"]] = video.get("duration")
+    total = len(video_ids)
+
+    # 3. Dedupe against existing results and earlier runs
+    skipped_existing = skipped_sent = 0
+    if not args.no_dedupe:
+        existing = existing_video_ids(aws_clients.get_client("s3", args.region), args.s3_bucket)
+        before = len(video_ids)
+        video_ids = [v for v in video_ids if v not in existing]
+        skipped_existing = before - len(video_ids)
+    if args.sent_log and os.path.exists(args.sent_log):
+        with open(args.sent_log, "r", encoding="utf-8") as f:
+            already_sent = {line.strip() for line in f if line.strip()}
+        before = len(video_ids)
+        video_ids = [v for v in video_ids if v not in already_sent]
+        skipped_sent = before - len(video_ids)
+
+    # 4. Build messages and route them to lanes
+    lanes = {LANE_NORMAL: args.queue_url}
+    lanes.update((lane.name, lane.queue_url) for lane in map(parse_lane, args.lane))
+    by_queue = {}
+    lane_counts = {}
+    for video_id in video_ids:
+        duration = durations.get(video_id)
+        if duration is None:
+            cached = metadata_cache.get(video_id)
+            duration = cached.get("duration") if cached else None
+
+        message = {"youtube_url": video_url(video_id)}
+        for field in ("phrase", "quality", "mode", "priority"):
+            if getattr(args, field):
+                message[field] = getattr(args, field)
+        if duration:
+            message["duration"] = duration
+
+        lane = route(args.priority, duration, args.long_video_seconds)
+        if lane not in lanes:
+            lane = LANE_NORMAL
+        lane_counts[lane] = lane_counts.get(lane, 0) + 1
+        by_queue.setdefault(lanes[lane], []).append((video_id, json.dumps(message)))
+
+    logger.info(f"{total} videos from {len(sources)} sources: {skipped_existing} already have results, "
+                f"{skipped_sent} already sent, {len(video_ids)} to send {lane_counts}")
+    if args.dry_run or not video_ids:
+        return
+
+    # 5. Send in batches of 10 from concurrent senders
+    aws_clients.configure(max_pool_connections=args.senders + 2)
+    sqs = aws_clients.get_client("sqs", args.region)
+    retry_policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=10.0)
+    sent = failed = 0
+    sent_log = open(args.sent_log, "a", encoding="utf-8") if args.sent_log else None
+    try:
+        with ThreadPoolExecutor(max_workers=args.senders) as executor:
+            futures = {}
+            for queue_url, messages in by_queue.items():
+                for i in range(0, len(messages), SQS_BATCH_SIZE):
+                    chunk = messages[i:i + SQS_BATCH_SIZE]
+                    entries = [{"Id": str(k), "MessageBody": body} for k, (_, body) in enumerate(chunk)]
+                    futures[executor.submit(send_batch, sqs, queue_url, entries, retry_policy)] = chunk
+
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    failed_ids = future.result()
+                except Exception as e:
+                    logger.error(f"Batch send failed: {str(e)}")
+                    failed_ids = {str(k) for k in range(len(chunk))}
+                failed += len(failed_ids)
+                sent += len(chunk) - len(failed_ids)
+                if sent_log:
+                    sent_log.write("".join(f"{video_id}\n" for k, (video_id, _) in enumerate(chunk)
+                                           if str(k) not in failed_ids))
+    finally:
+        if sent_log:
+            sent_log.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Sent {sent} messages ({failed} failed) in {elapsed:.1f}s at {datetime.now().isoformat()}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
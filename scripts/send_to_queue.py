@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Now we can import from src if needed
 # For example, if you need to use the downloader:
 # from src.downloader import YouTubeDownloader
+from src.scheduler import parse_lane, route, PRIORITIES, LANE_NORMAL
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -44,6 +45,37 @@ def parse_arguments():
         type=str,
         help="Optional custom phrase to search for in the video"
     )
+    parser.add_argument(
+        "--quality",
+        type=str,
+        choices=["low", "normal", "high"],
+        help="Optional quality hint for workers running with --adaptive_model"
+    )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        choices=["full", "speculative", "keywords"],
+        help="Optional transcription mode, overriding the worker's --speculative/--keyword_spotting setting"
+    )
+    parser.add_argument(
+        "--priority",
+        type=str,
+        choices=PRIORITIES,
+        help="Optional priority; with --lane it picks the lane the message is sent to"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Optional estimated video duration in seconds; workers schedule lanes by it, "
+             "and long videos are sent to the 'long' lane"
+    )
+    parser.add_argument(
+        "--lane",
+        action="append",
+        default=[],
+        help="Priority lane as 'name,weight,queue_url' (repeatable, same as the worker's --lane); "
+             "--queue_url is the 'normal' lane"
+    )
     return parser.parse_args()
 
 def validate_youtube_url(url):
@@ -74,11 +106,31 @@ def main():
         if args.phrase:
             message['phrase'] = args.phrase
             
+        # Add quality hint and transcription mode if provided
+        if args.quality:
+            message['quality'] = args.quality
+        if args.mode:
+            message['mode'] = args.mode
+
+        # Add priority and duration estimate if provided
+        if args.priority:
+            message['priority'] = args.priority
+        if args.duration:
+            message['duration'] = args.duration
+
+        # Pick the lane's queue; lanes that are not configured fall back to --queue_url
+        lanes = {LANE_NORMAL: args.queue_url}
+        lanes.update((lane.name, lane.queue_url) for lane in map(parse_lane, args.lane))
+        lane = route(args.priority, args.duration)
+        if lane not in lanes:
+            lane = LANE_NORMAL
+        queue_url = lanes[lane]
+            
         message_body = json.dumps(message)
         
         # Send message to SQS queue
         response = sqs.send_message(
-            QueueUrl=args.queue_url,
+            QueueUrl=queue_url,
             MessageBody=message_body
         )
         
@@ -86,8 +138,16 @@ def main():
         print(f"YouTube URL: {args.youtube_url}")
         if args.phrase:
             print(f"Custom phrase: {args.phrase}")
+        if args.quality:
+            print(f"Quality hint: {args.quality}")
+        if args.mode:
+            print(f"Mode: {args.mode}")
+        if args.priority:
+            print(f"Priority: {args.priority}")
+        if len(lanes) > 1:
+            print(f"Lane: {lane}")
         print(f"Message ID: {response['MessageId']}")
-        print(f"Queue URL: {args.queue_url}")
+        print(f"Queue URL: {queue_url}")
         
     except Exception as e:
         print(f"Error sending message: {str(e)}")
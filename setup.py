@@ -7,6 +7,7 @@ setup(
     install_requires=[
         "boto3>=1.28.0",
         "pytubefix>=3.0.0",
+        "yt-dlp>=2023.7.6",
         "torch>=2.0.0",
         "torchaudio>=2.0.0",
         "ffmpeg-python>=0.2.0",
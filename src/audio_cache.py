@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# audio_cache.py - On-disk LRU cache of decoded audio shared across jobs and restarts
+
+import os
+import shutil
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORMAT = "wav16k"
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3  # 20 GB
+
+class AudioCache:
+    """
+    Size-bounded LRU cache of decoded audio files, addressed by video ID and format.
+
+    Entries are written atomically (temp file + rename), so a crash never
+    leaves a truncated file under a valid key. File mtimes track recency:
+    a hit touches the file and eviction removes the oldest entries first.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the audio cache
+
+        Args:
+            cache_dir: Directory holding cached audio files
+            max_bytes: Total size the cache is trimmed to after each insert
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id, fmt):
+        """Get the cache path for a video and format"""
+        return os.path.join(self.cache_dir, f"{video_id}.{fmt}.wav")
+
+    def get(self, video_id, fmt=DEFAULT_FORMAT):
+        """
+        Look up cached audio
+
+        Args:
+            video_id: YouTube video ID
+            fmt: Audio format key (e.g. 'wav16k' for 16 kHz mono WAV)
+
+        Returns:
+            Path to the cached file, or None on a miss
+        """
+        path = self._path(video_id, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        logger.info(f"Audio cache hit for {video_id} ({fmt})")
+        return path
+
+    def put(self, video_id, audio_file, fmt=DEFAULT_FORMAT):
+        """
+        Add an audio file to the cache
+
+        The source file is hard-linked when possible (so it can be deleted
+        with its temp directory afterwards) and copied otherwise.
+
+        Args:
+            video_id: YouTube video ID
+            audio_file: Path to the decoded audio file
+            fmt: Audio format key
+
+        Returns:
+            Path to the cached file, or None if it could not be cached
+        """
+        path = self._path(video_id, fmt)
+        tmp_path = os.path.join(self.cache_dir, f".{video_id}.{fmt}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        try:
+            try:
+                os.link(audio_file, tmp_path)
+            except OSError:
+                shutil.copyfile(audio_file, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache audio for {video_id}: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return None
+
+        logger.info(f"Cached audio for {video_id} ({fmt})")
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+
+        Args:
+            keep: Path that must not be evicted (the entry just added)
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if name.startswith("."):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            for mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    self.evictions += 1
+                    logger.info(f"Evicted {os.path.basename(path)} from audio cache")
+                except FileNotFoundError:
+                    pass
+
+    def get_stats(self):
+        """Get cache hit/miss/eviction counters"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
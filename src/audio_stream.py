@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+# audio_stream.py - Progressive download and decode of audio into fixed-size chunks
+
+import time
+import wave
+import queue
+import logging
+import threading
+import subprocess
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+WAV_HEADER_SIZE = 44  # header written by the wave module for PCM data
+FEED_RANGE_SIZE = 10 * 1024 * 1024
+
+class AudioStreamError(Exception):
+    """Exception raised when the audio stream fails to download or decode"""
+    pass
+
+class ProgressiveAudioStream:
+    """
+    Downloads an audio stream, decodes it with ffmpeg as the bytes arrive and
+    yields 16 kHz mono chunks while the rest of the file is still downloading.
+
+    Decoded audio is spooled into a WAV file rather than held in memory, so a
+    slow consumer only costs disk. The WAV is complete once iteration ends
+    without an error (completed is then True), not after close().
+    """
+
+    def __init__(self, url, wav_file, chunk_size=30, headers=None, total_size=None, timeout=30):
+        """
+        Initialize the stream
+
+        Args:
+            url: Direct media URL
+            wav_file: Path of the 16 kHz mono WAV file to write
+            chunk_size: Size of yielded chunks in seconds
+            headers: HTTP headers to send with media requests
+            total_size: Size of the media in bytes, if known
+            timeout: Socket timeout in seconds
+        """
+        self.url = url
+        self.wav_file = wav_file
+        self.chunk_size = chunk_size
+        self.headers = headers or {}
+        self.total_size = total_size
+        self.timeout = timeout
+
+        self.bytes_downloaded = 0
+        self.download_seconds = None  # set once the download ended
+        self.samples_decoded = 0
+        self.completed = False  # set once ffmpeg decoded the whole download
+        self._chunks = queue.Queue()
+        self._done = object()
+        self._error = None
+        self._ffmpeg = None
+        self._threads = []
+
+    def start(self):
+        """Start downloading and decoding in background threads"""
+        self._started = time.perf_counter()
+        self._ffmpeg = subprocess.Popen([
+            "ffmpeg", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "pipe:1"
+        ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        self._threads = [
+            threading.Thread(target=self._feed, daemon=True),
+            threading.Thread(target=self._decode, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _feed(self):
+        """Download the media in sequential ranges and pipe it into ffmpeg"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        try:
+            offset = 0
+            while self.total_size is None or offset < self.total_size:
+                if self.total_size is None:
+                    range_header = f"bytes={offset}-"
+                else:
+                    range_header = f"bytes={offset}-{min(offset + FEED_RANGE_SIZE, self.total_size) - 1}"
+
+                response = session.get(self.url, headers={"Range": range_header},
+                                       timeout=self.timeout, stream=True)
+                if response.status_code not in (200, 206):
+                    raise AudioStreamError(f"HTTP {response.status_code} while streaming audio")
+
+                received = 0
+                for block in response.iter_content(chunk_size=256 * 1024):
+                    if block:
+                        self._ffmpeg.stdin.write(block)
+                        received += len(block)
+                        self.bytes_downloaded += len(block)
+
+                if self.total_size is None or received == 0:
+                    break
+                offset += received
+        except BrokenPipeError:
+            # ffmpeg exited early; _decode reports its error
+            pass
+        except Exception as e:
+            self._error = e
+        finally:
+            try:
+                self._ffmpeg.stdin.close()
+            except Exception:
+                pass
+            session.close()
+            self.download_seconds = time.perf_counter() - self._started
+
+    def _decode(self):
+        """Read decoded PCM from ffmpeg, spool it to the WAV file and queue chunk positions"""
+        bytes_per_chunk = int(self.chunk_size * SAMPLE_RATE) * SAMPLE_WIDTH
+        index = 0
+        pending = bytearray()
+
+        try:
+            with open(self.wav_file, "wb") as raw:
+                wav = wave.open(raw, "wb")
+                wav.setnchannels(1)
+                wav.setsampwidth(SAMPLE_WIDTH)
+                wav.setframerate(SAMPLE_RATE)
+
+                def emit(block):
+                    nonlocal index
+                    start_sample = self.samples_decoded
+                    wav.writeframesraw(bytes(block))
+                    raw.flush()
+                    n_samples = len(block) // SAMPLE_WIDTH
+                    self.samples_decoded += n_samples
+                    self._chunks.put((index, start_sample, n_samples))
+                    index += 1
+
+                while True:
+                    data = self._ffmpeg.stdout.read(64 * 1024)
+                    if not data:
+                        break
+                    pending.extend(data)
+                    while len(pending) >= bytes_per_chunk:
+                        emit(pending[:bytes_per_chunk])
+                        del pending[:bytes_per_chunk]
+
+                # Drop a trailing odd byte, if any, and flush the last partial chunk
+                pending = pending[:len(pending) - len(pending) % SAMPLE_WIDTH]
+                if pending:
+                    emit(pending)
+                wav.close()
+
+            if self._ffmpeg.wait() != 0 and self._error is None:
+                stderr = self._ffmpeg.stderr.read().decode("utf-8", errors="replace")
+                self._error = AudioStreamError(f"ffmpeg error (code {self._ffmpeg.returncode}): {stderr}")
+            # A stream closed early kills ffmpeg, so its WAV never counts as complete
+            self.completed = self._ffmpeg.returncode == 0 and self._error is None
+        except Exception as e:
+            self._error = self._error or e
+        finally:
+            self._chunks.put(self._done)
+
+    def _read_chunk(self, start_sample, n_samples):
+        """Read a decoded chunk back from the spooled WAV file as float32"""
+        samples = np.fromfile(
+            self.wav_file,
+            dtype="<i2",
+            count=n_samples,
+            offset=WAV_HEADER_SIZE + start_sample * SAMPLE_WIDTH
+        )
+        return samples.astype(np.float32) / 32768.0
+
+    def __iter__(self):
+        """
+        Yield (chunk_index, audio) pairs as chunks finish decoding
+
+        audio is a float32 numpy array at 16 kHz, which WhisperX accepts directly.
+
+        Raises:
+            AudioStreamError: If the download or decode failed
+        """
+        while True:
+            item = self._chunks.get()
+            if item is self._done:
+                break
+            index, start_sample, n_samples = item
+            yield index, self._read_chunk(start_sample, n_samples)
+
+        for thread in self._threads:
+            thread.join()
+        if self._error is not None:
+            if isinstance(self._error, AudioStreamError):
+                raise self._error
+            raise AudioStreamError(f"Error streaming audio: {str(self._error)}")
+
+    @property
+    def duration(self):
+        """Seconds of audio decoded so far"""
+        return self.samples_decoded / SAMPLE_RATE
+
+    def close(self):
+        """Stop the download and decoder"""
+        if self._ffmpeg and self._ffmpeg.poll() is None:
+            self._ffmpeg.kill()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._ffmpeg:
+            for pipe in (self._ffmpeg.stdout, self._ffmpeg.stderr):
+                try:
+                    pipe.close()
+                except Exception:
+                    pass
@@ -0,0 +1,253 @@
+#!/usr/bin/python3
+# cpu_profile.py - CPU inference profile: int8 compute, thread counts and core pinning
+
+import os
+import json
+import time
+import logging
+import numpy as np
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+COMPUTE_AUTO = "auto"
+COMPUTE_INT8 = "int8"
+COMPUTE_INT8_FLOAT32 = "int8_float32"
+CPU_COMPUTE_TYPES = (COMPUTE_INT8, COMPUTE_INT8_FLOAT32)
+
+# Length of the startup benchmark clip; one Whisper window
+BENCHMARK_SECONDS = 30
+WARMUP_SECONDS = 5
+
+class CPUProfile:
+    """Thread, pinning and compute type settings for CPU inference in one worker process"""
+
+    def __init__(self, cores, intra_threads, inter_threads, compute_type=None, pinned=False):
+        """
+        Args:
+            cores: Logical CPU ids this process runs on
+            intra_threads: Threads per operator (CTranslate2 and torch intra-op)
+            inter_threads: Threads running independent operators (torch inter-op)
+            compute_type: CTranslate2 compute type for the Whisper model
+            pinned: Whether the process is pinned to cores
+        """
+        self.cores = list(cores)
+        self.intra_threads = intra_threads
+        self.inter_threads = inter_threads
+        self.compute_type = compute_type
+        self.pinned = pinned
+        self.benchmark = None
+
+    def to_dict(self):
+        """Serialize for the heartbeat and the profile file"""
+        return {
+            "cores": self.cores,
+            "intra_threads": self.intra_threads,
+            "inter_threads": self.inter_threads,
+            "compute_type": self.compute_type,
+            "pinned": self.pinned,
+            "benchmark": self.benchmark,
+        }
+
+def available_cores():
+    """Logical CPUs this process may run on (respects container cpusets)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def physical_cores(cores):
+    """
+    Keep one logical CPU per physical core
+
+    int8 GEMMs saturate a core's vector units, so a second hyperthread on
+    the same core adds contention rather than throughput. Falls back to
+    all given CPUs when the topology is not readable (non-Linux).
+    """
+    kept = []
+    seen = set()
+    for cpu in cores:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+                siblings = f.read().strip()
+        except OSError:
+            return list(cores)
+        if siblings not in seen:
+            seen.add(siblings)
+            kept.append(cpu)
+    return kept
+
+def plan_profile(concurrency=1, slot=0, cores=None):
+    """
+    Split the host's cores between the worker processes sharing it
+
+    Args:
+        concurrency: Number of worker processes on this host
+        slot: This worker's index among them (0-based)
+        cores: Logical CPUs to split (default: available_cores())
+
+    Returns:
+        CPUProfile without a compute type
+    """
+    cores = physical_cores(sorted(cores or available_cores()))
+    concurrency = max(1, concurrency)
+    per_worker = len(cores) // concurrency
+
+    if per_worker == 0:
+        # More workers than cores: share everything, one thread each
+        logger.warning(f"{concurrency} workers on {len(cores)} cores, CPU is oversubscribed")
+        return CPUProfile(cores, 1, 1)
+
+    slot = slot % concurrency
+    mine = cores[slot * per_worker:(slot + 1) * per_worker]
+
+    # Inference runs one stream at a time, so operators rarely run in
+    # parallel; a second inter-op thread only pays off on wide slices
+    inter = 2 if len(mine) >= 16 else 1
+    return CPUProfile(mine, len(mine), inter)
+
+def apply_profile(profile, pin=True):
+    """
+    Apply thread counts and core pinning to this process
+
+    Must run before the models are loaded: OpenMP and torch size their
+    thread pools on first use, and threads inherit the affinity of the
+    thread that creates them.
+    """
+    import torch
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(profile.intra_threads)
+
+    torch.set_num_threads(profile.intra_threads)
+    try:
+        torch.set_num_interop_threads(profile.inter_threads)
+    except RuntimeError as e:
+        # Only settable once, before any inter-op work has started
+        logger.warning(f"Could not set inter-op threads: {str(e)}")
+
+    if pin and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, profile.cores)
+            profile.pinned = True
+        except OSError as e:
+            logger.warning(f"Could not pin to cores {profile.cores}: {str(e)}")
+
+    logger.info(f"CPU profile: {profile.intra_threads} intra-op / {profile.inter_threads} inter-op "
+                f"threads on cores {profile.cores}{' (pinned)' if profile.pinned else ''}")
+
+def synthetic_speech(seconds, seed=0):
+    """Speech-like test signal: syllable-rate modulated voiced tones with pauses and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voice = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    pauses = np.sin(2 * np.pi * 0.1 * t) > -0.6
+    return (0.3 * voice * syllables * pauses + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+def benchmark_compute_types(transcriber, candidates=CPU_COMPUTE_TYPES, audio=None, seconds=BENCHMARK_SECONDS):
+    """
+    Time one transcription of the same clip with each compute type
+
+    Args:
+        transcriber: Transcriber on the CPU device; its model is reloaded per candidate
+        candidates: CTranslate2 compute types to try
+        audio: Path of a short speech clip (default: synthetic_speech)
+        seconds: Seconds of audio to transcribe
+
+    Returns:
+        Dict of compute type -> {"load_seconds", "seconds", "rtf", "segments"};
+        types that fail to load or run have an "error" instead
+    """
+    import whisperx
+
+    if audio is None:
+        clip = synthetic_speech(seconds)
+    else:
+        clip = whisperx.load_audio(audio)[:int(seconds * SAMPLE_RATE)]
+    clip_seconds = len(clip) / SAMPLE_RATE
+
+    results = {}
+    for compute_type in candidates:
+        try:
+            transcriber.compute_type = compute_type
+            transcriber.model = None
+            load_start = time.perf_counter()
+            transcriber.load_model()
+            load_seconds = time.perf_counter() - load_start
+
+            # First call pays for allocations and kernel selection
+            transcriber.model.transcribe(clip[:WARMUP_SECONDS * SAMPLE_RATE], batch_size=transcriber.batch_size,
+                                         language="en")
+
+            start = time.perf_counter()
+            result = transcriber.model.transcribe(clip, batch_size=transcriber.batch_size, language="en")
+            elapsed = time.perf_counter() - start
+            results[compute_type] = {
+                "load_seconds": round(load_seconds, 3),
+                "seconds": round(elapsed, 3),
+                "rtf": round(elapsed / clip_seconds, 4),
+                "segments": len(result["segments"]),
+            }
+            logger.info(f"Benchmark {compute_type}: {elapsed:.2f}s for {clip_seconds:.0f}s of audio")
+        except Exception as e:
+            logger.warning(f"Benchmark {compute_type} failed: {str(e)}")
+            results[compute_type] = {"error": str(e)}
+
+    if not any(r.get("segments") for r in results.values() if "error" not in r):
+        logger.warning("No speech was detected in the benchmark clip, so timings mostly cover VAD; "
+                       "pass a real speech clip for representative numbers")
+    return results
+
+def configure_cpu_inference(transcriber, compute_type=COMPUTE_AUTO, concurrency=1, slot=0, pin=True,
+                            benchmark_audio=None, profile_file=None):
+    """
+    Set up a Transcriber for CPU inference
+
+    Splits the cores between the workers on this host, applies thread
+    counts and pinning, and picks the compute type: with 'auto' each
+    candidate is benchmarked on startup and the fastest is kept (its model
+    stays loaded). The chosen configuration is logged and, if
+    profile_file is set, appended to it as a JSON line.
+
+    Args:
+        transcriber: Transcriber whose device is 'cpu'
+        compute_type: 'auto', 'int8' or 'int8_float32'
+        concurrency: Number of worker processes on this host
+        slot: This worker's index among them
+        pin: Pin the process to its cores
+        benchmark_audio: Path of a short speech clip for the benchmark
+        profile_file: Optional JSON-lines file the chosen profile is appended to
+
+    Returns:
+        CPUProfile
+    """
+    profile = plan_profile(concurrency, slot)
+    apply_profile(profile, pin=pin)
+    transcriber.cpu_threads = profile.intra_threads
+
+    if compute_type == COMPUTE_AUTO:
+        profile.benchmark = benchmark_compute_types(transcriber, audio=benchmark_audio)
+        timed = {ct: r["seconds"] for ct, r in profile.benchmark.items() if "error" not in r}
+        if not timed:
+            raise RuntimeError(f"No CPU compute type could run: {profile.benchmark}")
+        compute_type = min(timed, key=timed.get)
+
+        # The last candidate is the one loaded; reload only if another won
+        if transcriber.compute_type != compute_type:
+            transcriber.compute_type = compute_type
+            transcriber.model = None
+            transcriber.load_model()
+    else:
+        transcriber.compute_type = compute_type
+
+    profile.compute_type = compute_type
+    logger.info(f"CPU inference with compute type {compute_type}")
+
+    if profile_file:
+        record = dict(profile.to_dict(), timestamp=datetime.now().isoformat(), model=transcriber.model_name)
+        with open(profile_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    return profile
@@ -2,13 +2,29 @@
 #downloader.py - YouTube Downloader with Fallbacks
 
 import os
+import shutil
 import subprocess
 import logging
 import re
+import json
 import time
+import threading
+from src.metadata_cache import VideoMetadataCache
+from src.range_downloader import RangeDownloader, RangeFetchError
+from src.audio_stream import ProgressiveAudioStream
+from src.utils.retry import RetryPolicy, CircuitBreaker, RetryStats
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
 
 logger = logging.getLogger(__name__)
 
+# Download backends for yt-dlp
+BACKEND_LIBRARY = "library"
+BACKEND_SUBPROCESS = "subprocess"
+
 class DownloadError(Exception):
     """Exception raised for errors during download"""
     pass
@@ -21,13 +37,99 @@ class NetworkError(DownloadError):
     """Exception raised for network-related errors"""
     pass
 
+class VideoUnavailableError(DownloadError):
+    """Exception raised for videos no method can download (private, removed, region-locked)"""
+    pass
+
+# Error output for a video that no method or retry will download
+UNAVAILABLE_MARKERS = (
+    "video unavailable",
+    "is unavailable",
+    "private video",
+    "has been removed",
+    "not available in your country",
+    "members-only",
+    "confirm your age",
+    "account associated with this video has been terminated",
+)
+PYTUBE_UNAVAILABLE_ERRORS = ("VideoUnavailable", "VideoPrivate", "VideoRegionBlocked", "MembersOnly",
+                             "AgeRestrictedError", "VideoRemovedError")
+
+# Retry policy per error class. Token errors do not clear up by retrying the
+# same method soon, so we move straight to the next method; network errors
+# are usually transient and get exponential backoff. Unavailable videos
+# are not retried at all.
+DEFAULT_RETRY_POLICIES = {
+    VideoUnavailableError: RetryPolicy(max_attempts=1),
+    TokenError: RetryPolicy(max_attempts=1),
+    NetworkError: RetryPolicy(max_attempts=3, base_delay=2.0, max_delay=30.0),
+    DownloadError: RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=10.0),
+}
+
+# Errors that say a method is failing for every video, not just this one
+SYSTEMIC_ERRORS = (NetworkError, TokenError, TimeoutError, subprocess.TimeoutExpired)
+
+# Consecutive download() calls (across jobs) failing a method with a
+# systemic error before it is skipped, and for how long
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 300  # seconds
+
+# Unfinished range downloads older than this are removed at startup
+PARTIAL_RANGES_TTL = 24 * 3600  # seconds
+
 class YouTubeDownloader:
     """Downloads audio from YouTube videos with fallback mechanisms"""
     
-    def __init__(self, temp_dir="./temp"):
-        """Initialize the downloader"""
+    def __init__(self, temp_dir="./temp", metadata_cache=None, backend=BACKEND_LIBRARY, range_connections=0):
+        """
+        Initialize the downloader
+        
+        Args:
+            temp_dir: Directory for temporary files
+            metadata_cache: VideoMetadataCache to fill during downloads
+                (defaults to a cache under temp_dir)
+            backend: How to run yt-dlp, 'library' (in-process, persistent session)
+                or 'subprocess' (one yt-dlp process per download)
+            range_connections: When greater than 1, first try fetching the audio
+                stream directly as this many concurrent byte ranges
+        """
         self.temp_dir = temp_dir
         os.makedirs(temp_dir, exist_ok=True)
+        self.metadata_cache = metadata_cache or VideoMetadataCache(os.path.join(temp_dir, ".metadata"))
+        
+        if backend == BACKEND_LIBRARY and yt_dlp is None:
+            logger.warning("yt_dlp module not available, falling back to yt-dlp subprocess")
+            backend = BACKEND_SUBPROCESS
+        self.backend = backend
+        
+        # YoutubeDL instances are not thread-safe, so keep one per thread.
+        # Each one holds its HTTP session and extractor instances across downloads.
+        self._local = threading.local()
+        
+        self.range_downloader = RangeDownloader(connections=range_connections) if range_connections > 1 else None
+        # Range downloads are kept here, outside the job's temp dir, until
+        # they complete, so a retried job resumes the ranges already fetched
+        self.partial_dir = os.path.join(temp_dir, ".ranges")
+        if self.range_downloader:
+            self._prune_partial_ranges()
+        
+        # Retry engine state, shared by every job this downloader handles
+        self.retry_policies = dict(DEFAULT_RETRY_POLICIES)
+        self.retry_stats = RetryStats()
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+    
+    def get_metadata(self, video_id):
+        """
+        Get metadata captured for a video during download
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            Metadata dict (title, duration, channel, upload_date) or None
+        """
+        return self.metadata_cache.get(video_id)
     
     def download(self, youtube_url, output_dir):
         """
@@ -41,63 +143,343 @@ class YouTubeDownloader:
             Path to downloaded MP4 audio file
             
         Raises:
+            VideoUnavailableError: If the video cannot be downloaded by any method
             DownloadError: If all download methods fail
         """
         os.makedirs(output_dir, exist_ok=True)
         output_file = os.path.join(output_dir, "audio.mp4")
         
         # Try multiple download methods with backoff
+        if self.backend == BACKEND_LIBRARY:
+            ytdlp_method = self._download_with_ytdlp_lib
+        else:
+            ytdlp_method = self._download_with_ytdlp
         methods = [
-            self._download_with_ytdlp,
+            ytdlp_method,
             self._download_with_pytube,
         ]
+        if self.range_downloader:
+            methods.insert(0, self._download_with_ranges)
         
         last_error = None
-        for attempt, method in enumerate(methods, 1):
+        skipped = []
+        for method in methods:
+            if not self._get_breaker(method.__name__).allow():
+                logger.info(f"Skipping {method.__name__}, circuit open for "
+                            f"{self._get_breaker(method.__name__).remaining_cooldown():.0f}s more")
+                self.retry_stats.increment(method.__name__, "skipped")
+                skipped.append(method)
+                continue
             try:
-                logger.info(f"Download attempt {attempt}/{len(methods)} using {method.__name__}")
-                return method(youtube_url, output_file)
+                return self._try_method(method, youtube_url, output_file)
+            except VideoUnavailableError:
+                raise
             except Exception as e:
                 last_error = e
-                logger.warning(f"Download method {method.__name__} failed: {str(e)}")
-                # Small delay between attempts
-                time.sleep(2)
+        
+        # When every method's breaker is open we still have to try something
+        if len(skipped) == len(methods):
+            logger.warning("All download methods are in cooldown, trying them anyway")
+            for method in methods:
+                try:
+                    return self._try_method(method, youtube_url, output_file)
+                except VideoUnavailableError:
+                    raise
+                except Exception as e:
+                    last_error = e
         
         # All methods failed
         error_msg = f"All download methods failed for {youtube_url}: {str(last_error)}"
         logger.error(error_msg)
         raise DownloadError(error_msg)
     
+    def _try_method(self, method, youtube_url, output_file, **kwargs):
+        """
+        Run one download method with retries, logging its failure
+
+        The method's breaker sees the outcome once, after the retries: a
+        failure only counts when it is systemic, so a few private or
+        removed videos in a row do not take a working method out.
+        """
+        breaker = self._get_breaker(method.__name__)
+        try:
+            result = self._run_with_retries(method, youtube_url, output_file, **kwargs)
+        except Exception as e:
+            logger.warning(f"Download method {method.__name__} failed: {str(e)}")
+            if isinstance(e, SYSTEMIC_ERRORS):
+                breaker.record_failure()
+            elif isinstance(e, VideoUnavailableError):
+                breaker.record_success()  # the method reached YouTube and got an answer
+            else:
+                breaker.release()
+            raise
+        breaker.record_success()
+        # A fallback got the file; the unfinished range download is not needed any more
+        if self.range_downloader and method not in (self._download_with_ranges, self._start_stream):
+            self._discard_partial_ranges(self.extract_video_id(youtube_url))
+        return result
+    
+    def _get_breaker(self, name):
+        """Get the circuit breaker for a download method"""
+        with self._breakers_lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(
+                    name,
+                    failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                    cooldown=BREAKER_COOLDOWN
+                )
+            return self._breakers[name]
+    
+    def _get_retry_policy(self, error):
+        """Pick the retry policy for an error by its class"""
+        for error_class in (VideoUnavailableError, TokenError, NetworkError, DownloadError):
+            if isinstance(error, error_class):
+                return self.retry_policies[error_class]
+        return self.retry_policies[DownloadError]
+    
+    def _run_with_retries(self, method, youtube_url, output_file, **kwargs):
+        """Run one download method, retrying according to the error class"""
+        name = method.__name__
+        attempt = 0
+        while True:
+            attempt += 1
+            self.retry_stats.increment(name, "attempts")
+            try:
+                logger.info(f"Download attempt {attempt} using {name}")
+                result = method(youtube_url, output_file, **kwargs)
+                self.retry_stats.increment(name, "successes")
+                return result
+            except Exception as e:
+                self.retry_stats.increment(name, f"errors_{type(e).__name__}")
+                policy = self._get_retry_policy(e)
+                if not policy.should_retry(attempt):
+                    raise
+                delay = policy.delay(attempt)
+                self.retry_stats.increment(name, "retries")
+                logger.warning(f"{name} failed with {type(e).__name__}, retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+    
+    def get_retry_stats(self):
+        """
+        Get download retry and circuit breaker statistics
+        
+        Returns:
+            Dict keyed by method name with attempt/outcome counters and breaker state
+        """
+        stats = self.retry_stats.get_stats()
+        with self._breakers_lock:
+            breakers = dict(self._breakers)
+        for name, breaker in breakers.items():
+            stats.setdefault(name, {})["breaker"] = breaker.get_stats()
+        return stats
+    
     def _download_with_ytdlp(self, youtube_url, output_file):
         """Download using yt-dlp (most reliable)"""
         try:
+            # --dump-json with --no-simulate prints the info JSON while still
+            # downloading, so we get the metadata without a second yt-dlp call
             result = subprocess.run([
                 "yt-dlp", 
                 "-f", "bestaudio[ext=m4a]", 
                 "-o", output_file,
+                "--dump-json", "--no-simulate",
                 youtube_url
             ], capture_output=True, text=True, check=False)
             
             # Check for errors in the output
             if result.returncode != 0:
-                error_output = result.stderr.lower()
-                
-                # Categorize errors for smarter retries
-                if "forbidden" in error_output or "token" in error_output:
-                    raise TokenError(f"YouTube token error: {result.stderr}")
-                elif "network" in error_output or "connection" in error_output:
-                    raise NetworkError(f"Network error: {result.stderr}")
-                else:
-                    raise DownloadError(f"yt-dlp error (code {result.returncode}): {result.stderr}")
+                raise self._classify_ytdlp_error(result.stderr, f"yt-dlp error (code {result.returncode})")
             
             if not os.path.exists(output_file):
                 raise DownloadError("yt-dlp did not produce output file")
+            
+            self._cache_ytdlp_metadata(youtube_url, result.stdout)
                 
             return output_file
             
         except subprocess.SubprocessError as e:
             raise DownloadError(f"yt-dlp subprocess error: {str(e)}")
     
+    def _get_ydl(self):
+        """Get this thread's long-lived YoutubeDL instance"""
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({
+                "format": "bestaudio[ext=m4a]",
+                "quiet": True,
+                "no_warnings": True,
+                "noprogress": True,
+                "cachedir": os.path.join(self.temp_dir, ".yt-dlp-cache"),
+            })
+            self._local.ydl = ydl
+        return ydl
+    
+    def _download_with_ytdlp_lib(self, youtube_url, output_file):
+        """Download using yt-dlp as a library in this process"""
+        ydl = self._get_ydl()
+        
+        # Point the output template at this job's file; everything else
+        # (HTTP session, extractors, player cache) is reused between jobs
+        outtmpl = ydl.params.get("outtmpl")
+        if isinstance(outtmpl, dict):
+            outtmpl["default"] = output_file
+        else:
+            ydl.params["outtmpl"] = {"default": output_file}
+        
+        try:
+            info = ydl.extract_info(youtube_url, download=True)
+        except yt_dlp.utils.DownloadError as e:
+            raise self._classify_ytdlp_error(str(e), "yt-dlp error")
+        except Exception as e:
+            raise DownloadError(f"yt-dlp library error: {str(e)}")
+        
+        if not os.path.exists(output_file):
+            raise DownloadError("yt-dlp did not produce output file")
+        
+        if info:
+            video_id = info.get("id") or self.extract_video_id(youtube_url)
+            self.metadata_cache.put(video_id, VideoMetadataCache.from_ytdlp_info(info))
+        
+        return output_file
+    
+    def _resolve_stream(self, youtube_url):
+        """
+        Resolve the direct audio stream URL for a video without downloading it
+        
+        Returns:
+            yt-dlp info dict for the selected audio format
+        """
+        if self.backend == BACKEND_LIBRARY:
+            try:
+                return self._get_ydl().extract_info(youtube_url, download=False)
+            except yt_dlp.utils.DownloadError as e:
+                raise self._classify_ytdlp_error(str(e), "yt-dlp error")
+        
+        result = subprocess.run([
+            "yt-dlp",
+            "-f", "bestaudio[ext=m4a]",
+            "--dump-json",
+            youtube_url
+        ], capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            raise self._classify_ytdlp_error(result.stderr, f"yt-dlp error (code {result.returncode})")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    
+    def _download_with_ranges(self, youtube_url, output_file):
+        """Download the resolved audio stream as parallel byte ranges"""
+        info = self._resolve_stream(youtube_url)
+        stream_url = info.get("url")
+        if not stream_url:
+            raise DownloadError("yt-dlp did not resolve a direct stream URL")
+        
+        video_id = info.get("id") or self.extract_video_id(youtube_url)
+        self.metadata_cache.put(video_id, VideoMetadataCache.from_ytdlp_info(info))
+        
+        os.makedirs(self.partial_dir, exist_ok=True)
+        try:
+            partial_file = self.range_downloader.download(
+                stream_url,
+                self._partial_ranges_file(video_id),
+                headers=info.get("http_headers"),
+                total_size=info.get("filesize")
+            )
+        except RangeFetchError as e:
+            # 403 means the signed URL or token was rejected; anything else is transport
+            if e.status_code == 403:
+                raise TokenError(f"YouTube token error: {str(e)}")
+            raise NetworkError(f"Network error: {str(e)}")
+        except Exception as e:
+            raise NetworkError(f"Network error: {str(e)}")
+        shutil.move(partial_file, output_file)
+        return output_file
+    
+    def stream_audio(self, youtube_url, output_dir, chunk_size=30):
+        """
+        Start a progressive download that decodes audio while it downloads
+        
+        Resolving the stream goes through the same retries and circuit
+        breaker as the download() methods; callers fall back to download()
+        when this raises.
+        
+        Args:
+            youtube_url: YouTube video URL
+            output_dir: Directory for the spooled 16 kHz WAV file
+            chunk_size: Size of yielded chunks in seconds
+            
+        Returns:
+            Started ProgressiveAudioStream; iterate it for (index, audio) chunks
+            
+        Raises:
+            DownloadError: If the stream could not be resolved, or its breaker is open
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        breaker = self._get_breaker(self._start_stream.__name__)
+        if not breaker.allow():
+            self.retry_stats.increment(self._start_stream.__name__, "skipped")
+            raise DownloadError(f"Progressive download skipped, circuit open for "
+                                f"{breaker.remaining_cooldown():.0f}s more")
+        return self._try_method(self._start_stream, youtube_url, os.path.join(output_dir, "audio.wav"),
+                                chunk_size=chunk_size)
+    
+    def _start_stream(self, youtube_url, wav_file, chunk_size=30):
+        """Resolve the audio stream and start a ProgressiveAudioStream spooling to wav_file"""
+        info = self._resolve_stream(youtube_url)
+        stream_url = info.get("url")
+        if not stream_url:
+            raise DownloadError("yt-dlp did not resolve a direct stream URL")
+        
+        video_id = info.get("id") or self.extract_video_id(youtube_url)
+        self.metadata_cache.put(video_id, VideoMetadataCache.from_ytdlp_info(info))
+        
+        stream = ProgressiveAudioStream(
+            stream_url,
+            wav_file,
+            chunk_size=chunk_size,
+            headers=info.get("http_headers"),
+            total_size=info.get("filesize")
+        )
+        return stream.start()
+    
+    def _partial_ranges_file(self, video_id):
+        """Path of a video's unfinished range download (its state file is next to it)"""
+        return os.path.join(self.partial_dir, f"{video_id}.m4a")
+    
+    def _discard_partial_ranges(self, video_id):
+        """Remove a video's unfinished range download and its progress state"""
+        partial_file = self._partial_ranges_file(video_id)
+        for path in (partial_file, f"{partial_file}.ranges.json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def _prune_partial_ranges(self):
+        """Remove unfinished range downloads older than PARTIAL_RANGES_TTL"""
+        if not os.path.isdir(self.partial_dir):
+            return
+        cutoff = time.time() - PARTIAL_RANGES_TTL
+        for name in os.listdir(self.partial_dir):
+            path = os.path.join(self.partial_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+    
+    def _classify_ytdlp_error(self, error_text, prefix):
+        """Map yt-dlp error output to VideoUnavailableError, TokenError, NetworkError or DownloadError"""
+        error_output = error_text.lower()
+        
+        # Categorize errors for smarter retries
+        if any(marker in error_output for marker in UNAVAILABLE_MARKERS):
+            return VideoUnavailableError(f"Video unavailable: {error_text}")
+        elif "forbidden" in error_output or "token" in error_output:
+            return TokenError(f"YouTube token error: {error_text}")
+        elif "network" in error_output or "connection" in error_output or "timed out" in error_output:
+            return NetworkError(f"Network error: {error_text}")
+        else:
+            return DownloadError(f"{prefix}: {error_text}")
+    
     def _download_with_pytube(self, youtube_url, output_file):
         """Download using PyTubeFix (fallback)"""
         try:
@@ -117,6 +499,8 @@ class YouTubeDownloader:
             
             if not os.path.exists(output_file):
                 raise DownloadError("PyTubeFix did not produce output file")
+            
+            self.metadata_cache.put(self.extract_video_id(youtube_url), VideoMetadataCache.from_pytube(yt))
                 
             return output_file
             
@@ -124,16 +508,36 @@ class YouTubeDownloader:
             error_msg = str(e).lower()
             
             # Categorize errors for smarter retries
-            if "token" in error_msg or "botguard" in error_msg:
+            if isinstance(e, DownloadError):
+                raise
+            elif (any(marker in error_msg for marker in UNAVAILABLE_MARKERS)
+                    or type(e).__name__ in PYTUBE_UNAVAILABLE_ERRORS):
+                raise VideoUnavailableError(f"Video unavailable: {str(e)}")
+            elif "token" in error_msg or "botguard" in error_msg:
                 raise TokenError(f"YouTube token error: {str(e)}")
-            elif "network" in error_msg or "connection" in error_msg:
+            elif "network" in error_msg or "connection" in error_msg or "timed out" in error_msg:
                 raise NetworkError(f"Network error: {str(e)}")
             else:
                 raise DownloadError(f"PyTubeFix error: {str(e)}")
     
+    def _cache_ytdlp_metadata(self, youtube_url, stdout):
+        """Parse the info JSON printed by yt-dlp and store it in the metadata cache"""
+        for line in reversed(stdout.splitlines()):
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                info = json.loads(line)
+            except ValueError:
+                continue
+            video_id = info.get("id") or self.extract_video_id(youtube_url)
+            self.metadata_cache.put(video_id, VideoMetadataCache.from_ytdlp_info(info))
+            return
+        logger.warning(f"yt-dlp did not print video metadata for {youtube_url}")
+    
     def convert_to_wav(self, input_file, output_dir=None):
         """
-        Convert MP4 audio to WAV format
+        Convert MP4 audio to 16 kHz mono WAV (the rate WhisperX works at)
         
         Args:
             input_file: Path to MP4 audio file
@@ -150,7 +554,7 @@ class YouTubeDownloader:
         try:
             # Run ffmpeg with reduced output
             result = subprocess.run([
-                "ffmpeg", "-y", "-i", input_file, output_file
+                "ffmpeg", "-y", "-i", input_file, "-ac", "1", "-ar", "16000", output_file
             ], capture_output=True, text=True, check=False)
             
             if result.returncode != 0:
@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+# inference_batcher.py - Shared Whisper batches across the jobs in flight on one worker
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+DEFAULT_MAX_WAIT_SECONDS = 0.5
+
+class BatcherStoppedError(Exception):
+    """Exception raised for segments submitted to (or pending in) a stopped batcher"""
+    pass
+
+def speech_segments(pipeline, audio, chunk_size=30):
+    """
+    Split a 16 kHz array into the speech segments WhisperX would decode
+
+    The same VAD and merging as FasterWhisperPipeline.transcribe, so
+    batched and unbatched chunks are cut identically.
+
+    Args:
+        pipeline: Loaded WhisperX pipeline
+        audio: 16 kHz float32 numpy array
+        chunk_size: Maximum segment length in seconds
+
+    Returns:
+        List of dicts with 'start' and 'end' in seconds
+    """
+    import torch
+
+    vad_model = pipeline.vad_model
+    try:
+        from whisperx.vads import Pyannote
+        # Newer WhisperX releases have several VAD classes with their own preprocessing
+        if hasattr(vad_model, "preprocess_audio"):
+            waveform, merge_chunks = vad_model.preprocess_audio(audio), vad_model.merge_chunks
+        else:
+            waveform, merge_chunks = Pyannote.preprocess_audio(audio), Pyannote.merge_chunks
+    except ImportError:
+        from whisperx.vad import merge_chunks
+        waveform = torch.from_numpy(audio).unsqueeze(0)
+
+    segments = vad_model({"waveform": waveform, "sample_rate": SAMPLE_RATE})
+    return merge_chunks(segments, chunk_size, onset=pipeline._vad_params["vad_onset"],
+                        offset=pipeline._vad_params["vad_offset"])
+
+class _Request:
+    """One speech segment waiting for a batch"""
+
+    __slots__ = ("audio", "language", "job_id", "future", "enqueued")
+
+    def __init__(self, audio, language, job_id):
+        self.audio = audio
+        self.language = language
+        self.job_id = job_id
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+class InferenceBatcher:
+    """
+    Packs speech segments from several jobs into shared Whisper batches
+
+    Jobs run in their own threads and do everything except Whisper decoding
+    themselves (reading audio, VAD, alignment). They submit speech segments
+    here and block on the results. One inference thread owns the Whisper
+    pipeline. It starts a batch when batch_size segments are waiting, or when
+    the oldest waiting segment has waited max_wait seconds. A lone short
+    video therefore pays at most max_wait extra per batch, and a full queue
+    of short clips fills batches that no single clip could fill. Segments are
+    batched in arrival order. Only segments in the same language share a
+    batch, because the tokenizer is per batch.
+    """
+
+    def __init__(self, get_pipeline, batch_size=16, max_wait=DEFAULT_MAX_WAIT_SECONDS, chunk_size=30):
+        """
+        Args:
+            get_pipeline: Callable returning the current WhisperX pipeline
+                (called per batch, so model reloads are picked up)
+            batch_size: Maximum segments per batch
+            max_wait: Seconds the oldest segment may wait for a batch to fill
+            chunk_size: Maximum speech segment length in seconds
+        """
+        self.get_pipeline = get_pipeline
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.chunk_size = chunk_size
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.stats = {"batches": 0, "segments": 0, "multi_job_batches": 0}
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio, language="en", job_id=None):
+        """
+        Queue one speech segment (at most chunk_size seconds)
+
+        Returns:
+            concurrent.futures.Future resolving to the segment's text
+        """
+        request = _Request(audio, language, job_id)
+        with self._cond:
+            if self._stopped:
+                raise BatcherStoppedError("Inference batcher is stopped")
+            self._queue.append(request)
+            self._cond.notify()
+        return request.future
+
+    def transcribe(self, audio, language="en", job_id=None):
+        """
+        Transcribe one chunk through the shared batches
+
+        A drop-in for pipeline.transcribe(): VAD runs on the calling thread,
+        and the call blocks until every speech segment of the chunk is
+        decoded.
+
+        Args:
+            audio: 16 kHz float32 numpy array
+            language: Language code
+            job_id: Job the chunk belongs to (for batch statistics)
+
+        Returns:
+            Dict with 'segments' ('text', 'start', 'end') and 'language'
+        """
+        vad_segments = speech_segments(self.get_pipeline(), audio, self.chunk_size)
+        futures = [
+            self.submit(audio[int(seg["start"] * SAMPLE_RATE):int(seg["end"] * SAMPLE_RATE)], language, job_id)
+            for seg in vad_segments
+        ]
+
+        segments = []
+        for seg, future in zip(vad_segments, futures):
+            segments.append({
+                "text": future.result(),
+                "start": round(seg["start"], 3),
+                "end": round(seg["end"], 3),
+            })
+        return {"segments": segments, "language": language}
+
+    def _next_batch(self):
+        """Wait for a full batch or the oldest segment's deadline; None once stopped"""
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                return None
+
+            deadline = self._queue[0].enqueued + self.max_wait
+            while len(self._queue) < self.batch_size and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # Same-language segments in arrival order; the others keep their place
+            language = self._queue[0].language
+            batch, rest = [], deque()
+            while self._queue and len(batch) < self.batch_size:
+                request = self._queue.popleft()
+                (batch if request.language == language else rest).append(request)
+            rest.extend(self._queue)
+            self._queue = rest
+            return batch
+
+    def _run(self):
+        """Inference thread: decode batches until stopped"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                texts = self._decode(batch)
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} segments failed: {str(e)}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            for request, text in zip(batch, texts):
+                metrics.BATCH_WAIT_SECONDS.observe(started - request.enqueued)
+                request.future.set_result(text)
+
+            jobs = len({request.job_id for request in batch})
+            metrics.BATCH_SIZE.observe(len(batch))
+            metrics.BATCH_JOBS.observe(jobs)
+            self.stats["batches"] += 1
+            self.stats["segments"] += len(batch)
+            self.stats["multi_job_batches"] += jobs > 1
+
+    def _decode(self, batch):
+        """Run one batch through the pipeline; returns one text per request"""
+        import faster_whisper
+
+        pipeline = self.get_pipeline()
+        language = batch[0].language
+
+        # transcribe() normally sets the tokenizer up; batches bypass it
+        tokenizer = pipeline.tokenizer
+        if tokenizer is None or tokenizer.language_code != language:
+            pipeline.tokenizer = faster_whisper.tokenizer.Tokenizer(
+                pipeline.model.hf_tokenizer,
+                pipeline.model.model.is_multilingual,
+                task="transcribe",
+                language=language
+            )
+
+        texts = []
+        outputs = pipeline(({"inputs": request.audio} for request in batch), batch_size=len(batch))
+        for out in outputs:
+            text = out["text"]
+            # Unbatched pipeline calls return a one-element list
+            texts.append(text[0] if isinstance(text, list) else text)
+        return texts
+
+    def get_stats(self):
+        """Batch counts and the average fill, for the heartbeat"""
+        stats = dict(self.stats)
+        stats["average_batch"] = round(stats["segments"] / stats["batches"], 2) if stats["batches"] else None
+        with self._cond:
+            stats["waiting"] = len(self._queue)
+        return stats
+
+    def stop(self):
+        """Stop the inference thread; waiting segments fail with BatcherStoppedError"""
+        with self._cond:
+            self._stopped = True
+            pending = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+        for request in pending:
+            request.future.set_exception(BatcherStoppedError("Inference batcher stopped"))
+        self._thread.join()
@@ -6,8 +6,9 @@ import time
 import uuid
 import logging
 from datetime import datetime, timedelta
-import boto3
 import os
+from src.utils.aws_clients import get_client
+from src.utils.compression import put_encoded_object, get_decoded_object, DEFAULT_ENCODING
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +22,11 @@ class JobState:
 class JobTracker:
     """Simple S3-based job tracking system"""
     
-    def __init__(self, s3_bucket, region="us-east-1"):
+    def __init__(self, s3_bucket, region="us-east-1", content_encoding=DEFAULT_ENCODING):
         """Initialize the job tracker with S3 bucket"""
         self.s3_bucket = s3_bucket
-        self.s3 = boto3.client('s3', region_name=region)
+        self.content_encoding = content_encoding
+        self.s3 = get_client('s3', region)
         self.worker_id = f"worker-{uuid.uuid4()}"
     
     def create_job(self, job_id, video_id, youtube_url, phrase):
@@ -63,8 +65,8 @@ class JobTracker:
         self._save_job(job, JobState.PROCESSING)
         return job
     
-    def update_progress(self, job_id, total_chunks=None, completed_chunks=None):
-        """Update job progress"""
+    def update_progress(self, job_id, total_chunks=None, completed_chunks=None, metadata=None, speech=None):
+        """Update job progress (and optionally attach video metadata or a speech map summary)"""
         job = self.get_job_by_status(job_id, JobState.PROCESSING)
         if not job:
             return False
@@ -78,11 +80,17 @@ class JobTracker:
         if completed_chunks is not None:
             job["completed_chunks"] = completed_chunks
             
+        if metadata is not None:
+            job["metadata"] = metadata
+            
+        if speech is not None:
+            job["speech"] = speech
+            
         self._save_job(job, JobState.PROCESSING)
         return True
     
-    def complete_job(self, job_id):
-        """Mark job as completed"""
+    def complete_job(self, job_id, timing=None):
+        """Mark job as completed, optionally recording its stage timing summary"""
         job = self.get_job_by_status(job_id, JobState.PROCESSING)
         if not job:
             return False
@@ -94,6 +102,8 @@ class JobTracker:
         job["status"] = JobState.COMPLETED
         job["updated_at"] = datetime.now().isoformat()
         job["completed_at"] = datetime.now().isoformat()
+        if timing:
+            job["timing"] = timing
         
         self._save_job(job, JobState.COMPLETED)
         return True
@@ -129,8 +139,8 @@ class JobTracker:
         """Get job from specific status folder"""
         key = f"jobs/{status}/{job_id}.json"
         try:
-            response = self.s3.get_object(Bucket=self.s3_bucket, Key=key)
-            job_data = json.loads(response['Body'].read().decode('utf-8'))
+            body = get_decoded_object(self.s3, Bucket=self.s3_bucket, Key=key)
+            job_data = json.loads(body.decode('utf-8'))
             return job_data
         except self.s3.exceptions.NoSuchKey:
             return None
@@ -214,11 +224,13 @@ class JobTracker:
         key = f"jobs/{status}/{job_id}.json"
         
         try:
-            self.s3.put_object(
+            put_encoded_object(
+                self.s3,
                 Body=json.dumps(job),
                 Bucket=self.s3_bucket,
                 Key=key,
-                ContentType="application/json"
+                ContentType="application/json",
+                encoding=self.content_encoding
             )
             return True
         except Exception as e:
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# keyword_spotter.py - CTC keyword spotting on the alignment model's character posteriors
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Average log-probability per phrase character relative to the best
+# character in each frame (0 = the phrase is the model's top choice
+# throughout). Hits below DEFAULT_MIN_SCORE are dropped; hits below
+# DEFAULT_ACCEPT_SCORE are uncertain and can be verified with full ASR.
+DEFAULT_MIN_SCORE = -1.5
+DEFAULT_ACCEPT_SCORE = -0.5
+
+# Which hits are checked by transcribing around them with the Whisper model
+VERIFY_NONE = "none"
+VERIFY_UNCERTAIN = "uncertain"
+VERIFY_ALL = "all"
+VERIFY_MODES = (VERIFY_NONE, VERIFY_UNCERTAIN, VERIFY_ALL)
+
+# Seconds of context transcribed around a hit when verifying it
+DEFAULT_VERIFY_MARGIN = 2.0
+
+WORD_SEPARATOR = "|"
+
+def phrase_tokens(phrase, dictionary):
+    """
+    Map a phrase to the alignment model's character ids
+
+    Lowercased, spaces become the word separator, and characters the model
+    does not know (punctuation, digits) are dropped, as in WhisperX's
+    alignment.
+
+    Returns:
+        List of token ids
+    """
+    text = " ".join(phrase.lower().split()).replace(" ", WORD_SEPARATOR)
+    return [dictionary[c] for c in text if c in dictionary]
+
+def find_blank_id(dictionary):
+    """CTC blank id of an alignment model dictionary (WhisperX's convention)"""
+    for char, code in dictionary.items():
+        if char in ("[pad]", "<pad>"):
+            return code
+    return 0
+
+class KeywordSpotter:
+    """
+    Finds one phrase in a stream of CTC log-probabilities
+
+    A Viterbi pass over the phrase's CTC states (tokens with optional
+    blanks between them) that may start at any frame. Each frame scores the
+    phrase's character against the frame's best character, so the path
+    score is a likelihood ratio against unconstrained recognition, and the
+    end state gives, for every frame, the best match of the whole phrase
+    ending there. State is kept between feed() calls, so audio can be
+    processed chunk by chunk and a match may span a chunk boundary.
+    """
+
+    def __init__(self, phrase, dictionary, blank_id=0, min_score=DEFAULT_MIN_SCORE):
+        """
+        Args:
+            phrase: Phrase to spot
+            dictionary: Character -> token id of the alignment model
+            blank_id: CTC blank token id
+            min_score: Minimum average relative log-probability per token for a hit
+
+        Raises:
+            ValueError: If no character of the phrase is in the dictionary
+        """
+        tokens = phrase_tokens(phrase, dictionary)
+        if not tokens:
+            raise ValueError(f"Phrase '{phrase}' has no characters the alignment model knows")
+
+        self.phrase = phrase
+        self.min_score = min_score
+        self.n_tokens = len(tokens)
+
+        # States: t1, blank, t2, blank, ..., tn
+        labels = []
+        for i, token in enumerate(tokens):
+            if i:
+                labels.append(blank_id)
+            labels.append(token)
+        self.labels = np.array(labels, dtype=np.int64)
+
+        # A token state may be entered from the previous token directly
+        # (skipping the blank) unless both tokens are the same character
+        n_states = len(labels)
+        self._can_skip = np.zeros(n_states, dtype=bool)
+        for s in range(2, n_states):
+            self._can_skip[s] = labels[s] != blank_id and labels[s] != labels[s - 2]
+
+        self._score = np.full(n_states, -np.inf)
+        self._start = np.zeros(n_states)
+        self._open = None
+        self.hits = []
+
+    def feed(self, log_probs, offset, frame_seconds):
+        """
+        Process one chunk of frames
+
+        Args:
+            log_probs: (frames, vocabulary) log-softmax output of the CTC model
+            offset: Time of the first frame in seconds
+            frame_seconds: Duration of one frame in seconds
+        """
+        if len(log_probs) == 0:
+            return
+
+        # Relative scores for every frame and state at once; only the
+        # recurrence itself runs frame by frame
+        relative = log_probs - log_probs.max(axis=1, keepdims=True)
+        emissions = relative[:, self.labels]
+
+        score, start = self._score, self._start
+        can_skip = self._can_skip
+        last = len(self.labels) - 1
+        threshold = self.min_score * self.n_tokens
+
+        for t in range(len(emissions)):
+            time = offset + t * frame_seconds
+
+            from_prev = np.empty_like(score)
+            from_prev[0] = -np.inf
+            from_prev[1:] = score[:-1]
+            from_skip = np.full_like(score, -np.inf)
+            from_skip[2:] = np.where(can_skip[2:], score[:-2], -np.inf)
+
+            best = np.maximum(score, np.maximum(from_prev, from_skip))
+            new_start = np.where(best == score, start,
+                                 np.where(best == from_prev, np.roll(start, 1), np.roll(start, 2)))
+
+            # A new match can begin at any frame
+            if best[0] < 0.0:
+                best[0] = 0.0
+                new_start[0] = time
+
+            score = best + emissions[t]
+            start = new_start
+
+            if score[last] >= threshold:
+                self._add_hit(start[last], time + frame_seconds, score[last] / self.n_tokens)
+
+        self._score, self._start = score, start
+
+    def reset(self):
+        """Forget partial matches, e.g. before audio that does not follow the previous chunk"""
+        self._score = np.full(len(self.labels), -np.inf)
+
+    def _add_hit(self, start, end, score):
+        """Keep the best-scoring match among overlapping ones"""
+        if self._open is not None and start < self._open["end"]:
+            if score > self._open["score"]:
+                self._open = {"start": start, "end": end, "score": score}
+            return
+        self._flush()
+        self._open = {"start": start, "end": end, "score": score}
+
+    def _flush(self):
+        if self._open is not None:
+            self.hits.append({
+                "start": round(float(self._open["start"]), 3),
+                "end": round(float(self._open["end"]), 3),
+                "score": round(float(self._open["score"]), 3),
+            })
+            self._open = None
+
+    def finish(self):
+        """
+        Flush the last match
+
+        Returns:
+            List of hits ({'start', 'end', 'score'}) in time order
+        """
+        self._flush()
+        return self.hits
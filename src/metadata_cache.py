@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# metadata_cache.py - Local cache of YouTube video metadata
+
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class VideoMetadataCache:
+    """Caches video metadata (title, duration, channel, upload date) by video ID"""
+
+    def __init__(self, cache_dir="./temp/.metadata"):
+        """
+        Initialize the metadata cache
+
+        Args:
+            cache_dir: Directory where metadata JSON files are kept
+        """
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id):
+        """Get the on-disk path for a video's metadata"""
+        return os.path.join(self.cache_dir, f"{video_id}.json")
+
+    def get(self, video_id):
+        """
+        Get cached metadata for a video
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Metadata dict or None if not cached
+        """
+        with self._lock:
+            if video_id in self._entries:
+                return dict(self._entries[video_id])
+
+        try:
+            with open(self._path(video_id), "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading cached metadata for {video_id}: {str(e)}")
+            return None
+
+        with self._lock:
+            self._entries[video_id] = metadata
+        return dict(metadata)
+
+    def put(self, video_id, metadata):
+        """
+        Store metadata for a video in memory and on disk
+
+        Args:
+            video_id: YouTube video ID
+            metadata: Metadata dict (see from_ytdlp_info)
+
+        Returns:
+            The stored metadata dict
+        """
+        metadata = dict(metadata)
+        metadata["video_id"] = video_id
+
+        with self._lock:
+            self._entries[video_id] = metadata
+
+        # Write atomically so concurrent readers never see a partial file
+        path = self._path(video_id)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(metadata, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Error writing cached metadata for {video_id}: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+        return dict(metadata)
+
+    @staticmethod
+    def from_ytdlp_info(info):
+        """
+        Extract the fields we keep from a yt-dlp info dict
+
+        Args:
+            info: Info dict as produced by yt-dlp (--dump-json or extract_info)
+
+        Returns:
+            Metadata dict with title, duration, channel and upload_date
+        """
+        return {
+            "title": info.get("title"),
+            "duration": info.get("duration"),
+            "channel": info.get("channel") or info.get("uploader"),
+            "upload_date": info.get("upload_date"),
+        }
+
+    @staticmethod
+    def from_pytube(yt):
+        """
+        Extract the fields we keep from a PyTubeFix YouTube object
+
+        Args:
+            yt: pytubefix.YouTube instance
+
+        Returns:
+            Metadata dict with title, duration, channel and upload_date
+        """
+        publish_date = getattr(yt, "publish_date", None)
+        return {
+            "title": getattr(yt, "title", None),
+            "duration": getattr(yt, "length", None),
+            "channel": getattr(yt, "author", None),
+            "upload_date": publish_date.strftime("%Y%m%d") if publish_date else None,
+        }
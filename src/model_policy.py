@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# model_policy.py - Per-job choice of Whisper model and beam size
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Rungs from fastest to most accurate. Beam size changes are the cheapest
+# steps (no model reload), so each model appears with greedy decoding first.
+DEFAULT_LADDER = "tiny.en:1,base.en:1,small.en:1,small.en:5,medium.en:5,large-v2:5"
+
+QUALITY_LOW = "low"
+QUALITY_NORMAL = "normal"
+QUALITY_HIGH = "high"
+QUALITY_HINTS = (QUALITY_LOW, QUALITY_NORMAL, QUALITY_HIGH)
+
+DEFAULT_BACKLOG_HIGH = 50
+DEFAULT_BACKLOG_LOW = 0
+LONG_VIDEO_SECONDS = 3 * 3600
+SHORT_VIDEO_SECONDS = 10 * 60
+
+def parse_ladder(spec):
+    """
+    Parse a ladder spec like 'base.en:1,small.en:5' into (model, beam_size) tuples
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    ladder = []
+    for entry in spec.split(","):
+        model, _, beam = entry.strip().partition(":")
+        if not model:
+            raise ValueError(f"Invalid model ladder entry: '{entry}'")
+        ladder.append((model, int(beam) if beam else 5))
+    return ladder
+
+class ModelDecision:
+    """The model and beam size chosen for one job, and why"""
+
+    def __init__(self, model, beam_size, rung, default_rung, inputs, reasons, adaptive):
+        self.model = model
+        self.beam_size = beam_size
+        self.rung = rung
+        self.default_rung = default_rung
+        self.inputs = inputs
+        self.reasons = reasons
+        self.adaptive = adaptive
+
+    def to_dict(self):
+        """Serialize for the results JSON"""
+        return {
+            "model": self.model,
+            "beam_size": self.beam_size,
+            "rung": self.rung,
+            "default_rung": self.default_rung,
+            "adaptive": self.adaptive,
+            "inputs": self.inputs,
+            "reasons": self.reasons,
+        }
+
+class ModelPolicy:
+    """
+    Picks a rung of the model ladder for each job
+
+    Starting from the default rung, each input moves the choice up or down:
+    - queue backlog: one rung down at backlog_high messages, two at four
+      times that, one rung up when the queue is at or below backlog_low.
+      Degraded mode is only left once the backlog has halved, so a queue
+      hovering around the threshold does not reload the model every job.
+    - video duration: very long videos go one rung down unless the queue is
+      idle (they hold a worker for hours); short ones go one rung up unless
+      the queue is backlogged.
+    - quality hint from the message: 'low' goes one rung down, 'high' one
+      rung up and is exempt from backlog degradation.
+    With adaptive=False the default rung is always used, but the inputs
+    are still recorded.
+    """
+
+    def __init__(self, default_model="small.en", default_beam_size=5, ladder=DEFAULT_LADDER, adaptive=True,
+                 backlog_high=DEFAULT_BACKLOG_HIGH, backlog_low=DEFAULT_BACKLOG_LOW,
+                 long_video_seconds=LONG_VIDEO_SECONDS, short_video_seconds=SHORT_VIDEO_SECONDS):
+        """
+        Args:
+            default_model: Model used when nothing argues for a change
+            default_beam_size: Beam size used with the default model
+            ladder: Ladder spec (see parse_ladder) or list of (model, beam_size)
+            adaptive: Move along the ladder, or always use the default
+            backlog_high: Visible queue messages at which to degrade
+            backlog_low: Visible queue messages at or below which to upgrade
+            long_video_seconds: Videos at least this long are degraded
+            short_video_seconds: Videos at most this long are upgraded
+        """
+        self.ladder = parse_ladder(ladder) if isinstance(ladder, str) else list(ladder)
+        if (default_model, default_beam_size) not in self.ladder:
+            if adaptive:
+                raise ValueError(f"Default model {default_model} (beam {default_beam_size}) is not in the ladder")
+            self.ladder.append((default_model, default_beam_size))
+        self.default_rung = self.ladder.index((default_model, default_beam_size))
+        self.adaptive = adaptive
+        self.backlog_high = backlog_high
+        self.backlog_low = backlog_low
+        self.long_video_seconds = long_video_seconds
+        self.short_video_seconds = short_video_seconds
+
+        self._backlog_level = 0
+        self._lock = threading.Lock()
+
+    def _update_backlog_level(self, queue_depth):
+        """Backlog adjustment in rungs, with hysteresis on leaving degraded mode"""
+        if queue_depth is None:
+            return self._backlog_level
+
+        with self._lock:
+            if queue_depth >= 4 * self.backlog_high:
+                level = -2
+            elif queue_depth >= self.backlog_high:
+                level = -1
+            elif self._backlog_level < 0 and queue_depth > self.backlog_high / 2:
+                level = -1
+            elif queue_depth <= self.backlog_low:
+                level = 1
+            else:
+                level = 0
+            self._backlog_level = level
+            return level
+
+    def decide(self, duration=None, queue_depth=None, quality=None):
+        """
+        Choose the model and beam size for a job
+
+        Args:
+            duration: Video duration in seconds from metadata, if known
+            queue_depth: Visible messages in the queue, if known
+            quality: Quality hint from the message ('low', 'normal' or 'high')
+
+        Returns:
+            ModelDecision
+        """
+        inputs = {"duration": duration, "queue_depth": queue_depth, "quality": quality}
+        if quality is not None and quality not in QUALITY_HINTS:
+            logger.warning(f"Ignoring unknown quality hint '{quality}'")
+            quality = None
+
+        rung = self.default_rung
+        reasons = []
+        if self.adaptive:
+            backlog = self._update_backlog_level(queue_depth)
+            if backlog < 0 and quality == QUALITY_HIGH:
+                reasons.append("backlog ignored for high quality hint")
+            elif backlog < 0:
+                rung += backlog
+                reasons.append(f"backlog of {queue_depth} messages: {backlog}")
+            elif backlog > 0:
+                rung += backlog
+                reasons.append(f"queue idle: +{backlog}")
+
+            if duration and duration >= self.long_video_seconds and backlog <= 0:
+                rung -= 1
+                reasons.append(f"long video ({duration / 3600:.1f}h): -1")
+            elif duration and duration <= self.short_video_seconds and backlog >= 0:
+                rung += 1
+                reasons.append(f"short video ({duration / 60:.0f}min): +1")
+
+            if quality == QUALITY_LOW:
+                rung -= 1
+                reasons.append("low quality hint: -1")
+            elif quality == QUALITY_HIGH:
+                rung += 1
+                reasons.append("high quality hint: +1")
+
+            rung = max(0, min(len(self.ladder) - 1, rung))
+        else:
+            reasons.append("fixed model")
+
+        model, beam_size = self.ladder[rung]
+        return ModelDecision(model, beam_size, rung, self.default_rung, inputs, reasons, self.adaptive)
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+# range_downloader.py - Parallel byte-range fetcher for direct media URLs
+
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+logger = logging.getLogger(__name__)
+
+# YouTube throttles large single requests, ~10MB ranges stay at full speed
+DEFAULT_RANGE_SIZE = 10 * 1024 * 1024
+DEFAULT_CONNECTIONS = 4
+
+class RangeFetchError(Exception):
+    """Exception raised when a range cannot be fetched after all retries"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class RangeDownloader:
+    """Downloads a URL as concurrent byte ranges into a preallocated file, resumable per range"""
+
+    def __init__(self, connections=DEFAULT_CONNECTIONS, range_size=DEFAULT_RANGE_SIZE,
+                 max_retries=3, timeout=30):
+        """
+        Initialize the range downloader
+
+        Args:
+            connections: Number of concurrent HTTP connections
+            range_size: Size of each byte range in bytes
+            max_retries: Attempts per range before giving up
+            timeout: Socket timeout in seconds
+        """
+        self.connections = max(1, connections)
+        self.range_size = range_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self, headers):
+        """Get this thread's HTTP session (one keep-alive connection per worker thread)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        session.headers.update(headers or {})
+        return session
+
+    def _get_size(self, url, headers):
+        """Get the total size of the resource in bytes"""
+        session = self._session(headers)
+        response = session.get(url, headers={"Range": "bytes=0-0"}, timeout=self.timeout, stream=True)
+        response.close()
+
+        if response.status_code not in (200, 206):
+            raise RangeFetchError(f"HTTP {response.status_code} while probing size", response.status_code)
+
+        content_range = response.headers.get("Content-Range", "")
+        if "/" in content_range and not content_range.endswith("/*"):
+            return int(content_range.rsplit("/", 1)[1])
+        if response.headers.get("Content-Length") and response.status_code == 200:
+            return int(response.headers["Content-Length"])
+        raise RangeFetchError("Server did not report the content size")
+
+    def _plan_ranges(self, total_size):
+        """Split the resource into byte ranges"""
+        ranges = []
+        for start in range(0, total_size, self.range_size):
+            end = min(start + self.range_size, total_size) - 1
+            ranges.append({"start": start, "end": end, "done": 0})
+        return {"total_size": total_size, "range_size": self.range_size, "ranges": ranges}
+
+    def _load_state(self, state_file, output_file, total_size):
+        """Load saved range progress for a partial download, or plan fresh ranges"""
+        if os.path.exists(state_file) and os.path.exists(output_file):
+            try:
+                with open(state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                if state.get("total_size") == total_size and state.get("range_size") == self.range_size:
+                    return state
+                logger.info("Saved range state does not match the resource, starting over")
+            except Exception as e:
+                logger.warning(f"Could not read range state {state_file}: {str(e)}")
+
+        return self._plan_ranges(total_size)
+
+    def _save_state(self, state_file, state):
+        """Persist range progress atomically"""
+        tmp_file = f"{state_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, state_file)
+
+    def _fetch_range(self, url, headers, fd, byte_range, state_lock):
+        """Fetch one byte range, resuming from what was already written"""
+        last_error = None
+        for attempt in range(1, self.max_retries + 1):
+            offset = byte_range["start"] + byte_range["done"]
+            if offset > byte_range["end"]:
+                return
+
+            try:
+                session = self._session(headers)
+                response = session.get(
+                    url,
+                    headers={"Range": f"bytes={offset}-{byte_range['end']}"},
+                    timeout=self.timeout,
+                    stream=True
+                )
+                if response.status_code != 206:
+                    response.close()
+                    raise RangeFetchError(f"HTTP {response.status_code} for range {offset}-{byte_range['end']}",
+                                          response.status_code)
+
+                for block in response.iter_content(chunk_size=256 * 1024):
+                    if not block:
+                        continue
+                    os.pwrite(fd, block, offset)
+                    offset += len(block)
+                    with state_lock:
+                        byte_range["done"] = offset - byte_range["start"]
+
+                if offset <= byte_range["end"]:
+                    raise RangeFetchError(f"Range {byte_range['start']}-{byte_range['end']} ended early at {offset}")
+                return
+
+            except RangeFetchError as e:
+                # Client errors (e.g. expired signature) will not go away by retrying
+                if e.status_code is not None and 400 <= e.status_code < 500:
+                    raise
+                last_error = e
+            except requests.RequestException as e:
+                last_error = e
+
+            logger.warning(f"Range {byte_range['start']}-{byte_range['end']} attempt {attempt}/{self.max_retries} "
+                           f"failed: {str(last_error)}")
+
+        raise RangeFetchError(f"Range {byte_range['start']}-{byte_range['end']} failed: {str(last_error)}")
+
+    def download(self, url, output_file, headers=None, total_size=None):
+        """
+        Download a URL into output_file using concurrent range requests
+
+        Progress is kept in '<output_file>.ranges.json', so calling download
+        again after a failure only fetches the ranges that are still missing.
+
+        Args:
+            url: Direct media URL
+            output_file: Path of the file to write
+            headers: Extra HTTP headers (e.g. from yt-dlp's http_headers)
+            total_size: Size in bytes if already known
+
+        Returns:
+            Path to the downloaded file
+
+        Raises:
+            RangeFetchError: If any range fails after all retries
+            requests.RequestException: If the size probe fails
+        """
+        if not total_size:
+            total_size = self._get_size(url, headers)
+
+        state_file = f"{output_file}.ranges.json"
+        state = self._load_state(state_file, output_file, total_size)
+        pending = [r for r in state["ranges"] if r["start"] + r["done"] <= r["end"]]
+
+        # Preallocate the file so every range can be written in place
+        fd = os.open(output_file, os.O_RDWR | os.O_CREAT)
+        try:
+            os.ftruncate(fd, total_size)
+
+            logger.info(f"Fetching {total_size} bytes as {len(pending)} ranges "
+                        f"over {self.connections} connections")
+
+            state_lock = threading.Lock()
+            errors = []
+            with ThreadPoolExecutor(max_workers=self.connections) as executor:
+                futures = [
+                    executor.submit(self._fetch_range, url, headers, fd, r, state_lock)
+                    for r in pending
+                ]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)
+
+            if errors:
+                with state_lock:
+                    self._save_state(state_file, state)
+                raise errors[0]
+        finally:
+            os.close(fd)
+
+        try:
+            os.remove(state_file)
+        except FileNotFoundError:
+            pass
+
+        return output_file
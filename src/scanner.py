@@ -2,12 +2,20 @@
 import os
 import re
 import logging
+import difflib
 from typing import List, Dict, Any
 import json
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Minimum difflib similarity for a fuzzy match in a draft transcript
+DEFAULT_MIN_SIMILARITY = 0.75
+
+def _normalize_words(text):
+    """Lowercase words without punctuation, for fuzzy matching"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
 class PhraseScanner:
     """Scans transcripts for phrases and analyzes results"""
     
@@ -22,6 +30,11 @@ class PhraseScanner:
         self.phrase = phrase
         self.case_sensitive = case_sensitive
     
+    def count_occurrences(self, text):
+        """Number of occurrences of the phrase in a text"""
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        return len(re.findall(re.escape(self.phrase), text, flags))
+    
     def scan_file(self, transcript_file):
         """
         Scan a single transcript file for occurrences of the phrase
@@ -40,13 +53,8 @@ class PhraseScanner:
             with open(transcript_file, "r", encoding="utf-8") as f:
                 content = f.read()
                 
-            # Compile the pattern for the search
-            pattern = re.escape(self.phrase)
-            flags = 0 if self.case_sensitive else re.IGNORECASE
-            
             # Find all occurrences
-            occurrences = re.findall(pattern, content, flags)
-            count = len(occurrences)
+            count = self.count_occurrences(content)
             
             # Calculate some basic stats
             words = content.split()
@@ -223,6 +231,73 @@ class PhraseScanner:
         else:
             return {"directories": all_results}
     
+    def find_candidates(self, segments, min_similarity=DEFAULT_MIN_SIMILARITY):
+        """
+        Find likely occurrences of the phrase in timed, possibly inaccurate segments
+        
+        Meant for draft transcripts from small models, which mishear and
+        misspell words: the phrase is compared (ignoring case and
+        punctuation) with every run of as many words, and one word fewer or
+        more, across segment boundaries. Word times are interpolated within
+        their segment when the segments have no word timestamps.
+        
+        Args:
+            segments: Transcript segments with 'start', 'end' and 'text'
+            min_similarity: Minimum difflib ratio (0-1) for a match
+            
+        Returns:
+            List of dicts with 'start', 'end', 'similarity' and 'text',
+            sorted by start; overlapping matches are reported once
+        """
+        phrase = " ".join(_normalize_words(self.phrase))
+        if not phrase:
+            return []
+        n_phrase = len(phrase.split())
+
+        # One flat word stream with estimated start/end times
+        words, starts, ends = [], [], []
+        for segment in segments:
+            seg_words = _normalize_words(segment.get("text", ""))
+            if not seg_words:
+                continue
+            seg_start, seg_end = segment.get("start"), segment.get("end")
+            if seg_start is None or seg_end is None:
+                continue
+            step = (seg_end - seg_start) / len(seg_words)
+            for i, word in enumerate(seg_words):
+                words.append(word)
+                starts.append(seg_start + i * step)
+                ends.append(seg_start + (i + 1) * step)
+
+        # The phrase is the cached sequence; quick_ratio bounds prune most windows
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(phrase)
+        matches = []
+        for n in sorted({max(1, n_phrase - 1), n_phrase, n_phrase + 1}):
+            for i in range(len(words) - n + 1):
+                text = " ".join(words[i:i + n])
+                matcher.set_seq1(text)
+                if (matcher.real_quick_ratio() < min_similarity or matcher.quick_ratio() < min_similarity):
+                    continue
+                similarity = matcher.ratio()
+                if similarity >= min_similarity:
+                    matches.append((similarity, i, i + n, text))
+
+        # Best match first; drop matches overlapping an already kept one
+        candidates = []
+        taken = set()
+        for similarity, first, last, text in sorted(matches, key=lambda m: -m[0]):
+            if taken.intersection(range(first, last)):
+                continue
+            taken.update(range(first, last))
+            candidates.append({
+                "start": starts[first],
+                "end": ends[last - 1],
+                "similarity": round(similarity, 3),
+                "text": text
+            })
+        return sorted(candidates, key=lambda c: c["start"])
+    
     def to_json(self, scan_results, indent=2):
         """Convert scan results to JSON string"""
         return json.dumps(scan_results, indent=indent)
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+# scheduler.py - Priority lanes and cost-weighted fair scheduling across SQS queues
+
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Lanes, one SQS queue each
+LANE_HIGH = "high"
+LANE_NORMAL = "normal"
+LANE_LONG = "long"
+
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+DEFAULT_WEIGHTS = {LANE_HIGH: 8, LANE_NORMAL: 4, LANE_LONG: 1}
+
+# Videos at least this long go to the long lane unless they are high priority
+DEFAULT_LONG_VIDEO_SECONDS = 3600
+
+# Cost charged for a message without a duration estimate
+DEFAULT_COST_SECONDS = 600
+
+# A lane with waiting messages is served first once it has waited this long
+DEFAULT_STARVATION_SECONDS = 900
+
+class Lane:
+    """One priority lane: an SQS queue and its share of the worker's time"""
+
+    def __init__(self, name, queue_url, weight=1):
+        """
+        Args:
+            name: Lane name ('high', 'normal', 'long' or any other)
+            queue_url: URL of the lane's SQS queue
+            weight: Relative share of audio seconds processed from this lane
+        """
+        if weight <= 0:
+            raise ValueError(f"Lane {name} needs a positive weight, got {weight}")
+        self.name = name
+        self.queue_url = queue_url
+        self.weight = weight
+
+def parse_lane(spec):
+    """
+    Parse a lane spec 'name,weight,queue_url' (or 'name,queue_url' for the default weight)
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    parts = spec.split(",", 2)
+    if len(parts) == 2:
+        name, queue_url = parts
+        weight = DEFAULT_WEIGHTS.get(name, 1)
+    elif len(parts) == 3:
+        name, weight, queue_url = parts
+        weight = float(weight)
+    else:
+        raise ValueError(f"Invalid lane spec '{spec}', expected name,weight,queue_url")
+    if not name or not queue_url:
+        raise ValueError(f"Invalid lane spec '{spec}', expected name,weight,queue_url")
+    return Lane(name, queue_url, weight)
+
+def route(priority=None, duration=None, long_video_seconds=DEFAULT_LONG_VIDEO_SECONDS):
+    """
+    Lane for a message from its priority and estimated duration
+
+    High priority always goes to the high lane. Long videos and low
+    priority go to the long lane, where they share the worker by weight and
+    cannot hold up short clips.
+
+    Args:
+        priority: 'high', 'normal' or 'low' (None is normal)
+        duration: Estimated video duration in seconds, if known
+        long_video_seconds: Duration from which a video counts as long
+
+    Returns:
+        Lane name
+    """
+    if priority == PRIORITY_HIGH:
+        return LANE_HIGH
+    if priority == PRIORITY_LOW or (duration and duration >= long_video_seconds):
+        return LANE_LONG
+    return LANE_NORMAL
+
+def message_cost(body, default=DEFAULT_COST_SECONDS):
+    """Estimated audio seconds of a message, from its 'duration' field"""
+    try:
+        duration = float(body.get("duration") or 0)
+    except (TypeError, ValueError):
+        duration = 0
+    return duration if duration > 0 else default
+
+class LaneScheduler:
+    """
+    Decides which lane the worker takes its next message from
+
+    Stride scheduling over audio seconds: every lane has a virtual time,
+    and taking a message advances it by the message's estimated duration
+    divided by the lane's weight. The lane with the lowest virtual time
+    goes first. So lanes share the worker's audio throughput by weight
+    rather than by message count. One 10-hour livestream pushes its lane
+    back by 10 hours / weight, and the short clips in the other lanes run
+    in the meantime. A lane that was idle re-enters at the current minimum,
+    so it gets no credit for the time nobody used it. A lane that has been
+    passed over for starvation_seconds while it had messages goes first
+    regardless of weight, so even a weight-1 lane keeps moving under a
+    constant stream of high-priority work. Time spent on the lane's own
+    job does not count as waiting.
+    """
+
+    def __init__(self, lanes, starvation_seconds=DEFAULT_STARVATION_SECONDS, clock=time.monotonic):
+        """
+        Args:
+            lanes: List of Lane
+            starvation_seconds: Longest a lane with waiting messages is passed over
+            clock: Time source (seconds), replaceable for simulations
+        """
+        if not lanes:
+            raise ValueError("At least one lane is needed")
+        names = [lane.name for lane in lanes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate lane names: {names}")
+
+        self.lanes = list(lanes)
+        self.starvation_seconds = starvation_seconds
+        self.clock = clock
+        self._pass = {lane.name: 0.0 for lane in lanes}
+        self._waiting_since = {lane.name: None for lane in lanes}
+        self._idle = {lane.name: True for lane in lanes}
+        self._lock = threading.Lock()
+
+    def lane(self, name):
+        """Lane by name, or None"""
+        return next((lane for lane in self.lanes if lane.name == name), None)
+
+    def order(self, waiting):
+        """
+        Lanes to try, best first
+
+        Args:
+            waiting: Dict of lane name -> visible messages (lanes that are
+                missing or at 0 are skipped)
+
+        Returns:
+            List of Lane
+        """
+        now = self.clock()
+        with self._lock:
+            busy = [lane for lane in self.lanes if waiting.get(lane.name, 0) > 0]
+            floor = min((self._pass[lane.name] for lane in busy if not self._idle[lane.name]), default=None)
+            for lane in self.lanes:
+                if lane not in busy:
+                    self._idle[lane.name] = True
+                    self._waiting_since[lane.name] = None
+                elif self._idle[lane.name]:
+                    self._idle[lane.name] = False
+                    if floor is not None:
+                        self._pass[lane.name] = max(self._pass[lane.name], floor)
+
+            def key(lane):
+                since = self._waiting_since[lane.name]
+                starved = since is not None and now - since >= self.starvation_seconds
+                return (not starved, since if starved else 0, self._pass[lane.name], -lane.weight)
+
+            return sorted(busy, key=key)
+
+    def charge(self, lane_name, cost):
+        """Account a message taken from a lane (cost in estimated audio seconds)"""
+        now = self.clock()
+        with self._lock:
+            lane = self.lane(lane_name)
+            self._pass[lane_name] += cost / lane.weight
+            self._waiting_since[lane_name] = None
+
+            # The other lanes with messages start (or keep) waiting
+            for other in self.lanes:
+                if other.name != lane_name and not self._idle[other.name] \
+                        and self._waiting_since[other.name] is None:
+                    self._waiting_since[other.name] = now
+
+    def get_stats(self):
+        """Virtual times per lane, for the heartbeat"""
+        with self._lock:
+            return {name: round(value, 1) for name, value in self._pass.items()}
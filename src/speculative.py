@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+# speculative.py - Draft-then-refine planning for phrase-search transcription
+
+import zlib
+import bisect
+import logging
+from src.vad import SpeechMap, clean_regions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DRAFT_MODEL = "tiny.en"
+
+# Seconds of audio kept around each candidate; draft word times are
+# interpolated within segments, so they can be off by a few seconds
+DEFAULT_MARGIN_SECONDS = 5.0
+
+# Whisper's own failure thresholds (see openai/whisper transcribe.py)
+LOW_AVG_LOGPROB = -1.0
+MAX_COMPRESSION_RATIO = 2.4
+
+# Plausible speaking rates; segments outside them are likely misrecognized
+MIN_CHARS_PER_SECOND = 4.0
+MAX_CHARS_PER_SECOND = 30.0
+MIN_RATE_CHECK_SECONDS = 5.0
+
+def compression_ratio(text):
+    """gzip-style compression ratio of a text; high values mean repetition loops"""
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+def low_confidence_reason(segment):
+    """
+    Why a draft segment should not be trusted, or None
+
+    Uses the decoder's average log probability when the pipeline reports
+    it, otherwise the text's compression ratio and speaking rate.
+
+    Args:
+        segment: Draft segment with 'start', 'end' and 'text'
+
+    Returns:
+        Short reason string, or None if the segment looks fine
+    """
+    avg_logprob = segment.get("avg_logprob")
+    if avg_logprob is not None and avg_logprob < LOW_AVG_LOGPROB:
+        return "avg_logprob"
+
+    text = segment.get("text", "").strip()
+    if compression_ratio(text) > MAX_COMPRESSION_RATIO:
+        return "repetition"
+
+    seconds = segment.get("end", 0.0) - segment.get("start", 0.0)
+    if seconds >= MIN_RATE_CHECK_SECONDS:
+        rate = len(text) / seconds
+        if rate < MIN_CHARS_PER_SECOND:
+            return "sparse"
+        if rate > MAX_CHARS_PER_SECOND:
+            return "dense"
+    return None
+
+def plan_refinement(regions, duration, chunk_size, margin=DEFAULT_MARGIN_SECONDS):
+    """
+    Turn candidate and low-confidence regions into windows to re-transcribe
+
+    Regions are padded by margin, merged when they touch, packed into
+    windows of at most chunk_size and split evenly when longer (the same
+    planning as the VAD pre-pass).
+
+    Args:
+        regions: (start, end) tuples in seconds, in any order
+        duration: Audio duration in seconds
+        chunk_size: Maximum window length in seconds
+        margin: Seconds of context added on both sides
+
+    Returns:
+        List of (start, end) tuples in seconds
+    """
+    merged = clean_regions(sorted(regions), duration, pad=margin, min_gap=0.0, min_speech=0.0)
+    return SpeechMap(merged, duration).plan_chunks(chunk_size)
+
+def snap_to_segments(windows, segments):
+    """
+    Widen windows to whole draft segments
+
+    Every draft segment then lies entirely inside or outside the refined
+    windows, so no speech is transcribed twice (and no phrase counted
+    twice) at window edges. A segment shared by two windows goes to the
+    first. Windows can exceed the chunk size by up to a segment on each
+    side; WhisperX splits long input itself.
+
+    Args:
+        windows: Sorted (start, end) tuples in seconds
+        segments: Draft segments with absolute 'start' and 'end', sorted by start
+
+    Returns:
+        List of (start, end) tuples in seconds
+    """
+    seg_starts = [segment["start"] for segment in segments]
+    snapped = []
+    for start, end in windows:
+        k = max(0, bisect.bisect_right(seg_starts, start) - 1)
+        while k < len(segments) and segments[k]["start"] < end:
+            if segments[k]["end"] > start:
+                start = min(start, segments[k]["start"])
+                end = max(end, segments[k]["end"])
+            k += 1
+        if snapped and start < snapped[-1][1]:
+            # The shared segment already belongs to the previous window
+            start = snapped[-1][1]
+        if end > start:
+            snapped.append((start, end))
+    return snapped
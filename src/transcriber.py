@@ -2,15 +2,32 @@
 # transcriber.py - WhisperX Transcription Module
 
 import os
+import gc
+import bisect
 import json
 import logging
+import dataclasses
+from collections import OrderedDict
 import numpy as np
 import torch
 import whisperx
 from datetime import datetime
+import time
 import tempfile
-import boto3
+import threading
 import soundfile as sf
+from src.transcript_format import CompactTranscript, TranscriptBuilder, TranscriptFormatError
+from src.utils.compression import (put_encoded_object, put_encoded_file, get_decoded_object,
+                                   DEFAULT_ENCODING, ENCODING_GZIP)
+from src.utils.aws_clients import get_client, get_async_uploader
+from src.utils.tracing import maybe_stage
+from src.vad import SpeechDetector, SpeechMap, BACKEND_AUTO
+from src.scanner import PhraseScanner
+from src.speculative import (low_confidence_reason, plan_refinement, snap_to_segments,
+                             DEFAULT_DRAFT_MODEL, DEFAULT_MARGIN_SECONDS)
+from src.keyword_spotter import (KeywordSpotter, find_blank_id, DEFAULT_MIN_SCORE, DEFAULT_ACCEPT_SCORE,
+                                 DEFAULT_VERIFY_MARGIN, VERIFY_UNCERTAIN, VERIFY_ALL)
+from src.inference_batcher import InferenceBatcher, DEFAULT_MAX_WAIT_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +47,9 @@ class Transcriber:
     """Handles audio transcription using WhisperX with chunking and progress tracking"""
 
     def __init__(self, model_name="large-v2", device="cuda", chunk_size=30,
-                 s3_bucket=None, region="us-east-1", batch_size=16, vad_onset=0.10, vad_offset=0.80):
+                 s3_bucket=None, region="us-east-1", batch_size=16, vad_onset=0.10, vad_offset=0.80,
+                 content_encoding=DEFAULT_ENCODING, low_memory=False, vad_prepass=False,
+                 vad_backend=BACKEND_AUTO, compute_type=None, cpu_threads=None, max_loaded_models=2):
         """
         Initialize the transcriber
         
@@ -43,45 +62,257 @@ class Transcriber:
             batch_size: Batch size for processing
             vad_onset: Voice activity detection onset threshold (0-1)
             vad_offset: Voice activity detection offset threshold (0-1)
+            content_encoding: Compression for JSON uploads ('gzip', 'zstd' or 'none')
+            low_memory: Spill finished chunks to disk and stream the final
+                transcript, so memory does not grow with audio duration.
+                Peak RSS is then roughly the model plus two chunks of audio
+                (2 x chunk_size x 16000 x 4 bytes, plus the source format's
+                frame size when it is not 16 kHz) plus one chunk's segments.
+                resume_transcription and transcribe_stream then return a
+                memory-mapped CompactTranscript instead of a dict.
+            vad_prepass: Detect speech over the whole file once before
+                inference and plan chunks over speech regions only, so
+                silence and music are never transcribed (file-based
+                transcription only; see resume_transcription)
+            vad_backend: Speech detector for the pre-pass ('auto', 'pyannote' or 'energy')
+            compute_type: CTranslate2 compute type (default: 'float16' on
+                CUDA, 'int8' on CPU; see src/cpu_profile.py)
+            cpu_threads: Threads per CPU operator (default: WhisperX's)
+            max_loaded_models: Whisper models kept in memory for use_model()
+                to switch back to without reloading
         """
         self.model_name = model_name
         self.device = "cuda" if torch.cuda.is_available() and device == "cuda" else "cpu"
         self.chunk_size = chunk_size
         self.s3_bucket = s3_bucket
-        self.s3 = boto3.client('s3', region_name=region) if s3_bucket else None
+        self.s3 = get_client('s3', region) if s3_bucket else None
+        self.uploader = get_async_uploader(region) if s3_bucket else None
+        # Background checkpoint uploads per video, waited for before the transcript is saved
+        self._checkpoint_uploads = {}
         self.batch_size = batch_size
         self.vad_onset = vad_onset
         self.vad_offset = vad_offset
+        self.content_encoding = content_encoding
+        self.low_memory = low_memory
+        self.vad_prepass = vad_prepass
+        self.vad_backend = vad_backend
+        self.speech_detector = None
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = None
         self.model = None
+        # Loaded pipelines by (model, compute type, threads), least recently used first
+        self.max_loaded_models = max(1, max_loaded_models)
+        self._loaded_models = OrderedDict()
+        self.draft_model = None
+        self.draft_model_name = None
+        self.alignment_model = None
+
+        # Set by start_batching() when several jobs share this transcriber
+        self.batcher = None
+        self._load_lock = threading.RLock()
+        # The draft model is not batched; jobs on other threads take turns
+        self._draft_lock = threading.Lock()
 
         logger.info(f"Initializing transcriber with model={model_name}, device={self.device}")
 
     def load_model(self):
-        """Load the WhisperX model"""
+        """
+        Load the WhisperX model and the alignment model
+
+        Setting self.model to None reloads only the WhisperX model (e.g.
+        after changing compute_type); the alignment model is kept.
+        """
+        if self.model is not None and self.alignment_model is not None:
+            return
+
+        # Concurrent jobs must not load the same model twice
+        with self._load_lock:
+            try:
+                if self.model is None:
+                    # Pipelines loaded with other compute settings are not reused
+                    key = self._model_key(self.model_name)
+                    for loaded in [k for k in self._loaded_models if k == key or k[1:] != key[1:]]:
+                        self._loaded_models.pop(loaded)
+                    self._evict_models(self.max_loaded_models - 1)
+                    self.model = self._load_whisper_model(self.model_name)
+                    self._loaded_models[key] = self.model
+                    self._set_beam_size(self.model, self.beam_size)
+
+                self.load_alignment_model()
+
+                logger.info("Models loaded successfully")
+            except ModelLoadError:
+                raise
+            except Exception as e:
+                error_msg = f"Failed to load WhisperX model: {str(e)}"
+                logger.error(error_msg)
+                raise ModelLoadError(error_msg)
+
+    def load_alignment_model(self):
+        """Load only the wav2vec2 alignment model (all keyword spotting needs)"""
+        if self.alignment_model is not None:
+            return
+
+        with self._load_lock:
+            if self.alignment_model is not None:
+                return
+            try:
+                # Load alignment model for improved word-level timestamps
+                logger.info("Loading alignment model")
+                self.alignment_model, self.metadata = whisperx.load_align_model(
+                    language_code="en",
+                    device=self.device
+                )
+            except Exception as e:
+                error_msg = f"Failed to load alignment model: {str(e)}"
+                logger.error(error_msg)
+                raise ModelLoadError(error_msg)
+
+    def _load_whisper_model(self, model_name):
+        """Load a WhisperX pipeline with this transcriber's device, compute and VAD settings"""
+        # float16 is not supported by CTranslate2 on CPU
+        compute_type = self.compute_type or ("float16" if self.device == "cuda" else "int8")
+        logger.info(f"Loading WhisperX model {model_name} on {self.device} ({compute_type})")
+        options = {"threads": self.cpu_threads} if self.cpu_threads else {}
+
+        # VAD thresholds are a pipeline option in WhisperX, fixed at load time
+        return whisperx.load_model(
+            model_name,
+            self.device,
+            compute_type=compute_type,
+            vad_options={"vad_onset": self.vad_onset, "vad_offset": self.vad_offset},
+            **options
+        )
+
+    def load_draft_model(self, model_name=DEFAULT_DRAFT_MODEL):
+        """Load the small model used for speculative drafts (kept alongside the main model)"""
+        if self.draft_model is not None and self.draft_model_name == model_name:
+            return
+
+        with self._load_lock:
+            if self.draft_model is not None and self.draft_model_name == model_name:
+                return
+            try:
+                self.draft_model = self._load_whisper_model(model_name)
+                self.draft_model_name = model_name
+                # Drafts only need to be good enough to find candidates
+                self._set_beam_size(self.draft_model, 1)
+            except Exception as e:
+                error_msg = f"Failed to load draft model: {str(e)}"
+                logger.error(error_msg)
+                raise ModelLoadError(error_msg)
+
+    def _model_key(self, model_name):
+        """Key of a loaded pipeline: the model and the settings it was loaded with"""
+        return (model_name, self.compute_type, self.cpu_threads)
+
+    def _evict_models(self, keep):
+        """Free the least recently used pipelines until at most `keep` stay loaded"""
+        if len(self._loaded_models) <= keep:
+            return
+        while len(self._loaded_models) > keep:
+            key, _ = self._loaded_models.popitem(last=False)
+            logger.info(f"Unloading WhisperX model {key[0]}")
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def use_model(self, model_name, beam_size=None):
+        """
+        Select the Whisper model and beam size for the next transcription
+
+        The last max_loaded_models models stay in memory, so switching back
+        and forth between rungs (e.g. short and normal videos) does not
+        reload them; another model is loaded on the next load_model(),
+        freeing the least recently used one. Beam size changes apply to the
+        loaded model directly.
+
+        Args:
+            model_name: WhisperX model to use
+            beam_size: Decoding beam size (None keeps the model's default)
+        """
+        if model_name != self.model_name:
+            logger.info(f"Switching model {self.model_name} -> {model_name}")
+            self.model_name = model_name
+            key = self._model_key(model_name)
+            self.model = self._loaded_models.get(key)
+            if self.model is not None:
+                self._loaded_models.move_to_end(key)
+
+        self.beam_size = beam_size
         if self.model is not None:
+            self._set_beam_size(self.model, beam_size)
+
+    @staticmethod
+    def _set_beam_size(model, beam_size):
+        """Set a loaded pipeline's decoding beam size (None leaves it unchanged)"""
+        options = getattr(model, "options", None)
+        if beam_size is None or options is None:
             return
+        changes = {"beam_size": beam_size, "best_of": beam_size}
+        # TranscriptionOptions is a NamedTuple in older faster-whisper releases, a dataclass in newer ones
+        if hasattr(options, "_replace"):
+            model.options = options._replace(**changes)
+        else:
+            model.options = dataclasses.replace(options, **changes)
+
+    def start_batching(self, max_wait=DEFAULT_MAX_WAIT_SECONDS):
+        """
+        Decode through an InferenceBatcher shared by concurrent jobs
 
-        try:
-            logger.info(f"Loading WhisperX model {self.model_name} on {self.device}")
-            self.model = whisperx.load_model(self.model_name, self.device)
-
-            # Load alignment model for improved word-level timestamps
-            logger.info("Loading alignment model")
-            self.alignment_model, self.metadata = whisperx.load_align_model(
-                language_code="en",
-                device=self.device
-            )
+        Whisper decoding of every chunk then goes through shared batches
+        of batch_size speech segments (see src/inference_batcher.py). VAD
+        and alignment still run on the job's own thread.
 
-            logger.info("Models loaded successfully")
-        except Exception as e:
-            error_msg = f"Failed to load WhisperX model: {str(e)}"
-            logger.error(error_msg)
-            raise ModelLoadError(error_msg)
+        Args:
+            max_wait: Seconds a segment may wait for a batch to fill
+        """
+        if self.batcher is None:
+            self.batcher = InferenceBatcher(lambda: self.model, batch_size=self.batch_size, max_wait=max_wait,
+                                            chunk_size=self.chunk_size)
+            logger.info(f"Sharing inference batches of {self.batch_size} segments across jobs "
+                        f"(max wait {max_wait}s)")
+
+    def stop_batching(self):
+        """Stop the shared inference thread"""
+        if self.batcher is not None:
+            self.batcher.stop()
+            self.batcher = None
+
+    def _whisper_transcribe(self, audio, language, video_id=None):
+        """Transcribe a chunk with the main model, through the shared batches when enabled"""
+        if self.batcher is None:
+            return self.model.transcribe(audio, batch_size=self.batch_size, language=language)
+        if not isinstance(audio, np.ndarray):
+            audio = whisperx.load_audio(audio)
+        return self.batcher.transcribe(audio, language, job_id=video_id)
+
+    def plan_chunks(self, duration):
+        """
+        Plan chunk boundaries for audio of a known duration
+        
+        Args:
+            duration: Audio duration in seconds
+            
+        Returns:
+            List of (start, end) tuples in seconds, one per chunk
+        """
+        chunks = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.chunk_size, duration)
+            chunks.append((start, end))
+            start += self.chunk_size
+        return chunks
 
     def segment_audio(self, audio_file, output_dir):
         """
         Split audio file into chunks for processing
         
+        The file is read one chunk at a time, so memory use does not depend
+        on the length (or sample format) of the audio.
+        
         Args:
             audio_file: Path to audio file
             output_dir: Directory to save chunks
@@ -91,25 +322,15 @@ class Transcriber:
         """
         try:
             os.makedirs(output_dir, exist_ok=True)
+            logger.info(f"Splitting audio file: {audio_file}")
 
-            # Load audio file
-            logger.info(f"Loading audio file: {audio_file}")
-            audio_data, sample_rate = sf.read(audio_file)
-
-            # Calculate chunk size in samples
-            chunk_samples = int(self.chunk_size * sample_rate)
-            total_samples = len(audio_data)
-
-            # Create chunks
             chunk_files = []
-            for i, start_idx in enumerate(range(0, total_samples, chunk_samples)):
-                end_idx = min(start_idx + chunk_samples, total_samples)
-                chunk_data = audio_data[start_idx:end_idx]
-
-                # Save chunk
-                chunk_file = os.path.join(output_dir, f"chunk_{i:04d}.wav")
-                sf.write(chunk_file, chunk_data, sample_rate)
-                chunk_files.append(chunk_file)
+            with sf.SoundFile(audio_file) as f:
+                chunk_frames = int(self.chunk_size * f.samplerate)
+                for i, block in enumerate(f.blocks(blocksize=chunk_frames, dtype="float32")):
+                    chunk_file = os.path.join(output_dir, f"chunk_{i:04d}.wav")
+                    sf.write(chunk_file, block, f.samplerate)
+                    chunk_files.append(chunk_file)
 
             logger.info(f"Created {len(chunk_files)} audio chunks")
             return chunk_files
@@ -119,6 +340,70 @@ class Transcriber:
             logger.error(error_msg)
             raise AudioProcessingError(error_msg)
 
+    def count_chunks(self, audio_file):
+        """Number of chunks segment_audio/iter_audio_chunks produce for a file without a plan"""
+        info = sf.info(audio_file)
+        chunk_frames = int(self.chunk_size * info.samplerate)
+        return -(-info.frames // chunk_frames)
+
+    def iter_audio_chunks(self, audio_file, output_dir, skip=(), trace=None, plan=None):
+        """
+        Read an audio file lazily, one chunk at a time
+        
+        16 kHz files (what convert_to_wav produces) are yielded as mono
+        float32 arrays; other rates are written to a chunk WAV that is
+        removed when the next chunk is requested, and WhisperX resamples it.
+        Only one chunk is held in memory at a time.
+        
+        Args:
+            audio_file: Path to audio file
+            output_dir: Directory for chunk files
+            skip: Chunk indices not to read (already transcribed)
+            trace: Optional JobTrace; read time is added to its "chunking" stage
+            plan: Optional list of (start, end) tuples in seconds to read
+                instead of consecutive chunk_size chunks (see SpeechMap.plan_chunks)
+            
+        Yields:
+            (chunk index, audio array or chunk file path)
+        """
+        try:
+            f = sf.SoundFile(audio_file)
+        except Exception as e:
+            error_msg = f"Error opening audio: {str(e)}"
+            logger.error(error_msg)
+            raise AudioProcessingError(error_msg)
+
+        with f:
+            if plan is None:
+                chunk_frames = int(self.chunk_size * f.samplerate)
+                windows = [(start, min(start + chunk_frames, f.frames)) for start in range(0, f.frames, chunk_frames)]
+            else:
+                windows = [(int(start * f.samplerate), min(int(end * f.samplerate), f.frames)) for start, end in plan]
+
+            for i, (start, end) in enumerate(windows):
+                if i in skip:
+                    continue
+
+                read_start = time.perf_counter()
+                f.seek(start)
+                audio = f.read(end - start, dtype="float32", always_2d=True).mean(axis=1)
+
+                if f.samplerate == 16000:
+                    if trace is not None:
+                        trace.add_stage_time("chunking", time.perf_counter() - read_start)
+                    yield i, audio
+                    continue
+
+                chunk_file = os.path.join(output_dir, f"chunk_{i:04d}.wav")
+                sf.write(chunk_file, audio, f.samplerate)
+                del audio
+                if trace is not None:
+                    trace.add_stage_time("chunking", time.perf_counter() - read_start)
+                try:
+                    yield i, chunk_file
+                finally:
+                    os.remove(chunk_file)
+
     def transcribe_audio(self, audio_file, job_id=None, job_tracker=None, video_id=None, language="en"):
         """
         Transcribe audio file with progress tracking
@@ -148,25 +433,13 @@ class Transcriber:
                     job_tracker.update_progress(job_id, total_chunks=len(chunk_files), completed_chunks=0)
 
                 # Process each chunk
-                all_segments = []
-
-                # This is to be passed to the self.model.transcribe as in 
-                # something like:   result = self.model.transcribe(audio, vad_options=vad_options)
-                vad_options = {
-                    "vad_onset": self.vad_onset,
-                    "vad_offset": self.vad_offset,
-                }
+                builder = TranscriptBuilder()
 
                 for i, chunk_file in enumerate(chunk_files):
                     logger.info(f"Processing chunk {i+1}/{len(chunk_files)}")
 
                     # Transcribe chunk
-                    result = self.model.transcribe(
-                        chunk_file,
-                        batch_size=self.batch_size,
-                        language=language,
-                        vad_options=vad_options
-                    )
+                    result = self._whisper_transcribe(chunk_file, language, video_id)
 
                     # Align words for precise timestamps
                     result = whisperx.align(
@@ -177,27 +450,19 @@ class Transcriber:
                         device=self.device
                     )
 
-                    # Adjust timestamps for chunk position
-                    chunk_start_time = i * self.chunk_size
-                    for segment in result["segments"]:
-                        segment["start"] += chunk_start_time
-                        segment["end"] += chunk_start_time
-
-                        for word in segment["words"]:
-                            word["start"] += chunk_start_time
-                            word["end"] += chunk_start_time
-
-                    # Add to results
-                    all_segments.extend(result["segments"])
+                    # Add to results, shifted to the chunk's position
+                    builder.add_chunk(i, result["segments"], i * self.chunk_size)
 
                     # Save progress to S3 if needed
                     if self.s3_bucket and video_id:
                         segment_key = f"transcripts/{video_id}/segments/chunk_{i:04d}.json"
-                        self.s3.put_object(
-                            Body=json.dumps(result["segments"]),
+                        put_encoded_object(
+                            self.s3,
+                            Body=self._checkpoint_body(result["segments"], i * self.chunk_size),
                             Bucket=self.s3_bucket,
                             Key=segment_key,
-                            ContentType="application/json"
+                            ContentType="application/json",
+                            encoding=self.content_encoding
                         )
 
                     # Update progress
@@ -205,21 +470,18 @@ class Transcriber:
                         job_tracker.update_progress(job_id, completed_chunks=i+1)
 
                 # Combine results
-                final_result = {
-                    "segments": sorted(all_segments, key=lambda x: x["start"]),
-                    "language": language,
-                    "video_id": video_id,
-                    "transcribed_at": datetime.now().isoformat()
-                }
+                final_result = builder.build(language, video_id, datetime.now().isoformat()).to_dict()
 
                 # Save complete transcript
                 if self.s3_bucket and video_id:
                     transcript_key = f"transcripts/{video_id}/full_transcript.json"
-                    self.s3.put_object(
+                    put_encoded_object(
+                        self.s3,
                         Body=json.dumps(final_result),
                         Bucket=self.s3_bucket,
                         Key=transcript_key,
-                        ContentType="application/json"
+                        ContentType="application/json",
+                        encoding=self.content_encoding
                     )
 
                 return final_result
@@ -229,10 +491,39 @@ class Transcriber:
             logger.error(error_msg)
             raise TranscriptionError(error_msg)
 
+    def load_compact_transcript_from_s3(self, video_id):
+        """
+        Load the compact binary transcript from S3 if it exists
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            CompactTranscript or None if not found
+        """
+        if not self.s3_bucket:
+            return None
+
+        try:
+            transcript_key = f"transcripts/{video_id}/full_transcript.ytc"
+            return CompactTranscript.from_bytes(get_decoded_object(self.s3, Bucket=self.s3_bucket, Key=transcript_key))
+
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        except (TranscriptFormatError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable compact transcript for {video_id}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading compact transcript from S3: {str(e)}")
+            return None
+
     def load_transcript_from_s3(self, video_id):
         """
         Load transcript from S3 if it exists
         
+        The compact binary copy is preferred since it is much faster to
+        parse than the JSON export; older transcripts only have the JSON.
+        
         Args:
             video_id: YouTube video ID
             
@@ -242,10 +533,14 @@ class Transcriber:
         if not self.s3_bucket:
             return None
 
+        compact = self.load_compact_transcript_from_s3(video_id)
+        if compact is not None:
+            return compact.to_dict()
+
         try:
             transcript_key = f"transcripts/{video_id}/full_transcript.json"
-            response = self.s3.get_object(Bucket=self.s3_bucket, Key=transcript_key)
-            transcript_data = json.loads(response['Body'].read().decode('utf-8'))
+            body = get_decoded_object(self.s3, Bucket=self.s3_bucket, Key=transcript_key)
+            transcript_data = json.loads(body.decode('utf-8'))
             return transcript_data
 
         except self.s3.exceptions.NoSuchKey:
@@ -263,15 +558,16 @@ class Transcriber:
             chunk_index: Chunk index to load
             
         Returns:
-            Segment data or None if not found
+            Checkpoint data (a segment list with absolute timestamps) or
+            None if not found
         """
         if not self.s3_bucket:
             return None
 
         try:
             segment_key = f"transcripts/{video_id}/segments/chunk_{chunk_index:04d}.json"
-            response = self.s3.get_object(Bucket=self.s3_bucket, Key=segment_key)
-            segment_data = json.loads(response['Body'].read().decode('utf-8'))
+            body = get_decoded_object(self.s3, Bucket=self.s3_bucket, Key=segment_key)
+            segment_data = json.loads(body.decode('utf-8'))
             return segment_data
 
         except self.s3.exceptions.NoSuchKey:
@@ -280,6 +576,36 @@ class Transcriber:
             logger.error(f"Error loading segment from S3: {str(e)}")
             return None
 
+    @staticmethod
+    def _checkpoint_body(segments, offset):
+        """
+        Serialize a chunk checkpoint: a list of segments with absolute
+        timestamps, the format the web viewer reads for in-progress videos
+        """
+        def shift(item):
+            shifted = dict(item)
+            for key in ("start", "end"):
+                if item.get(key) is not None:
+                    shifted[key] = item[key] + offset
+            return shifted
+
+        absolute = []
+        for segment in segments:
+            shifted = shift(segment)
+            if "words" in segment:
+                shifted["words"] = [shift(word) for word in segment["words"]]
+            absolute.append(shifted)
+        return json.dumps(absolute)
+
+    @staticmethod
+    def _add_checkpoint(builder, chunk_index, segment_data):
+        """Add a checkpoint loaded by load_segment_from_s3 to a TranscriptBuilder"""
+        if isinstance(segment_data, dict):
+            # Checkpoints briefly stored chunk-relative segments with their offset
+            builder.add_chunk(chunk_index, segment_data["segments"], segment_data.get("offset", 0.0))
+        else:
+            builder.add_chunk(chunk_index, segment_data)
+
     def get_completed_segments(self, video_id):
         """
         Get list of completed segment indices from S3
@@ -316,7 +642,302 @@ class Transcriber:
             logger.error(f"Error listing completed segments: {str(e)}")
             return []
 
-    def resume_transcription(self, audio_file, job_id, job_tracker, video_id, language="en"):
+    def load_speech_map_from_s3(self, video_id):
+        """
+        Load the cached speech map of a video from S3
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            SpeechMap or None if not found
+        """
+        if not self.s3_bucket:
+            return None
+
+        try:
+            speech_map_key = f"transcripts/{video_id}/speech_map.json"
+            body = get_decoded_object(self.s3, Bucket=self.s3_bucket, Key=speech_map_key)
+            return SpeechMap.from_dict(json.loads(body.decode('utf-8')))
+
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading speech map from S3: {str(e)}")
+            return None
+
+    def load_checkpoint_model_from_s3(self, video_id):
+        """
+        Load the model and beam size that wrote a video's chunk checkpoints
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            {"model": ..., "beam_size": ...} or None if not recorded
+        """
+        if not self.s3_bucket:
+            return None
+
+        try:
+            body = get_decoded_object(self.s3, Bucket=self.s3_bucket,
+                                      Key=f"transcripts/{video_id}/checkpoint_model.json")
+            return json.loads(body.decode('utf-8'))
+
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading checkpoint model from S3: {str(e)}")
+            return None
+
+    def _checkpoints_for_model(self, video_id, completed_segments):
+        """
+        Keep the completed chunks only if the current model wrote them
+
+        The model and beam size are recorded next to the checkpoints before
+        the first one is written. Checkpoints of another model are deleted
+        and transcribed again, so a transcript never mixes models.
+        Checkpoints written before the model was recorded are kept.
+
+        Returns:
+            The chunk indices to reuse
+        """
+        if not self.s3_bucket:
+            return completed_segments
+
+        current = {"model": self.model_name, "beam_size": self.beam_size}
+        recorded = self.load_checkpoint_model_from_s3(video_id)
+        if recorded == current or (recorded is None and completed_segments):
+            return completed_segments
+
+        if completed_segments:
+            logger.info(f"Discarding {len(completed_segments)} checkpoints of {video_id} written by "
+                        f"{recorded.get('model')} (beam {recorded.get('beam_size')})")
+            keys = [{"Key": f"transcripts/{video_id}/segments/chunk_{idx:04d}.json"} for idx in completed_segments]
+            for start in range(0, len(keys), 1000):
+                self.s3.delete_objects(Bucket=self.s3_bucket, Delete={"Objects": keys[start:start + 1000],
+                                                                      "Quiet": True})
+
+        put_encoded_object(
+            self.s3,
+            Body=json.dumps(current),
+            Bucket=self.s3_bucket,
+            Key=f"transcripts/{video_id}/checkpoint_model.json",
+            ContentType="application/json",
+            encoding=self.content_encoding
+        )
+        return []
+
+    def _speech_plan(self, audio_file, job_id, job_tracker, video_id, completed_segments, trace=None):
+        """
+        Chunk plan from the whole-file VAD pre-pass, or None for fixed-size chunks
+
+        The speech map is cached next to the checkpoints, so a resumed job
+        plans exactly the same chunks. A job whose checkpoints were written
+        without a speech map keeps fixed-size chunks (and vice versa), since
+        the chunk indices of the two plans do not line up.
+        """
+        speech_map = self.load_speech_map_from_s3(video_id)
+        if speech_map is None:
+            if not self.vad_prepass:
+                return None
+            if completed_segments:
+                logger.info(f"{video_id} was started without a speech map, keeping fixed-size chunks")
+                return None
+
+            with self._load_lock:
+                if self.speech_detector is None:
+                    self.speech_detector = SpeechDetector(self.vad_backend, self.device,
+                                                          onset=self.vad_onset, offset=self.vad_offset)
+            with maybe_stage(trace, "vad"):
+                speech_map = self.speech_detector.detect(audio_file)
+
+            # Cached before any checkpoint is written, so checkpoints always imply the map
+            if self.s3_bucket:
+                put_encoded_object(
+                    self.s3,
+                    Body=json.dumps(speech_map.to_dict()),
+                    Bucket=self.s3_bucket,
+                    Key=f"transcripts/{video_id}/speech_map.json",
+                    ContentType="application/json",
+                    encoding=self.content_encoding
+                )
+        elif not self.vad_prepass and not completed_segments:
+            return None
+
+        plan = speech_map.plan_chunks(self.chunk_size)
+        logger.info(f"Speech covers {speech_map.speech_seconds:.0f}s of {speech_map.duration:.0f}s: "
+                    f"{len(plan)} chunks instead of {len(self.plan_chunks(speech_map.duration))}")
+        if job_tracker:
+            job_tracker.update_progress(job_id, speech=dict(speech_map.summary(), chunks=len(plan)))
+        return plan
+
+    def _chunk_seconds(self, audio):
+        """Length in seconds of a chunk given as a file path or a 16 kHz array"""
+        if isinstance(audio, np.ndarray):
+            return len(audio) / 16000
+        return sf.info(audio).duration
+
+    def _transcribe_chunk(self, audio, chunk_index, builder, language, video_id, trace=None, offset=None,
+                          checkpoint=True):
+        """
+        Transcribe and align one chunk, add it to the transcript and checkpoint it
+        
+        Args:
+            audio: Chunk audio file path or 16 kHz float32 numpy array
+            chunk_index: Index of the chunk within the video
+            builder: TranscriptBuilder collecting the video's chunks
+            language: Language code
+            video_id: YouTube video ID
+            trace: Optional JobTrace recording transcribe/align timings
+            offset: Start of the chunk in seconds (default chunk_index * chunk_size)
+            checkpoint: Save the chunk to S3 for resuming
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        # Transcribe chunk
+        result = self._whisper_transcribe(audio, language, video_id)
+        transcribe_wall = time.perf_counter() - wall_start
+        transcribe_cpu = time.process_time() - cpu_start
+
+        # Align words for precise timestamps
+        result = whisperx.align(
+            result["segments"],
+            self.alignment_model,
+            self.metadata,
+            audio,
+            device=self.device
+        )
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        if trace is not None:
+            trace.add_stage_time("transcribe", transcribe_wall, transcribe_cpu)
+            trace.add_stage_time("align", wall - transcribe_wall, cpu - transcribe_cpu)
+            trace.record_chunk(chunk_index, self._chunk_seconds(audio), wall, cpu,
+                               transcribe=transcribe_wall, align=wall - transcribe_wall)
+
+        # Timestamps are shifted to the chunk's position in one vectorized add
+        if offset is None:
+            offset = chunk_index * self.chunk_size
+        builder.add_chunk(chunk_index, result["segments"], offset)
+
+        # Save progress to S3 in the background; inference continues meanwhile
+        if self.s3_bucket and checkpoint:
+            segment_key = f"transcripts/{video_id}/segments/chunk_{chunk_index:04d}.json"
+            upload = self.uploader.put_encoded_object(
+                Body=self._checkpoint_body(result["segments"], offset),
+                Bucket=self.s3_bucket,
+                Key=segment_key,
+                ContentType="application/json",
+                encoding=self.content_encoding
+            )
+            self._checkpoint_uploads.setdefault(video_id, []).append(upload)
+
+    def _wait_for_checkpoints(self, video_id):
+        """
+        Wait for a video's background checkpoint uploads
+
+        Raises:
+            TranscriptionError: If any of them failed; the transcript must not
+                mark the video as done while its checkpoints are missing
+        """
+        errors = self.uploader.wait(self._checkpoint_uploads.pop(video_id, []))
+        if errors:
+            for error in errors:
+                logger.error(f"Checkpoint upload for {video_id} failed: {str(error)}")
+            raise TranscriptionError(f"{len(errors)} checkpoint uploads failed for {video_id}: {str(errors[0])}")
+
+    def _finalize_transcript(self, builder, language, video_id, trace=None):
+        """Assemble the chunks into the final transcript and save it to S3"""
+        transcribed_at = datetime.now().isoformat()
+
+        if builder.spill_dir:
+            return self._finalize_spilled_transcript(builder, language, video_id, transcribed_at, trace)
+
+        compact = builder.build(language, video_id, transcribed_at)
+
+        # The only conversion back to dicts, for the JSON export and callers
+        final_result = compact.to_dict()
+
+        # Save complete transcript: compact binary as the primary copy,
+        # JSON as the export read by the web viewer
+        if self.s3_bucket:
+            with maybe_stage(trace, "upload"):
+                # Checkpoints must be in S3 before the transcript marks the video as done
+                self._wait_for_checkpoints(video_id)
+
+                self.s3.put_object(
+                    Body=compact.to_bytes(compress=True),
+                    Bucket=self.s3_bucket,
+                    Key=f"transcripts/{video_id}/full_transcript.ytc",
+                    ContentType="application/octet-stream"
+                )
+
+                transcript_key = f"transcripts/{video_id}/full_transcript.json"
+                put_encoded_object(
+                    self.s3,
+                    Body=json.dumps(final_result),
+                    Bucket=self.s3_bucket,
+                    Key=transcript_key,
+                    ContentType="application/json",
+                    encoding=self.content_encoding
+                )
+
+        return final_result
+
+    def _finalize_spilled_transcript(self, builder, language, video_id, transcribed_at, trace=None):
+        """
+        Low-memory variant of _finalize_transcript: stream both transcript
+        files to disk chunk by chunk, upload them from there and return the
+        binary one memory-mapped
+        """
+        ytc_path = os.path.join(builder.spill_dir, "full_transcript.ytc")
+        json_path = os.path.join(builder.spill_dir, "full_transcript.json")
+
+        builder.save(ytc_path, language, video_id, transcribed_at)
+        with open(json_path, "w", encoding="utf-8") as f:
+            builder.write_json(f, language, video_id, transcribed_at)
+
+        if self.s3_bucket:
+            with maybe_stage(trace, "upload"):
+                # Checkpoints must be in S3 before the transcript marks the video as done
+                self._wait_for_checkpoints(video_id)
+
+                # Uncompressed layout on disk, so compress in transit instead
+                put_encoded_file(
+                    self.s3,
+                    ytc_path,
+                    ENCODING_GZIP,
+                    Bucket=self.s3_bucket,
+                    Key=f"transcripts/{video_id}/full_transcript.ytc",
+                    ContentType="application/octet-stream"
+                )
+
+                put_encoded_file(
+                    self.s3,
+                    json_path,
+                    self.content_encoding,
+                    Bucket=self.s3_bucket,
+                    Key=f"transcripts/{video_id}/full_transcript.json",
+                    ContentType="application/json"
+                )
+
+        os.remove(json_path)
+        # Stays readable after the spill directory is removed (the mapping keeps the file alive)
+        return CompactTranscript.load(ytc_path)
+
+    def _load_existing_transcript(self, video_id):
+        """Load a finished transcript, as a CompactTranscript in low-memory mode"""
+        if self.low_memory:
+            compact = self.load_compact_transcript_from_s3(video_id)
+            if compact is not None:
+                return compact
+        return self.load_transcript_from_s3(video_id)
+
+    def resume_transcription(self, audio_file, job_id, job_tracker, video_id, language="en", duration=None,
+                             trace=None):
         """
         Resume transcription from where it left off
         
@@ -326,121 +947,433 @@ class Transcriber:
             job_tracker: JobTracker instance
             video_id: YouTube video ID
             language: Language code
+            duration: Video duration in seconds from metadata, if known
+            trace: Optional JobTrace recording stage and chunk timings
             
         Returns:
-            Transcription result
+            Transcription result (a CompactTranscript in low-memory mode)
         """
         # Check if full transcript already exists
-        full_transcript = self.load_transcript_from_s3(video_id)
+        full_transcript = self._load_existing_transcript(video_id)
         if full_transcript:
             logger.info(f"Found complete transcript for {video_id}, skipping transcription")
             return full_transcript
 
-        # Get list of segments already processed
-        completed_segments = self.get_completed_segments(video_id)
+        # Get list of segments already processed (by the current model)
+        completed_segments = self._checkpoints_for_model(video_id, self.get_completed_segments(video_id))
         logger.info(f"Found {len(completed_segments)} completed segments for {video_id}")
 
+        # Report the expected chunk count up front when the duration is known,
+        # so progress is meaningful while the model loads and audio is split
+        if duration and job_tracker:
+            job_tracker.update_progress(job_id, total_chunks=len(self.plan_chunks(duration)),
+                                        completed_chunks=len(completed_segments))
+
         # Continue with normal transcription but skip completed chunks
         try:
             # Ensure model is loaded
-            self.load_model()
+            with maybe_stage(trace, "model_load"):
+                self.load_model()
+
+            # Whole-file VAD pre-pass: only chunks containing speech are transcribed
+            plan = self._speech_plan(audio_file, job_id, job_tracker, video_id, completed_segments, trace)
 
             # Create temporary directory for chunks
             with tempfile.TemporaryDirectory() as temp_dir:
-                # Segment audio
-                chunk_files = self.segment_audio(audio_file, temp_dir)
-
+                total_chunks = len(plan) if plan is not None else self.count_chunks(audio_file)
                 if job_tracker:
-                    job_tracker.update_progress(job_id, total_chunks=len(chunk_files),
+                    job_tracker.update_progress(job_id, total_chunks=total_chunks,
                                              completed_chunks=len(completed_segments))
 
                 # Process each chunk that hasn't been completed
-                all_segments = []
+                builder = TranscriptBuilder(os.path.join(temp_dir, "spill") if self.low_memory else None)
 
                 # First load all completed segments
                 for idx in completed_segments:
                     segment_data = self.load_segment_from_s3(video_id, idx)
                     if segment_data:
-                        all_segments.extend(segment_data)
+                        self._add_checkpoint(builder, idx, segment_data)
+
+                # Process remaining chunks; audio is read one chunk at a time
+                if completed_segments:
+                    logger.info(f"Skipping already processed chunks {completed_segments}")
+                chunks_done = len(completed_segments)
+                chunks = self.iter_audio_chunks(audio_file, temp_dir, skip=set(completed_segments), trace=trace,
+                                                plan=plan)
+                for i, audio in chunks:
+                    logger.info(f"Processing chunk {i+1}/{total_chunks}")
+                    offset = plan[i][0] if plan is not None else None
+                    self._transcribe_chunk(audio, i, builder, language, video_id, trace, offset=offset)
 
-                # Process remaining chunks
-                for i, chunk_file in enumerate(chunk_files):
-                    if i in completed_segments:
-                        logger.info(f"Skipping already processed chunk {i}")
-                        continue
+                    # Update progress
+                    chunks_done += 1
+                    if job_tracker:
+                        job_tracker.update_progress(job_id, completed_chunks=chunks_done)
 
-                    logger.info(f"Processing chunk {i+1}/{len(chunk_files)}")
+                return self._finalize_transcript(builder, language, video_id, trace)
 
-                    # Transcribe chunk
-                    result = self.model.transcribe(
-                        chunk_file,
-                        batch_size=self.batch_size,
-                        language=language
-                    )
+        except Exception as e:
+            self._checkpoint_uploads.pop(video_id, None)
+            error_msg = f"Error resuming transcription: {str(e)}"
+            logger.error(error_msg)
+            raise TranscriptionError(error_msg)
 
-                    # Align words for precise timestamps
-                    result = whisperx.align(
-                        result["segments"],
-                        self.alignment_model,
-                        self.metadata,
-                        chunk_file,
-                        device=self.device
-                    )
+    def transcribe_speculative(self, audio_file, job_id, job_tracker, video_id, phrase, language="en",
+                               duration=None, trace=None, draft_model=DEFAULT_DRAFT_MODEL,
+                               margin=DEFAULT_MARGIN_SECONDS):
+        """
+        Transcribe for a phrase search: fast draft, then refine only where it matters
+
+        A small draft model transcribes the whole file (no alignment). The
+        scanner then looks for fuzzy matches of the phrase in the draft.
+        Only windows around those candidates, plus draft segments that look
+        unreliable, are transcribed and aligned with the main model. Draft
+        segments are kept everywhere else. The result covers the whole
+        video, but it is only accurate where the phrase could be. It is
+        saved as speculative_transcript.json, never as the full transcript,
+        and gets no chunk checkpoints. An existing full transcript is
+        returned as is.
 
-                    # Adjust timestamps for chunk position
-                    chunk_start_time = i * self.chunk_size
-                    for segment in result["segments"]:
-                        segment["start"] += chunk_start_time
-                        segment["end"] += chunk_start_time
+        Args:
+            audio_file: Path to audio file
+            job_id: Job ID for tracking
+            job_tracker: JobTracker instance
+            video_id: YouTube video ID
+            phrase: Phrase the job searches for
+            language: Language code
+            duration: Video duration in seconds from metadata, if known
+            trace: Optional JobTrace recording stage and chunk timings
+            draft_model: WhisperX model for the draft pass
+            margin: Seconds of context re-transcribed around each candidate
 
-                        for word in segment["words"]:
-                            word["start"] += chunk_start_time
-                            word["end"] += chunk_start_time
+        Returns:
+            Transcript dict with an extra 'speculative' summary
+        """
+        full_transcript = self.load_transcript_from_s3(video_id)
+        if full_transcript:
+            logger.info(f"Found complete transcript for {video_id}, skipping speculative transcription")
+            return full_transcript
 
-                    # Add to results
-                    all_segments.extend(result["segments"])
+        try:
+            with maybe_stage(trace, "model_load"):
+                self.load_draft_model(draft_model)
+                self.load_model()
 
-                    # Save progress to S3
-                    if self.s3_bucket:
-                        segment_key = f"transcripts/{video_id}/segments/chunk_{i:04d}.json"
-                        self.s3.put_object(
-                            Body=json.dumps(result["segments"]),
-                            Bucket=self.s3_bucket,
-                            Key=segment_key,
-                            ContentType="application/json"
-                        )
+            plan = self._speech_plan(audio_file, job_id, job_tracker, video_id, [], trace)
+            audio_seconds = sf.info(audio_file).duration
 
-                    # Update progress
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Pass 1: draft of the whole file
+                total_chunks = len(plan) if plan is not None else self.count_chunks(audio_file)
+                if job_tracker:
+                    job_tracker.update_progress(job_id, total_chunks=total_chunks, completed_chunks=0)
+
+                draft = TranscriptBuilder()
+                suspect = []
+                with maybe_stage(trace, "draft"):
+                    for i, audio in self.iter_audio_chunks(audio_file, temp_dir, trace=trace, plan=plan):
+                        offset = plan[i][0] if plan is not None else i * self.chunk_size
+                        with self._draft_lock:
+                            segments = self.draft_model.transcribe(audio, batch_size=self.batch_size,
+                                                                   language=language)["segments"]
+                        suspect += [(offset + seg["start"], offset + seg["end"]) for seg in segments
+                                    if low_confidence_reason(seg)]
+                        draft.add_chunk(i, segments, offset)
+                        if job_tracker:
+                            job_tracker.update_progress(job_id, completed_chunks=i + 1)
+                draft_segments = draft.build(language, video_id, None).to_dict()["segments"]
+                del draft
+
+                # Candidates for the phrase, and what to re-transcribe around them
+                candidates = PhraseScanner(phrase).find_candidates(draft_segments)
+                windows = plan_refinement([(c["start"], c["end"]) for c in candidates] + suspect,
+                                          audio_seconds, self.chunk_size, margin)
+                windows = snap_to_segments(windows, draft_segments)
+                logger.info(f"Draft found {len(candidates)} candidates and {len(suspect)} low-confidence "
+                            f"segments; refining {len(windows)} windows")
+                if job_tracker:
+                    job_tracker.update_progress(job_id, total_chunks=total_chunks + len(windows))
+
+                # Pass 2: accurate transcription of the windows. Window k is
+                # chunk 2k+1 so the draft pieces between windows (even
+                # indices) slot in around them in time order.
+                final = TranscriptBuilder()
+                for k, audio in self.iter_audio_chunks(audio_file, temp_dir, trace=trace, plan=windows):
+                    self._transcribe_chunk(audio, 2 * k + 1, final, language, video_id, trace,
+                                           offset=windows[k][0], checkpoint=False)
                     if job_tracker:
-                        job_tracker.update_progress(
-                            job_id,
-                            completed_chunks=len(completed_segments) + i + 1
-                        )
-
-                # Combine results
-                final_result = {
-                    "segments": sorted(all_segments, key=lambda x: x["start"]),
-                    "language": language,
-                    "video_id": video_id,
-                    "transcribed_at": datetime.now().isoformat()
-                }
-
-                # Save complete transcript
-                if self.s3_bucket:
-                    transcript_key = f"transcripts/{video_id}/full_transcript.json"
-                    self.s3.put_object(
-                        Body=json.dumps(final_result),
+                        job_tracker.update_progress(job_id, completed_chunks=total_chunks + k + 1)
+
+                # Draft segments outside every window fill the gaps
+                window_starts = [start for start, _ in windows]
+                gaps = {}
+                for segment in draft_segments:
+                    middle = (segment["start"] + segment["end"]) / 2
+                    k = bisect.bisect_right(window_starts, middle)
+                    if k and middle < windows[k - 1][1]:
+                        continue
+                    gaps.setdefault(2 * k, []).append(segment)
+                for index, segments in gaps.items():
+                    final.add_chunk(index, segments)
+
+                result = final.build(language, video_id, datetime.now().isoformat()).to_dict()
+
+            result["speculative"] = {
+                "draft_model": draft_model,
+                "model": self.model_name,
+                "candidates": len(candidates),
+                "low_confidence_segments": len(suspect),
+                "windows": len(windows),
+                "refined_seconds": round(sum(end - start for start, end in windows), 3),
+                "audio_seconds": round(audio_seconds, 3),
+            }
+
+            if self.s3_bucket:
+                with maybe_stage(trace, "upload"):
+                    put_encoded_object(
+                        self.s3,
+                        Body=json.dumps(result),
                         Bucket=self.s3_bucket,
-                        Key=transcript_key,
-                        ContentType="application/json"
+                        Key=f"transcripts/{video_id}/speculative_transcript.json",
+                        ContentType="application/json",
+                        encoding=self.content_encoding
                     )
+            return result
 
-                return final_result
+        except Exception as e:
+            error_msg = f"Error in speculative transcription: {str(e)}"
+            logger.error(error_msg)
+            raise TranscriptionError(error_msg)
+
+
+    def _alignment_log_probs(self, audio):
+        """Per-frame character log-probabilities of the alignment model for one chunk"""
+        if not isinstance(audio, np.ndarray):
+            audio = whisperx.load_audio(audio)
+        waveform = torch.from_numpy(audio).unsqueeze(0).to(self.device)
+
+        with torch.inference_mode():
+            if self.metadata["type"] == "torchaudio":
+                emissions, _ = self.alignment_model(waveform)
+            else:
+                emissions = self.alignment_model(waveform).logits
+            emissions = torch.log_softmax(emissions, dim=-1)
+        return emissions[0].cpu().numpy()
+
+    def spot_keywords(self, audio_file, job_id, job_tracker, video_id, phrase, language="en", trace=None,
+                      verify=VERIFY_UNCERTAIN, min_score=DEFAULT_MIN_SCORE, accept_score=DEFAULT_ACCEPT_SCORE,
+                      margin=DEFAULT_VERIFY_MARGIN):
+        """
+        Count a phrase without transcribing the video
+
+        The wav2vec2 alignment model turns each chunk into per-frame
+        character probabilities (one forward pass, no decoding), and a CTC
+        keyword spotter scores the phrase's spelling against them directly
+        (see src/keyword_spotter.py). Each hit has a time span and a score.
+        Hits can then be checked by transcribing a few seconds around them
+        with the Whisper model: 'uncertain' checks hits scoring below
+        accept_score, 'all' checks every hit, and 'none' checks nothing. A
+        checked window counts the phrase occurrences in its transcript
+        (possibly zero) instead of its hits. Nothing is checkpointed and
+        no transcript is saved.
+
+        Args:
+            audio_file: Path to audio file
+            job_id: Job ID for tracking
+            job_tracker: JobTracker instance
+            video_id: YouTube video ID
+            phrase: Phrase to count
+            language: Language code (the alignment model is English)
+            trace: Optional JobTrace recording stage timings
+            verify: Which hits to verify ('none', 'uncertain' or 'all')
+            min_score: Minimum hit score (average relative log-probability per character)
+            accept_score: Hits scoring at least this are trusted without verification
+            margin: Seconds of context transcribed around a verified hit
+
+        Returns:
+            Scan results dict with 'total_occurrences', 'hits' and a
+            'keyword_spotting' summary
+        """
+        try:
+            with maybe_stage(trace, "model_load"):
+                self.load_alignment_model()
+
+            dictionary = self.metadata["dictionary"]
+            spotter = KeywordSpotter(phrase, dictionary, find_blank_id(dictionary), min_score=min_score)
+            plan = self._speech_plan(audio_file, job_id, job_tracker, video_id, [], trace)
+            audio_seconds = sf.info(audio_file).duration
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                total_chunks = len(plan) if plan is not None else self.count_chunks(audio_file)
+                if job_tracker:
+                    job_tracker.update_progress(job_id, total_chunks=total_chunks, completed_chunks=0)
+
+                spotted_seconds = 0.0
+                previous_end = None
+                with maybe_stage(trace, "spot"):
+                    for i, audio in self.iter_audio_chunks(audio_file, temp_dir, trace=trace, plan=plan):
+                        offset = plan[i][0] if plan is not None else i * self.chunk_size
+                        seconds = self._chunk_seconds(audio)
+                        log_probs = self._alignment_log_probs(audio)
+
+                        # A match must not span skipped (non-speech) audio
+                        if previous_end is not None and offset - previous_end > 0.1:
+                            spotter.reset()
+                        spotter.feed(log_probs, offset, seconds / max(1, len(log_probs)))
+                        spotted_seconds += seconds
+                        previous_end = offset + seconds
+                        if job_tracker:
+                            job_tracker.update_progress(job_id, completed_chunks=i + 1)
+                hits = spotter.finish()
+
+                # Verify hits with the Whisper model around them
+                to_verify = [hit for hit in hits
+                             if verify == VERIFY_ALL or (verify == VERIFY_UNCERTAIN and hit["score"] < accept_score)]
+                windows = plan_refinement([(hit["start"], hit["end"]) for hit in to_verify],
+                                          audio_seconds, self.chunk_size, margin)
+                window_counts = []
+                if windows:
+                    logger.info(f"Verifying {len(to_verify)} of {len(hits)} hits in {len(windows)} windows")
+                    with maybe_stage(trace, "model_load"):
+                        self.load_model()
+                    scanner = PhraseScanner(phrase)
+                    with maybe_stage(trace, "verify"):
+                        for k, audio in self.iter_audio_chunks(audio_file, temp_dir, trace=trace, plan=windows):
+                            segments = self._whisper_transcribe(audio, language, video_id)["segments"]
+                            window_counts.append(
+                                scanner.count_occurrences(" ".join(seg.get("text", "") for seg in segments)))
+
+            # Verified windows replace the hits inside them by their transcript's count
+            window_starts = [start for start, _ in windows]
+            total = sum(window_counts)
+            rejected = 0
+            for hit in hits:
+                middle = (hit["start"] + hit["end"]) / 2
+                k = bisect.bisect_right(window_starts, middle) - 1
+                if k >= 0 and middle < windows[k][1]:
+                    hit["verified"] = window_counts[k] > 0
+                    rejected += not hit["verified"]
+                else:
+                    hit["verified"] = None
+                    total += 1
+
+            logger.info(f"Keyword spotting found {len(hits)} hits for '{phrase}' ({rejected} rejected by "
+                        f"verification), {total} occurrences in {audio_seconds:.0f}s of audio")
+
+            return {
+                "phrase": phrase,
+                "case_sensitive": False,
+                "video_duration_sec": round(audio_seconds, 3),
+                "video_duration_min": audio_seconds / 60,
+                "total_occurrences": total,
+                "hits": hits,
+                "keyword_spotting": {
+                    "min_score": min_score,
+                    "accept_score": accept_score,
+                    "verify": verify,
+                    "hits": len(hits),
+                    "rejected_hits": rejected,
+                    "verified_windows": len(windows),
+                    "verified_seconds": round(sum(end - start for start, end in windows), 3),
+                    "spotted_seconds": round(spotted_seconds, 3),
+                    "audio_seconds": round(audio_seconds, 3),
+                    "model": self.model_name if windows else None,
+                },
+                "scanned_at": datetime.now().isoformat()
+            }
 
         except Exception as e:
-            error_msg = f"Error resuming transcription: {str(e)}"
+            error_msg = f"Error in keyword spotting: {str(e)}"
+            logger.error(error_msg)
+            raise TranscriptionError(error_msg)
+
+    def transcribe_stream(self, audio_stream, job_id, job_tracker, video_id, language="en", duration=None,
+                          trace=None):
+        """
+        Transcribe chunks as they arrive from a progressive download
+        
+        Chunks use the same boundaries and checkpoints as resume_transcription,
+        so a job can resume in either mode. With the VAD pre-pass (or a
+        speech map cached by an earlier attempt) chunks depend on the whole
+        file, so the stream is drained to its spooled WAV and transcribed
+        from there by resume_transcription.
+        
+        Args:
+            audio_stream: Iterable of (chunk_index, audio) pairs, e.g. a ProgressiveAudioStream
+            job_id: Job ID for tracking
+            job_tracker: JobTracker instance
+            video_id: YouTube video ID
+            language: Language code
+            duration: Video duration in seconds from metadata, if known
+            trace: Optional JobTrace recording stage and chunk timings
+            
+        Returns:
+            Transcription result (a CompactTranscript in low-memory mode)
+        """
+        # Check if full transcript already exists
+        full_transcript = self._load_existing_transcript(video_id)
+        if full_transcript:
+            logger.info(f"Found complete transcript for {video_id}, skipping transcription")
+            if hasattr(audio_stream, "close"):
+                audio_stream.close()
+            return full_transcript
+
+        # Speech-planned chunks need the whole file: let the download finish
+        # (the stream spools it to a WAV) and transcribe from the file
+        if self.vad_prepass or self.load_speech_map_from_s3(video_id) is not None:
+            logger.info(f"Speech-planned transcription for {video_id}, waiting for the full download")
+            try:
+                for _ in audio_stream:
+                    pass
+            except Exception as e:
+                error_msg = f"Error transcribing audio stream: {str(e)}"
+                logger.error(error_msg)
+                raise TranscriptionError(error_msg)
+            return self.resume_transcription(audio_stream.wav_file, job_id, job_tracker, video_id,
+                                             language=language, duration=duration, trace=trace)
+
+        completed_segments = self._checkpoints_for_model(video_id, self.get_completed_segments(video_id))
+        logger.info(f"Found {len(completed_segments)} completed segments for {video_id}")
+
+        total_chunks = len(self.plan_chunks(duration)) if duration else None
+        if job_tracker:
+            job_tracker.update_progress(job_id, total_chunks=total_chunks,
+                                        completed_chunks=len(completed_segments))
+
+        try:
+            with maybe_stage(trace, "model_load"):
+                self.load_model()
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                builder = TranscriptBuilder(os.path.join(temp_dir, "spill") if self.low_memory else None)
+                for idx in completed_segments:
+                    segment_data = self.load_segment_from_s3(video_id, idx)
+                    if segment_data:
+                        self._add_checkpoint(builder, idx, segment_data)
+
+                chunks_done = len(completed_segments)
+                for i, audio in audio_stream:
+                    if i in completed_segments:
+                        logger.info(f"Skipping already processed chunk {i}")
+                        continue
+
+                    logger.info(f"Processing streamed chunk {i+1}/{total_chunks or '?'}")
+                    self._transcribe_chunk(audio, i, builder, language, video_id, trace)
+
+                    chunks_done += 1
+                    if job_tracker:
+                        job_tracker.update_progress(job_id, completed_chunks=chunks_done)
+
+                return self._finalize_transcript(builder, language, video_id, trace)
+
+        except Exception as e:
+            self._checkpoint_uploads.pop(video_id, None)
+            error_msg = f"Error transcribing audio stream: {str(e)}"
             logger.error(error_msg)
             raise TranscriptionError(error_msg)
+        finally:
+            if hasattr(audio_stream, "close"):
+                audio_stream.close()
 
 
 # Example usage
@@ -0,0 +1,696 @@
+#!/usr/bin/python3
+# transcript_format.py - Compact columnar binary transcript format
+
+import io
+import os
+import json
+import mmap
+import zlib
+import struct
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"YTXC"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# Preamble: magic, version, flags, header length
+_PREAMBLE = struct.Struct("<4sHHI")
+FLAG_COMPRESSED = 1
+
+class TranscriptFormatError(Exception):
+    """Exception raised for malformed compact transcript data"""
+    pass
+
+class CompactTranscript:
+    """
+    Columnar, memory-mappable representation of a word-level transcript.
+
+    Words and segment texts are stored once in a string table and referenced
+    by index; timestamps are float64 columns (float32 loses milliseconds
+    after a few hours) and scores float32, NaN where WhisperX gave no
+    value. Other segment keys (e.g. 'speaker') are kept as a JSON string in
+    the table, seg_extra being -1 for segments without any. Segment i owns
+    words seg_word_offsets[i]:seg_word_offsets[i+1].
+
+    File layout: preamble, JSON header describing each section, then the
+    sections, each 8-byte aligned. Uncompressed files can be memory-mapped so
+    columns are read lazily; compressed files (zlib per section) are meant for
+    storage and transfer.
+    """
+
+    COLUMNS = {
+        "string_offsets": np.int64,
+        "word_text": np.int32,
+        "word_start": np.float64,
+        "word_end": np.float64,
+        "word_score": np.float32,
+        "seg_start": np.float64,
+        "seg_end": np.float64,
+        "seg_text": np.int32,
+        "seg_extra": np.int32,
+        "seg_word_offsets": np.int64,
+    }
+
+    # Segment keys stored in their own columns; any other key goes to seg_extra
+    SEGMENT_KEYS = ("start", "end", "text", "words")
+
+    def __init__(self, strings_blob, columns, language=None, video_id=None, transcribed_at=None):
+        """
+        Initialize from already-built columns
+
+        Args:
+            strings_blob: UTF-8 bytes of all strings, concatenated
+            columns: Dict of numpy arrays keyed by COLUMNS names
+            language: Language code
+            video_id: YouTube video ID
+            transcribed_at: ISO timestamp of the transcription
+        """
+        self.strings_blob = strings_blob
+        # Files written before seg_extra existed have no extra keys
+        if "seg_extra" not in columns:
+            columns = dict(columns, seg_extra=np.full(len(columns["seg_start"]), -1, dtype=np.int32))
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self.language = language
+        self.video_id = video_id
+        self.transcribed_at = transcribed_at
+        self._strings = None
+
+    @classmethod
+    def from_dict(cls, transcript):
+        """
+        Build from a WhisperX-style transcript dict
+
+        Args:
+            transcript: Dict with 'segments' (each with 'words') and metadata keys
+
+        Returns:
+            CompactTranscript
+        """
+        string_index = {}
+        strings = []
+
+        def intern(text):
+            idx = string_index.get(text)
+            if idx is None:
+                idx = len(strings)
+                string_index[text] = idx
+                strings.append(text)
+            return idx
+
+        nan = float("nan")
+        word_text, word_start, word_end, word_score = [], [], [], []
+        seg_start, seg_end, seg_text, seg_extra, seg_word_offsets = [], [], [], [], [0]
+
+        for segment in transcript.get("segments", []):
+            seg_start.append(segment.get("start", nan))
+            seg_end.append(segment.get("end", nan))
+            seg_text.append(intern(segment.get("text", "")))
+            extra = extra_keys(segment)
+            seg_extra.append(intern(extra) if extra else -1)
+            for word in segment.get("words", []):
+                word_text.append(intern(word.get("word", "")))
+                word_start.append(word.get("start", nan))
+                word_end.append(word.get("end", nan))
+                word_score.append(word.get("score", nan))
+            seg_word_offsets.append(len(word_text))
+
+        encoded = [s.encode("utf-8") for s in strings]
+        string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+
+        columns = {
+            "string_offsets": string_offsets,
+            "word_text": np.array(word_text, dtype=np.int32),
+            "word_start": np.array(word_start, dtype=np.float64),
+            "word_end": np.array(word_end, dtype=np.float64),
+            "word_score": np.array(word_score, dtype=np.float32),
+            "seg_start": np.array(seg_start, dtype=np.float64),
+            "seg_end": np.array(seg_end, dtype=np.float64),
+            "seg_text": np.array(seg_text, dtype=np.int32),
+            "seg_extra": np.array(seg_extra, dtype=np.int32),
+            "seg_word_offsets": np.array(seg_word_offsets, dtype=np.int64),
+        }
+        return cls(
+            b"".join(encoded),
+            columns,
+            language=transcript.get("language"),
+            video_id=transcript.get("video_id"),
+            transcribed_at=transcript.get("transcribed_at"),
+        )
+
+    @property
+    def strings(self):
+        """Decoded string table (decoded once, on first use)"""
+        if self._strings is None:
+            blob = bytes(self.strings_blob)
+            offsets = self.string_offsets.tolist()
+            self._strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def __len__(self):
+        """Number of segments"""
+        return len(self.seg_start)
+
+    @property
+    def word_count(self):
+        """Number of words"""
+        return len(self.word_text)
+
+    def segment_texts(self):
+        """List of segment texts in order"""
+        strings = self.strings
+        return [strings[i] for i in self.seg_text.tolist()]
+
+    def iter_segment_texts(self):
+        """Yield segment texts in order without building segment dicts"""
+        strings = self.strings
+        for i in self.seg_text.tolist():
+            yield strings[i]
+
+    def iter_segments(self):
+        """Yield segments as WhisperX-style dicts, one at a time"""
+        strings = self.strings
+
+        def rounded(column):
+            # Round in one vectorized pass; NaN marks a value WhisperX did
+            # not produce and becomes None so the key can be left out
+            values = np.round(np.asarray(column, dtype=np.float64), 3)
+            return np.where(np.isnan(values), None, values).tolist()
+
+        word_text = [strings[i] for i in self.word_text.tolist()]
+        word_start = rounded(self.word_start)
+        word_end = rounded(self.word_end)
+        word_score = rounded(self.word_score)
+        complete = not (None in word_start or None in word_end or None in word_score)
+        offsets = self.seg_word_offsets.tolist()
+        seg_start = np.round(np.asarray(self.seg_start, dtype=np.float64), 3).tolist()
+        seg_end = np.round(np.asarray(self.seg_end, dtype=np.float64), 3).tolist()
+        seg_text = self.seg_text.tolist()
+        seg_extra = self.seg_extra.tolist()
+
+        for i in range(len(seg_start)):
+            lo, hi = offsets[i], offsets[i + 1]
+            if complete:
+                words = [{"word": w, "start": s, "end": e, "score": c} for w, s, e, c in
+                         zip(word_text[lo:hi], word_start[lo:hi], word_end[lo:hi], word_score[lo:hi])]
+            else:
+                words = []
+                for j in range(lo, hi):
+                    word = {"word": word_text[j]}
+                    if word_start[j] is not None:
+                        word["start"] = word_start[j]
+                    if word_end[j] is not None:
+                        word["end"] = word_end[j]
+                    if word_score[j] is not None:
+                        word["score"] = word_score[j]
+                    words.append(word)
+
+            segment = {
+                "start": seg_start[i],
+                "end": seg_end[i],
+                "text": strings[seg_text[i]],
+                "words": words,
+            }
+            if seg_extra[i] >= 0:
+                segment.update(json.loads(strings[seg_extra[i]]))
+            yield segment
+
+    def to_dict(self):
+        """
+        Export as the JSON-compatible dict written to full_transcript.json
+
+        Returns:
+            Dict with 'segments', 'language', 'video_id' and 'transcribed_at'
+        """
+        return {
+            "segments": list(self.iter_segments()),
+            "language": self.language,
+            "video_id": self.video_id,
+            "transcribed_at": self.transcribed_at,
+        }
+
+    def to_bytes(self, compress=True):
+        """
+        Serialize to the binary format
+
+        Args:
+            compress: zlib-compress each section (smaller, but not memory-mappable)
+
+        Returns:
+            bytes
+        """
+        payloads = [("strings", np.frombuffer(self.strings_blob, dtype=np.uint8))]
+        payloads += [(name, np.ascontiguousarray(getattr(self, name), dtype=dtype))
+                     for name, dtype in self.COLUMNS.items()]
+
+        sections = {}
+        body = io.BytesIO()
+        for name, array in payloads:
+            data = array.tobytes()
+            if compress:
+                data = zlib.compress(data, 6)
+            body.write(b"\0" * (-body.tell() % ALIGNMENT))
+            sections[name] = {
+                "offset": body.tell(),
+                "nbytes": len(data),
+                "dtype": array.dtype.str,
+                "count": int(array.size),
+            }
+            body.write(data)
+
+        header = json.dumps({
+            "language": self.language,
+            "video_id": self.video_id,
+            "transcribed_at": self.transcribed_at,
+            "sections": sections,
+        }).encode("utf-8")
+        header += b" " * (-(_PREAMBLE.size + len(header)) % ALIGNMENT)
+
+        flags = FLAG_COMPRESSED if compress else 0
+        return _PREAMBLE.pack(MAGIC, FORMAT_VERSION, flags, len(header)) + header + body.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Deserialize from the binary format
+
+        Uncompressed sections are zero-copy views into `data`, so passing an
+        mmap keeps columns on disk until they are touched.
+
+        Args:
+            data: bytes, bytearray, memoryview or mmap
+
+        Returns:
+            CompactTranscript
+
+        Raises:
+            TranscriptFormatError: If the data is not a compact transcript
+        """
+        if len(data) < _PREAMBLE.size:
+            raise TranscriptFormatError("Data too short for a compact transcript")
+        magic, version, flags, header_len = _PREAMBLE.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise TranscriptFormatError("Not a compact transcript (bad magic)")
+        if version > FORMAT_VERSION:
+            raise TranscriptFormatError(f"Unsupported compact transcript version {version}")
+
+        header_start = _PREAMBLE.size
+        header = json.loads(bytes(data[header_start:header_start + header_len]).decode("utf-8"))
+        body_start = header_start + header_len
+        compressed = bool(flags & FLAG_COMPRESSED)
+
+        arrays = {}
+        for name, section in header["sections"].items():
+            start = body_start + section["offset"]
+            dtype = np.dtype(section["dtype"])
+            if compressed:
+                raw = zlib.decompress(data[start:start + section["nbytes"]])
+                arrays[name] = np.frombuffer(raw, dtype=dtype, count=section["count"])
+            else:
+                arrays[name] = np.frombuffer(data, dtype=dtype, count=section["count"], offset=start)
+
+        strings_blob = arrays.pop("strings").tobytes()
+        return cls(
+            strings_blob,
+            arrays,
+            language=header.get("language"),
+            video_id=header.get("video_id"),
+            transcribed_at=header.get("transcribed_at"),
+        )
+
+    def save(self, path, compress=False):
+        """
+        Write to a file
+
+        Args:
+            path: Output path
+            compress: zlib-compress sections (use False to allow memory-mapping)
+        """
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(compress=compress))
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """
+        Read from a file
+
+        Args:
+            path: Input path
+            use_mmap: Memory-map the file instead of reading it into memory
+
+        Returns:
+            CompactTranscript
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
+        return cls.from_bytes(data)
+
+
+class TranscriptBuilder:
+    """
+    Assembles a transcript from per-chunk WhisperX output in columnar form.
+
+    Each chunk is converted to arrays once, its chunk offset is applied with
+    a single vectorized add, and build() concatenates chunks in chunk-index
+    order, so no per-word dict mutation or global sort is needed. Chunks may
+    be added in any order (e.g. checkpoints loaded on resume, then new ones).
+
+    With a spill_dir, each chunk (with its own string table) is written to
+    disk as soon as it is added and only a few counters stay in memory;
+    save() and write_json() then stream the transcript chunk by chunk, so
+    memory use does not grow with the length of the video.
+    """
+
+    WORD_COLUMNS = ("word_text", "word_start", "word_end", "word_score")
+    SEGMENT_COLUMNS = ("seg_start", "seg_end", "seg_text", "seg_extra")
+
+    def __init__(self, spill_dir=None):
+        """
+        Args:
+            spill_dir: Directory to spill finished chunks to (None keeps them in memory)
+        """
+        self.spill_dir = spill_dir
+        self._string_index = {}
+        self._strings = []
+        self._chunks = {}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _intern(self, text):
+        idx = self._string_index.get(text)
+        if idx is None:
+            idx = len(self._strings)
+            self._string_index[text] = idx
+            self._strings.append(text)
+        return idx
+
+    def __contains__(self, chunk_index):
+        return chunk_index in self._chunks
+
+    def __len__(self):
+        """Number of chunks added"""
+        return len(self._chunks)
+
+    def add_chunk(self, chunk_index, segments, offset=0.0):
+        """
+        Add one chunk's segments
+
+        Args:
+            chunk_index: Index of the chunk within the video
+            segments: WhisperX segments (each with 'words')
+            offset: Seconds added to every timestamp (the chunk's start time;
+                0 for segments that already carry absolute timestamps)
+        """
+        if self.spill_dir:
+            # Chunk-local string table, so the chunk is self-contained on disk
+            strings, index = [], {}
+
+            def intern(text):
+                idx = index.get(text)
+                if idx is None:
+                    idx = index[text] = len(strings)
+                    strings.append(text)
+                return idx
+        else:
+            intern = self._intern
+
+        nan = float("nan")
+        word_text, word_start, word_end, word_score = [], [], [], []
+        seg_start, seg_end, seg_text, seg_extra, seg_word_offsets = [], [], [], [], [0]
+
+        for segment in segments:
+            seg_start.append(segment.get("start", nan))
+            seg_end.append(segment.get("end", nan))
+            seg_text.append(intern(segment.get("text", "")))
+            extra = extra_keys(segment)
+            seg_extra.append(intern(extra) if extra else -1)
+            for word in segment.get("words", []):
+                word_text.append(intern(word.get("word", "")))
+                word_start.append(word.get("start", nan))
+                word_end.append(word.get("end", nan))
+                word_score.append(word.get("score", nan))
+            seg_word_offsets.append(len(word_text))
+
+        columns = {
+            "word_text": np.array(word_text, dtype=np.int32),
+            "word_start": np.array(word_start, dtype=np.float64) + offset,
+            "word_end": np.array(word_end, dtype=np.float64) + offset,
+            "word_score": np.array(word_score, dtype=np.float32),
+            "seg_start": np.array(seg_start, dtype=np.float64) + offset,
+            "seg_end": np.array(seg_end, dtype=np.float64) + offset,
+            "seg_text": np.array(seg_text, dtype=np.int32),
+            "seg_extra": np.array(seg_extra, dtype=np.int32),
+            "seg_word_offsets": np.array(seg_word_offsets, dtype=np.int64),
+        }
+
+        # WhisperX emits segments in order; reorder the rare chunk that is not
+        starts = columns["seg_start"]
+        if len(starts) > 1 and np.any(starts[1:] < starts[:-1]):
+            columns = self._sort_chunk(columns)
+
+        if not self.spill_dir:
+            self._chunks[chunk_index] = columns
+            return
+
+        encoded = [text.encode("utf-8") for text in strings]
+        string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+        columns["strings"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        columns["string_offsets"] = string_offsets
+
+        path = os.path.join(self.spill_dir, f"chunk_{chunk_index:06d}.npz")
+        np.savez(path, **columns)
+        self._chunks[chunk_index] = {
+            "path": path,
+            "strings": len(encoded),
+            "string_bytes": int(string_offsets[-1]),
+            "words": len(word_text),
+            "segments": len(seg_start),
+        }
+
+    @staticmethod
+    def _sort_chunk(columns):
+        """Order a chunk's segments (and their words) by start time"""
+        order = np.argsort(columns["seg_start"], kind="stable")
+        offsets = columns["seg_word_offsets"]
+        word_order = np.concatenate([np.arange(offsets[i], offsets[i + 1]) for i in order] or
+                                    [np.zeros(0, dtype=np.int64)]).astype(np.int64)
+        counts = np.diff(offsets)[order]
+
+        sorted_columns = {name: columns[name][order] for name in TranscriptBuilder.SEGMENT_COLUMNS}
+        sorted_columns.update({name: columns[name][word_order] for name in TranscriptBuilder.WORD_COLUMNS})
+        sorted_columns["seg_word_offsets"] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return sorted_columns
+
+    def _string_table(self):
+        """Encoded in-memory string table as (blob, offsets)"""
+        encoded = [text.encode("utf-8") for text in self._strings]
+        string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+        return b"".join(encoded), string_offsets
+
+    def _iter_section(self, name):
+        """
+        Yield the pieces of one output section, chunk by chunk, with string
+        indices, string offsets and word offsets rebased to the whole transcript
+        """
+        order = sorted(self._chunks)
+
+        if not self.spill_dir:
+            if name in ("strings", "string_offsets"):
+                blob, string_offsets = self._string_table()
+                yield np.frombuffer(blob, dtype=np.uint8) if name == "strings" else string_offsets
+                return
+            if name == "seg_word_offsets":
+                yield np.zeros(1, dtype=np.int64)
+                words_before = 0
+                for i in order:
+                    chunk = self._chunks[i]
+                    yield chunk["seg_word_offsets"][1:] + words_before
+                    words_before += len(chunk["word_text"])
+                return
+            for i in order:
+                yield self._chunks[i][name]
+            return
+
+        if name in ("string_offsets", "seg_word_offsets"):
+            yield np.zeros(1, dtype=np.int64)
+        strings_before = string_bytes_before = words_before = 0
+        for i in order:
+            info = self._chunks[i]
+            with np.load(info["path"]) as chunk:
+                if name == "string_offsets":
+                    yield chunk["string_offsets"][1:] + string_bytes_before
+                elif name == "seg_word_offsets":
+                    yield chunk["seg_word_offsets"][1:] + words_before
+                elif name in ("word_text", "seg_text"):
+                    yield chunk[name] + strings_before
+                elif name == "seg_extra":
+                    yield np.where(chunk[name] >= 0, chunk[name] + strings_before, -1)
+                else:
+                    yield chunk[name]
+            strings_before += info["strings"]
+            string_bytes_before += info["string_bytes"]
+            words_before += info["words"]
+
+    def build(self, language=None, video_id=None, transcribed_at=None):
+        """
+        Concatenate all chunks in chunk order
+
+        In spill mode this loads every chunk; use save() and write_json() to
+        stay memory-bounded.
+
+        Returns:
+            CompactTranscript
+        """
+        columns = {}
+        for name, dtype in CompactTranscript.COLUMNS.items():
+            parts = list(self._iter_section(name))
+            columns[name] = np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+        if "string_offsets" not in columns or not len(columns["string_offsets"]):
+            columns["string_offsets"] = np.zeros(1, dtype=np.int64)
+        if not len(columns["seg_word_offsets"]):
+            columns["seg_word_offsets"] = np.zeros(1, dtype=np.int64)
+
+        strings = list(self._iter_section("strings"))
+        strings_blob = b"".join(part.tobytes() for part in strings)
+        return CompactTranscript(strings_blob, columns, language=language,
+                                 video_id=video_id, transcribed_at=transcribed_at)
+
+    def _section_counts(self):
+        """Element count of every output section"""
+        if self.spill_dir:
+            chunks = self._chunks.values()
+            strings = sum(c["strings"] for c in chunks)
+            string_bytes = sum(c["string_bytes"] for c in chunks)
+            words = sum(c["words"] for c in chunks)
+            segments = sum(c["segments"] for c in chunks)
+        else:
+            blob, _ = self._string_table()
+            strings, string_bytes = len(self._strings), len(blob)
+            words = sum(len(c["word_text"]) for c in self._chunks.values())
+            segments = sum(len(c["seg_start"]) for c in self._chunks.values())
+
+        counts = {"strings": string_bytes, "string_offsets": strings + 1, "seg_word_offsets": segments + 1}
+        counts.update({name: words for name in self.WORD_COLUMNS})
+        counts.update({name: segments for name in self.SEGMENT_COLUMNS})
+        return counts
+
+    def save(self, path, language=None, video_id=None, transcribed_at=None):
+        """
+        Write the uncompressed (memory-mappable) binary format, one chunk at a time
+
+        Produces the same layout as CompactTranscript.to_bytes(compress=False)
+        without holding the whole transcript in memory.
+
+        Args:
+            path: Output path
+            language: Language code
+            video_id: YouTube video ID
+            transcribed_at: ISO timestamp of the transcription
+        """
+        dtypes = dict(CompactTranscript.COLUMNS, strings=np.uint8)
+        dtypes = {name: np.dtype(dtype) for name, dtype in dtypes.items()}
+        names = ["strings"] + list(CompactTranscript.COLUMNS)
+        counts = self._section_counts()
+
+        # Section sizes are known up front, so the header can be written first
+        sections = {}
+        offset = 0
+        for name in names:
+            offset += -offset % ALIGNMENT
+            nbytes = counts[name] * dtypes[name].itemsize
+            sections[name] = {"offset": offset, "nbytes": nbytes,
+                              "dtype": dtypes[name].str, "count": counts[name]}
+            offset += nbytes
+
+        header = json.dumps({
+            "language": language,
+            "video_id": video_id,
+            "transcribed_at": transcribed_at,
+            "sections": sections,
+        }).encode("utf-8")
+        header += b" " * (-(_PREAMBLE.size + len(header)) % ALIGNMENT)
+
+        with open(path, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header)) + header)
+            body_start = f.tell()
+            for name in names:
+                f.write(b"\0" * (body_start + sections[name]["offset"] - f.tell()))
+                for part in self._iter_section(name):
+                    f.write(np.ascontiguousarray(part, dtype=dtypes[name]).tobytes())
+
+    def write_json(self, f, language=None, video_id=None, transcribed_at=None):
+        """
+        Stream the JSON export (same shape as CompactTranscript.to_dict()) to a text file
+
+        Args:
+            f: Writable text file object
+            language: Language code
+            video_id: YouTube video ID
+            transcribed_at: ISO timestamp of the transcription
+        """
+        f.write('{"segments": [')
+        first = True
+        for chunk in self._iter_chunk_transcripts():
+            for segment in chunk.iter_segments():
+                f.write(("" if first else ", ") + json.dumps(segment))
+                first = False
+        f.write("], " + json.dumps({"language": language, "video_id": video_id,
+                                    "transcribed_at": transcribed_at})[1:])
+
+    def _iter_chunk_transcripts(self):
+        """Yield each chunk, in order, as a small CompactTranscript"""
+        if not self.spill_dir:
+            blob, string_offsets = self._string_table()
+        for i in sorted(self._chunks):
+            if self.spill_dir:
+                with np.load(self._chunks[i]["path"]) as chunk:
+                    columns = {name: chunk[name] for name in CompactTranscript.COLUMNS}
+                    chunk_blob = chunk["strings"].tobytes()
+            else:
+                columns = dict(self._chunks[i], string_offsets=string_offsets)
+                chunk_blob = blob
+            transcript = CompactTranscript(chunk_blob, columns)
+            if not self.spill_dir:
+                transcript._strings = self._strings
+            yield transcript
+
+
+def extra_keys(segment):
+    """JSON of a segment's keys that have no column of their own, or None"""
+    extra = {key: value for key, value in segment.items() if key not in CompactTranscript.SEGMENT_KEYS}
+    # default=float turns numpy scalars from WhisperX into plain numbers
+    return json.dumps(extra, default=float) if extra else None
+
+
+def is_compact_transcript(data):
+    """Check whether bytes start with the compact transcript magic"""
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) != 3:
+        print("Usage: transcript_format.py <full_transcript.json> <output.ytc>")
+        sys.exit(1)
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        transcript = json.load(f)
+
+    compact = CompactTranscript.from_dict(transcript)
+    compact.save(sys.argv[2])
+    print(f"Wrote {len(compact)} segments / {compact.word_count} words to {sys.argv[2]}")
@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+# aws_clients.py - Shared, pooled boto3 clients and an async upload facade
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.config import Config
+from src.utils.compression import put_encoded_object, DEFAULT_ENCODING
+from src.utils.metrics import instrument_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POOL_CONNECTIONS = 10  # botocore's own default
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_UPLOAD_WORKERS = 4
+
+_settings = {
+    "max_pool_connections": DEFAULT_MAX_POOL_CONNECTIONS,
+    "max_attempts": DEFAULT_MAX_ATTEMPTS,
+}
+_clients = {}
+_uploaders = {}
+_lock = threading.Lock()
+
+def pool_size_for_concurrency(concurrency, upload_workers=DEFAULT_UPLOAD_WORKERS):
+    """
+    Size the HTTP connection pool for a worker
+
+    Every job thread and every background upload thread may hold a
+    connection, plus headroom for heartbeats and queue polling.
+
+    Args:
+        concurrency: Number of jobs processed in parallel
+        upload_workers: Threads in the async upload pool
+
+    Returns:
+        Connection pool size
+    """
+    return max(DEFAULT_MAX_POOL_CONNECTIONS, concurrency * 2 + upload_workers + 2)
+
+def configure(max_pool_connections=None, max_attempts=None):
+    """
+    Set options for clients created after this call
+
+    Call once at start-up, before components create their clients.
+
+    Args:
+        max_pool_connections: HTTP connection pool size per client
+        max_attempts: Total attempts per API call under adaptive retry mode
+    """
+    with _lock:
+        if max_pool_connections is not None:
+            _settings["max_pool_connections"] = max_pool_connections
+        if max_attempts is not None:
+            _settings["max_attempts"] = max_attempts
+
+def get_client(service, region=None):
+    """
+    Get the shared client for a service and region, creating it on first use
+
+    Clients use adaptive retry mode, TCP keep-alive and a connection pool
+    sized by configure(). boto3 clients are thread-safe, so one client is
+    shared by every component and thread in the process.
+
+    Args:
+        service: AWS service name (e.g. 's3', 'sqs')
+        region: AWS region
+
+    Returns:
+        boto3 client
+    """
+    key = (service, region)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            config = Config(
+                region_name=region,
+                max_pool_connections=_settings["max_pool_connections"],
+                retries={"mode": "adaptive", "max_attempts": _settings["max_attempts"]},
+                tcp_keepalive=True
+            )
+            client = boto3.client(service, config=config)
+            instrument_client(client, service)
+            _clients[key] = client
+            logger.debug(f"Created shared {service} client for {region} "
+                         f"(pool={_settings['max_pool_connections']})")
+        return client
+
+def register_client(service, region, client):
+    """Install a client for a service and region (e.g. a local stand-in for benchmarks)"""
+    with _lock:
+        _clients[(service, region)] = client
+
+def reset_clients():
+    """Forget all shared clients and shut down async uploaders"""
+    with _lock:
+        uploaders = list(_uploaders.values())
+        _clients.clear()
+        _uploaders.clear()
+    for uploader in uploaders:
+        uploader.shutdown()
+
+class AsyncUploader:
+    """Thread-pool-backed facade for fire-and-forget S3 uploads"""
+
+    def __init__(self, s3, max_workers=DEFAULT_UPLOAD_WORKERS):
+        """
+        Initialize the uploader
+
+        Args:
+            s3: boto3 S3 client
+            max_workers: Number of upload threads
+        """
+        self.s3 = s3
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-upload")
+        self._pending = set()
+        self._errors = []
+        self._lock = threading.Lock()
+
+    def _on_done(self, future):
+        """Track completion and log failures of a background upload"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Background S3 upload failed: {str(error)}")
+        with self._lock:
+            if error is not None:
+                self._errors.append(error)
+            self._pending.discard(future)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run an S3 call in the background
+
+        Returns:
+            concurrent.futures.Future
+        """
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def put_object(self, **kwargs):
+        """Upload an object in the background (same arguments as put_object)"""
+        return self.submit(self.s3.put_object, **kwargs)
+
+    def put_encoded_object(self, Body, encoding=DEFAULT_ENCODING, **kwargs):
+        """Compress and upload an object in the background (see put_encoded_object)"""
+        return self.submit(put_encoded_object, self.s3, Body, encoding, **kwargs)
+
+    def flush(self, timeout=None):
+        """
+        Wait for all pending uploads
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            List of errors raised by uploads since the last flush
+        """
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # collected by _on_done
+        with self._lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def wait(self, futures, timeout=None):
+        """
+        Wait for some uploads, e.g. those of one job
+
+        Args:
+            futures: Futures returned by submit() and the put methods
+            timeout: Seconds to wait at most for each
+
+        Returns:
+            List of errors raised by those uploads
+        """
+        errors = []
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    @property
+    def pending_count(self):
+        """Number of uploads not finished yet"""
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait=True):
+        """Stop the upload threads"""
+        self._executor.shutdown(wait=wait)
+
+def get_async_uploader(region=None):
+    """Get the shared async uploader for a region's S3 client"""
+    s3 = get_client('s3', region)
+    with _lock:
+        uploader = _uploaders.get(region)
+        if uploader is None:
+            uploader = AsyncUploader(s3)
+            _uploaders[region] = uploader
+        return uploader
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+# compression.py - Content-encoded S3 object bodies (gzip / zstd)
+
+import os
+import gzip
+import shutil
+import logging
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_GZIP = "gzip"
+ENCODING_ZSTD = "zstd"
+ENCODING_NONE = "none"
+DEFAULT_ENCODING = ENCODING_GZIP
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def encode_body(data, encoding=DEFAULT_ENCODING):
+    """
+    Compress an object body
+
+    Args:
+        data: str or bytes
+        encoding: 'gzip', 'zstd' or 'none' (zstd falls back to gzip if the
+            zstandard package is not installed)
+
+    Returns:
+        Tuple of (body bytes, ContentEncoding value or None)
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if encoding == ENCODING_ZSTD:
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=6).compress(data), ENCODING_ZSTD
+        encoding = ENCODING_GZIP
+
+    if encoding == ENCODING_GZIP:
+        return gzip.compress(data, compresslevel=6), ENCODING_GZIP
+
+    return data, None
+
+def decode_body(data, content_encoding=None):
+    """
+    Decompress an object body according to its ContentEncoding
+
+    Bodies are also recognised by their magic bytes, so objects written
+    without the header (or by older workers, uncompressed) decode correctly.
+
+    Args:
+        data: Raw body bytes
+        content_encoding: ContentEncoding reported by S3, if any
+
+    Returns:
+        Decoded bytes
+    """
+    if content_encoding == ENCODING_GZIP or data[:2] == _GZIP_MAGIC:
+        return gzip.decompress(data)
+
+    if content_encoding == ENCODING_ZSTD or data[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("Object is zstd-encoded but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+    return data
+
+def put_encoded_object(s3, Body, encoding=DEFAULT_ENCODING, **kwargs):
+    """
+    Upload an object with a compressed body and the matching ContentEncoding
+
+    Args:
+        s3: boto3 S3 client
+        Body: str or bytes to upload
+        encoding: 'gzip', 'zstd' or 'none'
+        **kwargs: Passed through to put_object (Bucket, Key, ContentType, ...)
+
+    Returns:
+        put_object response
+    """
+    body, content_encoding = encode_body(Body, encoding)
+    if content_encoding:
+        kwargs["ContentEncoding"] = content_encoding
+    return s3.put_object(Body=body, **kwargs)
+
+def put_encoded_file(s3, path, encoding=DEFAULT_ENCODING, **kwargs):
+    """
+    Compress a local file to a temporary file and upload it, streaming both
+    steps so the object never has to fit in memory
+
+    Args:
+        s3: boto3 S3 client
+        path: File to upload
+        encoding: 'gzip', 'zstd' or 'none'
+        **kwargs: Passed through to put_object (Bucket, Key, ContentType, ...)
+
+    Returns:
+        put_object response
+    """
+    if encoding == ENCODING_ZSTD and zstandard is None:
+        encoding = ENCODING_GZIP
+    if encoding not in (ENCODING_GZIP, ENCODING_ZSTD):
+        with open(path, "rb") as f:
+            return s3.put_object(Body=f, **kwargs)
+
+    fd, encoded_path = tempfile.mkstemp(dir=os.path.dirname(path) or None, suffix=f".{encoding}")
+    try:
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            if encoding == ENCODING_ZSTD:
+                zstandard.ZstdCompressor(level=6).copy_stream(src, dst)
+            else:
+                with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6) as gz:
+                    shutil.copyfileobj(src, gz, 1024 * 1024)
+
+        with open(encoded_path, "rb") as f:
+            return s3.put_object(Body=f, ContentEncoding=encoding, **kwargs)
+    finally:
+        os.remove(encoded_path)
+
+def get_decoded_object(s3, **kwargs):
+    """
+    Download an object and transparently decode its body
+
+    Args:
+        s3: boto3 S3 client
+        **kwargs: Passed through to get_object (Bucket, Key, ...)
+
+    Returns:
+        Decoded body bytes
+    """
+    response = s3.get_object(**kwargs)
+    return decode_body(response['Body'].read(), response.get('ContentEncoding'))
@@ -0,0 +1,390 @@
+#!/usr/bin/python3
+# metrics.py - In-process metrics with a Prometheus text-format HTTP endpoint
+
+import os
+import sys
+import time
+import logging
+import resource
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "ytt_"
+
+# Latency buckets in seconds, from a fast S3 call up to a long video
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+THROUGHPUT_BUCKETS = tuple(2 ** i * 64 * 1024 for i in range(12))  # 64 KiB/s .. 128 MiB/s
+
+def _format_labels(names, values, extra=None):
+    """Render a label set as {a="x",b="y"}"""
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value):
+    """Render a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    """Base class for a metric family with optional labels"""
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self.labels()  # expose a zero sample before the first observation
+
+    def labels(self, *values):
+        """Get the child metric for a label set"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._new_child()
+                self._children[key] = child
+            return child
+
+    def _default(self):
+        """Child used when the metric has no labels"""
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self):
+        """Yield (name suffix, label values, extra label pair or None, value) tuples"""
+        raise NotImplementedError
+
+    def render(self):
+        """Render the family in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for suffix, values, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+class _Value:
+    """A single float guarded by a lock"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        with self._lock:
+            self.value = float(value)
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield "_total", values, None, child.value
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time"""
+
+    TYPE = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        """
+        Args:
+            callback: Optional function returning the value (or a dict of
+                label tuple -> value for labelled gauges) at scrape time
+        """
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().inc(-amount)
+
+    def _samples(self):
+        if self.callback is not None:
+            try:
+                result = self.callback()
+            except Exception as e:
+                logger.debug(f"Metric callback for {self.name} failed: {str(e)}")
+                return
+            if result is None:
+                return
+            if isinstance(result, dict):
+                for values, value in result.items():
+                    yield "", tuple(values), None, value
+            else:
+                yield "", (), None, result
+            return
+
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield "", values, None, child.value
+
+class _HistogramValue:
+    """Bucket counts, sum and count of one histogram child"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield "_bucket", values, ("le", _format_value(bound)), cumulative
+            yield "_sum", values, None, total
+            yield "_count", values, None, count
+
+class Registry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric, returning the already registered one of the same name if any"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        """Render all metrics in Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+REGISTRY = Registry()
+
+def counter(name, documentation, labelnames=()):
+    """Create and register a counter"""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def gauge(name, documentation, labelnames=(), callback=None):
+    """Create and register a gauge"""
+    return REGISTRY.register(Gauge(name, documentation, labelnames, callback=callback))
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Create and register a histogram"""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+def _resident_memory_bytes():
+    """Current RSS from /proc, falling back to the peak RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _gpu_memory_bytes():
+    """Allocated CUDA memory per device, if torch is already loaded"""
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    return {(str(i),): torch.cuda.memory_allocated(i) for i in range(torch.cuda.device_count())}
+
+def _process_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+# Jobs
+JOBS = counter("jobs", "Jobs finished by this worker", ["status"])
+JOBS_IN_PROGRESS = gauge("jobs_in_progress", "Jobs currently being processed")
+JOB_SECONDS = histogram("job_duration_seconds", "Wall-clock time per job")
+STAGE_SECONDS = histogram("stage_duration_seconds", "Wall-clock time per job stage", ["stage"])
+
+# Transcription
+CHUNK_SECONDS = histogram("chunk_duration_seconds", "Wall-clock time to transcribe and align one chunk")
+CHUNK_RTF = histogram("chunk_real_time_factor", "Chunk processing time divided by chunk audio length",
+                      buckets=RTF_BUCKETS)
+JOB_RTF = histogram("job_real_time_factor", "Job processing time divided by audio length",
+                    buckets=RTF_BUCKETS)
+AUDIO_SECONDS = counter("audio_seconds", "Seconds of audio transcribed")
+BATCH_SIZE = histogram("inference_batch_size", "Speech segments per shared inference batch",
+                       buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_JOBS = histogram("inference_batch_jobs", "Distinct jobs per shared inference batch",
+                       buckets=(1, 2, 4, 8, 16))
+BATCH_WAIT_SECONDS = histogram("inference_batch_wait_seconds", "Time a speech segment waited for its batch")
+
+# Downloads
+DOWNLOAD_BYTES = counter("download_bytes", "Bytes of audio downloaded")
+DOWNLOAD_THROUGHPUT = histogram("download_bytes_per_second", "Audio download throughput",
+                                buckets=THROUGHPUT_BUCKETS)
+
+# AWS
+AWS_REQUESTS = counter("aws_requests", "AWS API calls", ["service", "operation", "status"])
+AWS_REQUEST_SECONDS = histogram("aws_request_duration_seconds", "AWS API call latency including retries",
+                                ["service", "operation"])
+
+# Queue
+QUEUE_MESSAGES = gauge("queue_messages", "Approximate SQS queue depth at the last poll", ["state"])
+LANE_MESSAGES = gauge("lane_messages", "Approximate SQS queue depth per priority lane at the last poll",
+                      ["lane", "state"])
+
+# Process
+START_TIME = time.time()
+gauge("process_start_time_seconds", "Start time of the process since the epoch", callback=lambda: START_TIME)
+gauge("process_resident_memory_bytes", "Resident memory size", callback=_resident_memory_bytes)
+gauge("process_cpu_seconds", "User and system CPU time", callback=_process_cpu_seconds)
+gauge("gpu_memory_allocated_bytes", "CUDA memory allocated by torch", ["device"], callback=_gpu_memory_bytes)
+
+def instrument_client(client, service):
+    """
+    Count and time every API call made through a boto3 client
+
+    Uses botocore's before-call/after-call events; the start time travels
+    in the per-request context dict, so concurrent calls do not interfere.
+
+    Args:
+        client: boto3 client
+        service: Service name used as the metric label (e.g. 's3')
+    """
+    def before_call(context=None, **kwargs):
+        if context is not None:
+            context["ytt_metrics_start"] = time.perf_counter()
+
+    def after_call(http_response=None, model=None, context=None, **kwargs):
+        start = context.get("ytt_metrics_start") if context is not None else None
+        operation = model.name if model is not None else "unknown"
+        status = getattr(http_response, "status_code", None) or "error"
+        AWS_REQUESTS.labels(service, operation, status).inc()
+        if start is not None:
+            AWS_REQUEST_SECONDS.labels(service, operation).observe(time.perf_counter() - start)
+
+    events = client.meta.events
+    event_service = client.meta.service_model.service_id.hyphenize()
+    events.register(f"before-call.{event_service}", before_call)
+    events.register(f"after-call.{event_service}", after_call)
+
+def observe_job(status, summary=None):
+    """
+    Record a finished job
+
+    Args:
+        status: 'completed' or 'failed'
+        summary: JobTrace summary, if available
+    """
+    JOBS.labels(status).inc()
+    if not summary:
+        return
+    JOB_SECONDS.observe(summary["total_wall"])
+    if summary.get("real_time_factor") is not None:
+        JOB_RTF.observe(summary["real_time_factor"])
+    if summary.get("audio_duration"):
+        AUDIO_SECONDS.inc(summary["audio_duration"])
+
+def observe_download(num_bytes, seconds):
+    """Record a finished download"""
+    DOWNLOAD_BYTES.inc(num_bytes)
+    if seconds > 0:
+        DOWNLOAD_THROUGHPUT.observe(num_bytes / seconds)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics and a /healthz liveness probe"""
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body = REGISTRY.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/healthz":
+            body = b"ok\n"
+            content_type = "text/plain"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the worker log
+
+def start_metrics_server(port, addr="0.0.0.0"):
+    """
+    Serve metrics over HTTP from a daemon thread
+
+    Args:
+        port: TCP port
+        addr: Address to bind
+
+    Returns:
+        The running ThreadingHTTPServer
+    """
+    server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on http://{addr}:{port}/metrics")
+    return server
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# retry.py - Retry policies with backoff, circuit breakers and retry statistics
+
+import time
+import random
+import threading
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts=1, base_delay=1.0, max_delay=30.0, jitter=True):
+        """
+        Initialize the retry policy
+
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Delay before the first retry in seconds
+            max_delay: Upper bound for any single delay in seconds
+            jitter: Randomize delays between 0 and the backoff value
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def should_retry(self, attempt):
+        """Check whether another attempt is allowed after `attempt` attempts"""
+        return attempt < self.max_attempts
+
+    def delay(self, attempt):
+        """Get the delay before the retry that follows attempt number `attempt` (1-based)"""
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
+
+class CircuitBreaker:
+    """
+    Stops calling an operation that keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    rejects calls for `cooldown` seconds. It then lets a single probe call
+    through (half-open); a success closes it, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, cooldown=300):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            name: Name of the protected operation (for logs and stats)
+            failure_threshold: Consecutive failures before opening
+            cooldown: Seconds to stay open before probing again
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Check whether a call may go through now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: only one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """Record a successful call"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call; may open the breaker"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def release(self):
+        """End a call whose outcome says nothing about the operation's health"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def remaining_cooldown(self):
+        """Seconds until an open breaker will allow a probe (0 if not open)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0
+            return max(0.0, self.cooldown - (time.time() - self.opened_at))
+
+    def get_stats(self):
+        """Get breaker state for metrics"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+            }
+
+class RetryStats:
+    """Thread-safe counters of attempts, outcomes and retries per operation"""
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def increment(self, operation, counter, amount=1):
+        """Increment a named counter for an operation"""
+        with self._lock:
+            counters = self._counters.setdefault(operation, {})
+            counters[counter] = counters.get(counter, 0) + amount
+
+    def get_stats(self):
+        """Get a copy of all counters, keyed by operation"""
+        with self._lock:
+            return {operation: dict(counters) for operation, counters in self._counters.items()}
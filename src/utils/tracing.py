@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# tracing.py - Lightweight per-job stage and chunk timing
+
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Serializes appends to trace files shared by several jobs in one process
+_trace_file_lock = threading.Lock()
+
+def _percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty sorted list"""
+    index = min(len(values) - 1, max(0, int(round(fraction * (len(values) - 1)))))
+    return values[index]
+
+class JobTrace:
+    """
+    Records wall-clock and CPU time per stage and per chunk for one job.
+
+    CPU time is process CPU time (time.process_time), which includes the
+    inference library's own threads; when several jobs run in one process
+    it is shared between them.
+    """
+
+    def __init__(self, job_id, video_id=None, worker_id=None, trace_file=None):
+        """
+        Initialize the trace
+
+        Args:
+            job_id: Job ID
+            video_id: YouTube video ID
+            worker_id: ID of the worker running the job
+            trace_file: Optional JSON-lines file the finished trace is appended to
+        """
+        self.job_id = job_id
+        self.video_id = video_id
+        self.worker_id = worker_id
+        self.trace_file = trace_file
+        self.audio_duration = None
+        self.stages = {}
+        self.chunks = []
+        self.started_at = datetime.now().isoformat()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage; repeated stages with the same name are accumulated
+
+        Usage:
+            with trace.stage("download"):
+                ...
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def add_stage_time(self, name, wall, cpu=0.0):
+        """Add an already measured duration to a stage"""
+        with self._lock:
+            stage = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "count": 0})
+            stage["wall"] += wall
+            stage["cpu"] += cpu
+            stage["count"] += 1
+        metrics.STAGE_SECONDS.labels(name).observe(wall)
+
+    def record_chunk(self, index, audio_seconds, wall, cpu, **stage_walls):
+        """
+        Record the timing of one transcribed chunk
+
+        Args:
+            index: Chunk index
+            audio_seconds: Length of the chunk's audio
+            wall: Wall-clock seconds spent on the chunk
+            cpu: CPU seconds spent on the chunk
+            **stage_walls: Per-stage wall times within the chunk (e.g. transcribe=, align=)
+        """
+        chunk = {
+            "index": index,
+            "audio_seconds": round(audio_seconds, 3),
+            "wall": round(wall, 4),
+            "cpu": round(cpu, 4),
+            "rtf": round(wall / audio_seconds, 4) if audio_seconds else None,
+        }
+        chunk.update({name: round(value, 4) for name, value in stage_walls.items()})
+        with self._lock:
+            self.chunks.append(chunk)
+        metrics.CHUNK_SECONDS.observe(wall)
+        if audio_seconds:
+            metrics.CHUNK_RTF.observe(wall / audio_seconds)
+
+    def summary(self):
+        """
+        Summarize the trace
+
+        Returns:
+            Dict with per-stage totals, chunk latency statistics and the
+            real-time factor (processing wall time / audio duration)
+        """
+        with self._lock:
+            stages = {name: {"wall": round(s["wall"], 4), "cpu": round(s["cpu"], 4), "count": s["count"]}
+                      for name, s in self.stages.items()}
+            chunks = list(self.chunks)
+
+        total_wall = time.perf_counter() - self._wall_start
+        audio_duration = self.audio_duration
+        if audio_duration is None and chunks:
+            audio_duration = sum(c["audio_seconds"] for c in chunks)
+
+        summary = {
+            "stages": stages,
+            "total_wall": round(total_wall, 4),
+            "total_cpu": round(time.process_time() - self._cpu_start, 4),
+            "audio_duration": audio_duration,
+            "real_time_factor": round(total_wall / audio_duration, 4) if audio_duration else None,
+        }
+
+        if chunks:
+            walls = sorted(c["wall"] for c in chunks)
+            chunk_audio = sum(c["audio_seconds"] for c in chunks)
+            summary["chunks"] = {
+                "count": len(chunks),
+                "mean_wall": round(sum(walls) / len(walls), 4),
+                "p50_wall": _percentile(walls, 0.5),
+                "p95_wall": _percentile(walls, 0.95),
+                "max_wall": walls[-1],
+                "inference_rtf": round(sum(walls) / chunk_audio, 4) if chunk_audio else None,
+            }
+        return summary
+
+    def write(self, status="completed"):
+        """
+        Append the trace as one JSON line to the trace file, if configured
+
+        Args:
+            status: Final job status to record
+        """
+        if not self.trace_file:
+            return False
+
+        record = {
+            "job_id": self.job_id,
+            "video_id": self.video_id,
+            "worker_id": self.worker_id,
+            "status": status,
+            "started_at": self.started_at,
+            "finished_at": datetime.now().isoformat(),
+            "summary": self.summary(),
+            "chunks": list(self.chunks),
+        }
+        try:
+            with _trace_file_lock:
+                with open(self.trace_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            return True
+        except Exception as e:
+            logger.error(f"Error writing trace for job {self.job_id}: {str(e)}")
+            return False
+
+@contextmanager
+def maybe_stage(trace, name):
+    """Time a stage when a trace is given; do nothing otherwise"""
+    if trace is None:
+        yield
+    else:
+        with trace.stage(name):
+            yield
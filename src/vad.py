@@ -0,0 +1,265 @@
+#!/usr/bin/python3
+# vad.py - Whole-file voice activity detection and speech-only chunk planning
+
+import logging
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+BACKEND_AUTO = "auto"
+BACKEND_PYANNOTE = "pyannote"
+BACKEND_ENERGY = "energy"
+BACKENDS = (BACKEND_AUTO, BACKEND_PYANNOTE, BACKEND_ENERGY)
+
+SPEECH_MAP_VERSION = 1
+
+# Audio is read in blocks of this length, so detection memory does not grow with duration
+BLOCK_SECONDS = 600
+
+# Energy backend: 30 ms frames, speech is anything this far above the noise floor
+FRAME_SECONDS = 0.03
+NOISE_FLOOR_PERCENTILE = 10
+ENERGY_MARGIN_DB = 15.0
+MIN_SPEECH_DB = -50.0
+
+# Region clean-up shared by both backends
+PAD_SECONDS = 0.2       # context kept around each region so word edges are not clipped
+MIN_GAP_SECONDS = 1.0   # shorter pauses are merged into the surrounding speech
+MIN_SPEECH_SECONDS = 0.25
+
+class VADError(Exception):
+    """Exception raised for errors during voice activity detection"""
+    pass
+
+class SpeechMap:
+    """Speech regions of one audio file, in seconds from the start of the file"""
+
+    def __init__(self, regions, duration, backend=None):
+        """
+        Args:
+            regions: Sorted, non-overlapping (start, end) tuples in seconds
+            duration: Length of the audio in seconds
+            backend: Name of the detector that produced the regions
+        """
+        self.regions = [(float(start), float(end)) for start, end in regions]
+        self.duration = float(duration)
+        self.backend = backend
+
+    @property
+    def speech_seconds(self):
+        """Total seconds of detected speech"""
+        return sum(end - start for start, end in self.regions)
+
+    def plan_chunks(self, chunk_size):
+        """
+        Plan chunk boundaries covering the speech regions only
+
+        Consecutive regions are packed into one chunk while it stays within
+        chunk_size (the pauses between them are cheap, WhisperX's own VAD
+        drops them); longer regions are split into equal parts of at most
+        chunk_size, so no sliver chunks are left over. Audio outside every
+        region is never read.
+
+        Args:
+            chunk_size: Maximum chunk length in seconds
+
+        Returns:
+            List of (start, end) tuples in seconds, one per chunk
+        """
+        chunks = []
+        for start, end in self.regions:
+            if chunks and end - chunks[-1][0] <= chunk_size:
+                chunks[-1] = (chunks[-1][0], end)
+                continue
+            parts = int(np.ceil((end - start) / chunk_size))
+            step = (end - start) / parts
+            chunks.extend((start + k * step, start + (k + 1) * step) for k in range(parts - 1))
+            chunks.append((start + (parts - 1) * step, end))
+        return chunks
+
+    def summary(self):
+        """Small summary for the job record"""
+        return {
+            "backend": self.backend,
+            "duration": round(self.duration, 3),
+            "speech_seconds": round(self.speech_seconds, 3),
+            "regions": len(self.regions),
+        }
+
+    def to_dict(self):
+        """Serialize for caching alongside the job's checkpoints"""
+        return {
+            "version": SPEECH_MAP_VERSION,
+            "backend": self.backend,
+            "duration": round(self.duration, 3),
+            "regions": [[round(start, 3), round(end, 3)] for start, end in self.regions],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict"""
+        if data.get("version") != SPEECH_MAP_VERSION:
+            raise ValueError(f"Unsupported speech map version: {data.get('version')}")
+        return cls(data["regions"], data["duration"], data.get("backend"))
+
+def clean_regions(regions, duration, pad=PAD_SECONDS, min_gap=MIN_GAP_SECONDS,
+                  min_speech=MIN_SPEECH_SECONDS):
+    """
+    Merge, drop blips from and pad raw detector regions
+
+    Args:
+        regions: Iterable of (start, end) tuples in seconds, in order
+        duration: Length of the audio in seconds (regions are clipped to it)
+        pad: Seconds added on both sides of every region
+        min_gap: Pauses shorter than this are merged into the surrounding speech
+        min_speech: Regions shorter than this (after merging) are dropped
+
+    Returns:
+        Sorted, non-overlapping list of (start, end) tuples
+    """
+    # Merge first: energy detectors see syllables, not phrases
+    merged = []
+    for start, end in regions:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    cleaned = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start = max(0.0, start - pad)
+        end = min(duration, end + pad)
+        if cleaned and start <= cleaned[-1][1]:
+            cleaned[-1] = (cleaned[-1][0], end)
+        else:
+            cleaned.append((start, end))
+    return cleaned
+
+def _frames_to_regions(is_speech, frame_seconds):
+    """Convert a per-frame speech mask into (start, end) tuples in seconds"""
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip((starts * frame_seconds).tolist(), (ends * frame_seconds).tolist()))
+
+class SpeechDetector:
+    """
+    Runs voice activity detection over a whole audio file
+
+    Two backends are available:
+    - pyannote: the segmentation model WhisperX already uses for its
+      per-chunk VAD, run once over the file. Also rejects music and noise.
+    - energy: frame energy against the file's own noise floor. Needs
+      nothing beyond numpy, but only removes silence, not music.
+    "auto" uses pyannote when WhisperX provides it and energy otherwise.
+    """
+
+    def __init__(self, backend=BACKEND_AUTO, device="cpu", onset=0.5, offset=0.363):
+        """
+        Args:
+            backend: 'auto', 'pyannote' or 'energy'
+            device: Device for the pyannote model ('cuda' or 'cpu')
+            onset: Speech probability that starts a region (pyannote)
+            offset: Speech probability that ends a region (pyannote)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown VAD backend: {backend}")
+        self.backend = backend
+        self.device = device
+        self.onset = onset
+        self.offset = offset
+        self._model = None
+        self._binarize = None
+
+    def _load_pyannote(self):
+        """Load WhisperX's pyannote VAD model; returns False if it is unavailable"""
+        if self._model is not None:
+            return True
+
+        try:
+            try:
+                from whisperx.vad import load_vad_model, Binarize
+            except ImportError:
+                # Newer WhisperX releases moved the VAD models into a package
+                from whisperx.vads.pyannote import load_vad_model, Binarize
+            self._model = load_vad_model(self.device, vad_onset=self.onset, vad_offset=self.offset)
+            self._binarize = Binarize(onset=self.onset, offset=self.offset)
+            return True
+        except Exception as e:
+            if self.backend == BACKEND_PYANNOTE:
+                raise VADError(f"Failed to load pyannote VAD model: {str(e)}")
+            logger.warning(f"pyannote VAD unavailable ({str(e)}), falling back to energy VAD")
+            self.backend = BACKEND_ENERGY
+            return False
+
+    def detect(self, audio_file):
+        """
+        Detect the speech regions of an audio file
+
+        Args:
+            audio_file: Path to audio file
+
+        Returns:
+            SpeechMap
+        """
+        try:
+            with sf.SoundFile(audio_file) as f:
+                duration = f.frames / f.samplerate
+                use_pyannote = (self.backend != BACKEND_ENERGY and f.samplerate == SAMPLE_RATE
+                                and self._load_pyannote())
+                if use_pyannote:
+                    raw_regions = self._detect_pyannote(f)
+                    backend = BACKEND_PYANNOTE
+                else:
+                    if self.backend == BACKEND_PYANNOTE:
+                        raise VADError(f"pyannote VAD needs {SAMPLE_RATE} Hz audio, got {f.samplerate} Hz")
+                    raw_regions = self._detect_energy(f)
+                    backend = BACKEND_ENERGY
+        except VADError:
+            raise
+        except Exception as e:
+            raise VADError(f"Error detecting speech: {str(e)}")
+
+        speech_map = SpeechMap(clean_regions(raw_regions, duration), duration, backend)
+        logger.info(f"VAD ({backend}): {speech_map.speech_seconds:.0f}s of speech in "
+                    f"{len(speech_map.regions)} regions out of {duration:.0f}s")
+        return speech_map
+
+    def _detect_pyannote(self, f):
+        """Run the pyannote model block by block; regions split at block edges are merged later"""
+        import torch
+
+        regions = []
+        block_frames = BLOCK_SECONDS * SAMPLE_RATE
+        for i, block in enumerate(f.blocks(blocksize=block_frames, dtype="float32", always_2d=True)):
+            block_start = i * BLOCK_SECONDS
+            waveform = torch.from_numpy(np.ascontiguousarray(block.mean(axis=1))).unsqueeze(0)
+            scores = self._model({"waveform": waveform, "sample_rate": SAMPLE_RATE})
+            for turn in self._binarize(scores).get_timeline():
+                regions.append((block_start + turn.start, block_start + turn.end))
+        return regions
+
+    def _detect_energy(self, f):
+        """Frame energies in one blockwise pass, then a threshold relative to the noise floor"""
+        frame_len = max(1, int(round(FRAME_SECONDS * f.samplerate)))
+        block_frames = (BLOCK_SECONDS * f.samplerate) // frame_len * frame_len
+
+        levels = []
+        for block in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1)
+            n = -(-len(mono) // frame_len) * frame_len
+            frames = np.pad(mono, (0, n - len(mono))).reshape(-1, frame_len)
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            levels.append(20 * np.log10(rms + 1e-10))
+
+        if not levels:
+            return []
+        levels = np.concatenate(levels)
+
+        threshold = max(np.percentile(levels, NOISE_FLOOR_PERCENTILE) + ENERGY_MARGIN_DB, MIN_SPEECH_DB)
+        return _frames_to_regions(levels > threshold, frame_len / f.samplerate)
@@ -4,7 +4,6 @@ import os
 import sys
 import argparse
 import json
-import boto3
 import logging
 import time
 import uuid
@@ -14,10 +13,26 @@ import shutil
 import socket
 import subprocess
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from src.job_tracker import JobTracker, JobState
-from src.downloader import YouTubeDownloader, DownloadError
+from src.downloader import (YouTubeDownloader, DownloadError, VideoUnavailableError, BACKEND_LIBRARY,
+                            BACKEND_SUBPROCESS)
 from src.transcriber import Transcriber, TranscriptionError
+from src.inference_batcher import DEFAULT_MAX_WAIT_SECONDS
+from src.transcript_format import CompactTranscript
 from src.scanner import PhraseScanner
+from src.audio_cache import AudioCache
+from src.vad import BACKENDS as VAD_BACKENDS, BACKEND_AUTO as VAD_BACKEND_AUTO
+from src.cpu_profile import configure_cpu_inference, COMPUTE_AUTO, CPU_COMPUTE_TYPES
+from src.model_policy import ModelPolicy, DEFAULT_LADDER, DEFAULT_BACKLOG_HIGH, DEFAULT_BACKLOG_LOW
+from src.speculative import DEFAULT_DRAFT_MODEL
+from src.scheduler import (LaneScheduler, Lane, parse_lane, message_cost, LANE_NORMAL, DEFAULT_WEIGHTS,
+                           DEFAULT_STARVATION_SECONDS)
+from src.keyword_spotter import VERIFY_MODES, VERIFY_UNCERTAIN, DEFAULT_MIN_SCORE, DEFAULT_ACCEPT_SCORE
+from src.utils import aws_clients, metrics
+from src.utils.tracing import JobTrace
+from src.utils.compression import (put_encoded_object, get_decoded_object, DEFAULT_ENCODING,
+                                   ENCODING_GZIP, ENCODING_ZSTD, ENCODING_NONE)
 
 # Setup logging
 logging.basicConfig(
@@ -31,6 +46,17 @@ DEFAULT_TEMP_DIR = "./temp"
 DEFAULT_BATCH_SIZE = 5
 DEFAULT_S3_BUCKET = "youtube-transcripts"
 DEFAULT_POLL_INTERVAL = 60  # seconds
+DEFAULT_VISIBILITY_TIMEOUT = 600  # seconds
+MAX_VISIBILITY_TIMEOUT = 43200  # SQS limit (12 hours)
+VISIBILITY_SECONDS_PER_AUDIO_SECOND = 1.5  # conservative processing time per second of audio
+DEFAULT_AUDIO_CACHE_GB = 20
+DEFAULT_INFERENCE_BATCH_SIZE = 16
+
+# Per-message transcription modes
+MODE_FULL = "full"
+MODE_SPECULATIVE = "speculative"
+MODE_KEYWORDS = "keywords"
+MODES = (MODE_FULL, MODE_SPECULATIVE, MODE_KEYWORDS)
 
 class Worker:
     """Main worker that processes YouTube videos from SQS queue"""
@@ -43,7 +69,42 @@ class Worker:
                  s3_bucket=DEFAULT_S3_BUCKET,
                  batch_size=DEFAULT_BATCH_SIZE,
                  poll_interval=DEFAULT_POLL_INTERVAL,
-                 use_gpu=True):
+                 use_gpu=True,
+                 download_backend=BACKEND_LIBRARY,
+                 range_connections=0,
+                 progressive=False,
+                 audio_cache_dir=None,
+                 audio_cache_gb=DEFAULT_AUDIO_CACHE_GB,
+                 s3_encoding=DEFAULT_ENCODING,
+                 trace_file=None,
+                 metrics_port=0,
+                 low_memory=False,
+                 vad_prepass=False,
+                 vad_backend=VAD_BACKEND_AUTO,
+                 cpu_compute_type=COMPUTE_AUTO,
+                 cpu_concurrency=1,
+                 cpu_slot=0,
+                 pin_threads=True,
+                 cpu_benchmark_audio=None,
+                 cpu_profile_file=None,
+                 model_name="small.en",
+                 beam_size=5,
+                 adaptive_model=False,
+                 model_ladder=DEFAULT_LADDER,
+                 backlog_high=DEFAULT_BACKLOG_HIGH,
+                 backlog_low=DEFAULT_BACKLOG_LOW,
+                 loaded_models=2,
+                 speculative=False,
+                 draft_model=DEFAULT_DRAFT_MODEL,
+                 keyword_spotting=False,
+                 kws_verify=VERIFY_UNCERTAIN,
+                 kws_min_score=DEFAULT_MIN_SCORE,
+                 kws_accept_score=DEFAULT_ACCEPT_SCORE,
+                 concurrent_jobs=1,
+                 inference_batch_size=DEFAULT_INFERENCE_BATCH_SIZE,
+                 batch_wait=DEFAULT_MAX_WAIT_SECONDS,
+                 lanes=None,
+                 starvation_seconds=DEFAULT_STARVATION_SECONDS):
         """Initialize the worker"""
         self.phrase = phrase
         self.temp_dir = temp_dir
@@ -53,37 +114,118 @@ class Worker:
         self.batch_size = batch_size
         self.poll_interval = poll_interval
         self.use_gpu = use_gpu
+        self.progressive = progressive
+        self.s3_encoding = s3_encoding
+        self.trace_file = trace_file
 
-        # Generate a unique worker ID
+        # Optional scrape endpoint; job, chunk, download and AWS metrics are
+        # recorded either way and cost only a few lock acquisitions
+        self.metrics_server = metrics.start_metrics_server(metrics_port) if metrics_port else None
+
+        # Generate a unique worker ID (the RunPod autoscaler matches heartbeats to pods by pod_id)
         self.worker_id = f"worker-{uuid.uuid4()}"
+        self.pod_id = os.environ.get("RUNPOD_POD_ID")
         logger.info(f"Worker initialized with ID: {self.worker_id}")
 
-        # Initialize AWS clients
-        self.s3 = boto3.client('s3', region_name=region)
-        self.sqs = boto3.client('sqs', region_name=region) if queue_url else None
+        # Initialize AWS clients (shared with the job tracker and transcriber)
+        self.concurrent_jobs = max(1, concurrent_jobs)
+        aws_clients.configure(max_pool_connections=aws_clients.pool_size_for_concurrency(self.concurrent_jobs))
+        self.s3 = aws_clients.get_client('s3', region)
+        self.sqs = aws_clients.get_client('sqs', region) if queue_url or lanes else None
+        self.uploader = aws_clients.get_async_uploader(region)
 
         # Initialize components
-        self.job_tracker = JobTracker(s3_bucket, region)
-        self.downloader = YouTubeDownloader(temp_dir)
+        self.job_tracker = JobTracker(s3_bucket, region, content_encoding=s3_encoding)
+        self.downloader = YouTubeDownloader(temp_dir, backend=download_backend,
+                                            range_connections=range_connections)
+
+        # Decoded audio survives the per-video temp dir, so retries skip download and ffmpeg
+        if audio_cache_gb > 0:
+            self.audio_cache = AudioCache(
+                audio_cache_dir or os.path.join(temp_dir, ".audio_cache"),
+                max_bytes=int(audio_cache_gb * 1024 ** 3)
+            )
+        else:
+            self.audio_cache = None
 
         # Initialize transcriber with correct parameters
         device = "cuda" if use_gpu else "cpu"
         self.transcriber = Transcriber(
-            model_name="small.en",
+            model_name=model_name,
             device=device,
             chunk_size=30,
             s3_bucket=s3_bucket,
-            region=region
+            region=region,
+            batch_size=inference_batch_size,
+            content_encoding=s3_encoding,
+            low_memory=low_memory,
+            vad_prepass=vad_prepass,
+            vad_backend=vad_backend,
+            max_loaded_models=loaded_models
         )
 
+        # Model and beam size per job, from video length, queue backlog and the message's quality hint.
+        # Concurrent jobs share one model, so it cannot change per job.
+        if adaptive_model and self.concurrent_jobs > 1:
+            logger.warning("--adaptive_model is ignored with --concurrent_jobs above 1 (jobs share one model)")
+            adaptive_model = False
+        self.model_policy = ModelPolicy(model_name, beam_size, model_ladder, adaptive=adaptive_model,
+                                        backlog_high=backlog_high, backlog_low=backlog_low)
+        self.queue_depth = None
+
+        # Priority lanes: queue_url is the 'normal' lane, --lane adds (or replaces) lanes
+        lane_list = [Lane(LANE_NORMAL, queue_url, DEFAULT_WEIGHTS[LANE_NORMAL])] if queue_url else []
+        for spec in lanes or []:
+            lane = parse_lane(spec) if isinstance(spec, str) else spec
+            lane_list = [existing for existing in lane_list if existing.name != lane.name] + [lane]
+        self.scheduler = LaneScheduler(lane_list, starvation_seconds) if lane_list else None
+        if self.scheduler and len(lane_list) > 1:
+            logger.info("Lanes: " + ", ".join(f"{lane.name} (weight {lane.weight})" for lane in lane_list))
+
+        # Draft-and-refine transcription for phrase searches (messages can override with "mode")
+        self.speculative = speculative
+        self.draft_model = draft_model
+
+        # Phrase counting by keyword spotting, without a transcript (messages can override with "mode")
+        self.keyword_spotting = keyword_spotting
+        self.kws_verify = kws_verify
+        self.kws_min_score = kws_min_score
+        self.kws_accept_score = kws_accept_score
+
+        # CPU fleet: int8 compute and threads sized to this worker's share of
+        # the host; with 'auto' the compute type is benchmarked on startup
+        self.cpu_profile = None
+        if not use_gpu:
+            self.cpu_profile = configure_cpu_inference(
+                self.transcriber,
+                compute_type=cpu_compute_type,
+                concurrency=cpu_concurrency,
+                slot=cpu_slot,
+                pin=pin_threads,
+                benchmark_audio=cpu_benchmark_audio,
+                profile_file=cpu_profile_file
+            )
+
         # Ensure temp directory exists
         os.makedirs(temp_dir, exist_ok=True)
 
         # Set up termination handling
         self.setup_termination_handler()
 
-        # Track jobs processed
+        # Track jobs processed, and audio seconds per busy second for the autoscaler
         self.jobs_processed = 0
+        self.jobs_in_flight = 0
+        self.audio_seconds_processed = 0.0
+        self.busy_seconds = 0.0
+        self._busy_since = None
+        self._jobs_lock = threading.Lock()
+
+        # Several jobs in flight share Whisper batches, so short videos fill them together
+        if self.concurrent_jobs > 1:
+            self.job_pool = ThreadPoolExecutor(max_workers=self.concurrent_jobs, thread_name_prefix="job")
+            self.transcriber.start_batching(max_wait=batch_wait)
+        else:
+            self.job_pool = None
 
         # Ensure S3 bucket exists
         self.ensure_bucket_exists()
@@ -160,26 +302,61 @@ class Worker:
         """Update worker heartbeat in S3"""
         heartbeat = {
             "worker_id": self.worker_id,
+            "pod_id": self.pod_id,
             "hostname": socket.gethostname(),
             "ip_address": socket.gethostbyname(socket.gethostname()),
             "last_heartbeat": datetime.now().isoformat(),
             "status": "active",
             "jobs_processed": self.jobs_processed,
+            "jobs_in_flight": self.jobs_in_flight,
+            "audio_seconds_processed": round(self.audio_seconds_processed, 1),
+            "busy_seconds": round(self.get_busy_seconds(), 1),
             "phrase": self.phrase,
-            "use_gpu": self.use_gpu
+            "use_gpu": self.use_gpu,
+            "cpu_profile": self.cpu_profile.to_dict() if self.cpu_profile else None,
+            "download_stats": self.downloader.get_retry_stats(),
+            "audio_cache": self.audio_cache.get_stats() if self.audio_cache else None,
+            "concurrent_jobs": self.concurrent_jobs,
+            "inference_batches": self.transcriber.batcher.get_stats() if self.transcriber.batcher else None,
+            "lanes": self.scheduler.get_stats() if self.scheduler else None
         }
 
+        # Fire-and-forget: a slow S3 call should not delay polling
+        self.uploader.put_object(
+            Body=json.dumps(heartbeat),
+            Bucket=self.s3_bucket,
+            Key=f"workers/{self.worker_id}.json",
+            ContentType="application/json"
+        )
+        return True
+
+    def get_busy_seconds(self):
+        """Wall seconds during which at least one job was in flight"""
+        with self._jobs_lock:
+            busy = self.busy_seconds
+            if self._busy_since is not None:
+                busy += time.monotonic() - self._busy_since
+            return busy
+
+    def _job_started(self):
+        with self._jobs_lock:
+            self.jobs_in_flight += 1
+            if self._busy_since is None:
+                self._busy_since = time.monotonic()
+
+    def _job_finished(self, audio_seconds=0):
+        with self._jobs_lock:
+            self.jobs_in_flight -= 1
+            self.audio_seconds_processed += audio_seconds
+            if self.jobs_in_flight == 0 and self._busy_since is not None:
+                self.busy_seconds += time.monotonic() - self._busy_since
+                self._busy_since = None
+
+    def _job_heartbeat(self):
         try:
-            self.s3.put_object(
-                Body=json.dumps(heartbeat),
-                Bucket=self.s3_bucket,
-                Key=f"workers/{self.worker_id}.json",
-                ContentType="application/json"
-            )
-            return True
+            self.update_heartbeat()
         except Exception as e:
-            logger.error(f"Error updating heartbeat: {str(e)}")
-            return False
+            logger.warning(f"Could not update heartbeat: {str(e)}")
 
     def start(self):
         """Start the worker's main loop"""
@@ -221,143 +398,204 @@ class Worker:
                 time.sleep(self.poll_interval)
 
     def process_batch(self):
-        """Process a batch of videos from the SQS queue"""
-        if not self.sqs or not self.queue_url:
+        """Process a batch of videos from the SQS queue lanes"""
+        if not self.sqs or not self.scheduler:
             logger.error("SQS client or queue URL not configured")
             return
 
         processed_count = 0
+        in_flight = set()
 
-        while processed_count < self.batch_size:
+        while processed_count + len(in_flight) < self.batch_size:
 
-            # Check queue depth
-            try:
-                response = self.sqs.get_queue_attributes(
-                    QueueUrl=self.queue_url,
-                    AttributeNames=['ApproximateNumberOfMessages']
-                )
-                queue_depth = int(response['Attributes'].get('ApproximateNumberOfMessages', '0'))
-                logger.info(f"Queue depth: {queue_depth} messages")
-
-                # Add this new code here
-                attr_response = self.sqs.get_queue_attributes(
-                    QueueUrl=self.queue_url,
-                    AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
-                )
-                visible = int(attr_response['Attributes'].get('ApproximateNumberOfMessages', '0'))
-                not_visible = int(attr_response['Attributes'].get('ApproximateNumberOfMessagesNotVisible', '0'))
-                logger.info(f"Queue status: {visible} visible messages, {not_visible} in-flight messages")
+            # With concurrent jobs, only receive a message once a job slot is free
+            while len(in_flight) >= self.concurrent_jobs:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                processed_count += sum(future.result() for future in done)
 
-                if queue_depth == 0:
+            # Check queue depth of every lane
+            try:
+                waiting = self.lane_depths()
+                if not any(waiting.values()):
                     logger.info("Queue is empty")
                     break
             except Exception as e:
                 logger.error(f"Error checking queue depth: {str(e)}")
                 break
 
-
-            # Get message from queue (don't delete yet)
+            # Get a message from the lane the scheduler picks (don't delete yet)
             try:
-                response = self.sqs.receive_message(
-                    QueueUrl=self.queue_url,
-                    AttributeNames=['All'],
-                    MaxNumberOfMessages=1,
-                    MessageAttributeNames=['All'],
-                    WaitTimeSeconds=5,
-                    VisibilityTimeout=600  # 10 minutes
-                )
-
-                logger.info(f"SQS response keys: {response.keys()}")
-                # Add after receive_message call
-                logger.info(f"SQS response keys: {response.keys()}")
-                if 'Messages' not in response:
+                received = None
+                for lane in self.scheduler.order(waiting):
+                    message = self.receive_message(lane)
+                    if message is not None:
+                        received = (lane, message)
+                        break
+
+                if received is None:
                     logger.info("No messages available in response")
-                    # Check if queue is truly empty or if messages are in flight
-                    try:
-                        attr_response = self.sqs.get_queue_attributes(
-                            QueueUrl=self.queue_url,
-                            AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
-                        )
-                        visible = int(attr_response['Attributes'].get('ApproximateNumberOfMessages', '0'))
-                        not_visible = int(attr_response['Attributes'].get('ApproximateNumberOfMessagesNotVisible', '0'))
-                        logger.info(f"Queue status: {visible} visible messages, {not_visible} in-flight messages")
-                    except Exception as e:
-                        logger.error(f"Error checking detailed queue status: {str(e)}")
                     break
 
-                message = response['Messages'][0]
-                receipt_handle = message['ReceiptHandle']
-                job_id = message.get('MessageId', f"job-{uuid.uuid4()}")
-
+                lane, message = received
                 try:
-                    # Parse message body
-                    body = json.loads(message['Body'])
-                    youtube_url = body.get('youtube_url')
-                    custom_phrase = body.get('phrase', self.phrase)
-
-                    if not youtube_url:
-                        logger.error("Message does not contain a YouTube URL")
-                        self.sqs.delete_message(
-                            QueueUrl=self.queue_url,
-                            ReceiptHandle=receipt_handle
-                        )
-                        continue
-
-                    # Extract video ID
-                    video_id = self.downloader.extract_video_id(youtube_url)
-
-                    ## Check if already processed
-                    #if self.job_exists(video_id):
-                    #    logger.info(f"Video {video_id} already processed, skipping")
-                    #    self.sqs.delete_message(
-                    #        QueueUrl=self.queue_url,
-                    #        ReceiptHandle=receipt_handle
-                    #    )
-                    #    continue
-
-                    # Create job in tracker
-                    self.job_tracker.create_job(
-                        job_id=job_id,
-                        video_id=video_id,
-                        youtube_url=youtube_url,
-                        phrase=custom_phrase
-                    )
+                    cost = message_cost(json.loads(message['Body']))
+                except (ValueError, KeyError, AttributeError):
+                    cost = message_cost({})
+                self.scheduler.charge(lane.name, cost)
+                logger.info(f"Took a message from lane '{lane.name}' (estimated {cost:.0f}s of audio)")
 
-                    # Start processing the job
-                    self.job_tracker.start_processing(job_id, self.worker_id)
+                if self.job_pool is None:
+                    processed_count += self.handle_message(message, lane)
+                else:
+                    in_flight.add(self.job_pool.submit(self.handle_message, message, lane))
 
-                    # Process the video
-                    logger.info(f"Processing video {video_id} (job {job_id}) with phrase '{custom_phrase}'")
-                    result = self.process_video(job_id, youtube_url, custom_phrase, video_id)
+            except Exception as e:
+                logger.error(f"Error receiving message: {str(e)}")
+                break
 
-                    # Mark job as completed
-                    if result:
-                        self.job_tracker.complete_job(job_id)
+        # Jobs still running when the queue ran dry
+        for future in in_flight:
+            processed_count += future.result()
 
-                        # Delete from queue
-                        self.sqs.delete_message(
-                            QueueUrl=self.queue_url,
-                            ReceiptHandle=receipt_handle
-                        )
+        logger.info(f"Processed {processed_count} videos in this batch")
 
-                        processed_count += 1
-                        self.jobs_processed += 1
+    def lane_depths(self):
+        """
+        Visible messages per lane
+
+        Also updates queue_depth (all lanes together) and the queue metrics.
+
+        Returns:
+            Dict of lane name -> visible messages
+        """
+        waiting = {}
+        visible_total = 0
+        not_visible_total = 0
+        for lane in self.scheduler.lanes:
+            attr_response = self.sqs.get_queue_attributes(
+                QueueUrl=lane.queue_url,
+                AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
+            )
+            visible = int(attr_response['Attributes'].get('ApproximateNumberOfMessages', '0'))
+            not_visible = int(attr_response['Attributes'].get('ApproximateNumberOfMessagesNotVisible', '0'))
+            metrics.LANE_MESSAGES.labels(lane.name, "visible").set(visible)
+            metrics.LANE_MESSAGES.labels(lane.name, "in_flight").set(not_visible)
+            waiting[lane.name] = visible
+            visible_total += visible
+            not_visible_total += not_visible
+
+        logger.info(f"Queue status: {visible_total} visible messages, {not_visible_total} in-flight messages"
+                    + (f" {waiting}" if len(waiting) > 1 else ""))
+        metrics.QUEUE_MESSAGES.labels("visible").set(visible_total)
+        metrics.QUEUE_MESSAGES.labels("in_flight").set(not_visible_total)
+        self.queue_depth = visible_total
+        return waiting
+
+    def receive_message(self, lane):
+        """Receive one message from a lane's queue without deleting it; None if there is none"""
+        response = self.sqs.receive_message(
+            QueueUrl=lane.queue_url,
+            AttributeNames=['All'],
+            MaxNumberOfMessages=1,
+            MessageAttributeNames=['All'],
+            WaitTimeSeconds=5 if len(self.scheduler.lanes) == 1 else 1,
+            VisibilityTimeout=600  # 10 minutes
+        )
+        messages = response.get('Messages')
+        return messages[0] if messages else None
 
-                except Exception as e:
-                    logger.error(f"Error processing job {job_id}: {str(e)}")
-                    self.job_tracker.fail_job(job_id, str(e))
+    def handle_message(self, message, lane=None):
+        """
+        Run one SQS message's job to completion and delete the message
 
-                    # Delete from queue
-                    self.sqs.delete_message(
-                        QueueUrl=self.queue_url,
-                        ReceiptHandle=receipt_handle
-                    )
+        Runs on the job pool's threads when --concurrent_jobs is above 1.
+        lane is the Lane the message came from (default: the --queue_url lane).
 
-            except Exception as e:
-                logger.error(f"Error receiving message: {str(e)}")
-                break
+        Returns:
+            True if the job completed
+        """
+        lane = lane or self.scheduler.lanes[0]
+        receipt_handle = message['ReceiptHandle']
+        job_id = message.get('MessageId', f"job-{uuid.uuid4()}")
 
-        logger.info(f"Processed {processed_count} videos in this batch")
+        # Heartbeats at job boundaries keep jobs_in_flight current for the autoscaler
+        self._job_started()
+        self._job_heartbeat()
+        audio_seconds = 0
+
+        try:
+            # Parse message body
+            body = json.loads(message['Body'])
+            youtube_url = body.get('youtube_url')
+            custom_phrase = body.get('phrase', self.phrase)
+            quality = body.get('quality')
+            mode = body.get('mode')
+
+            if not youtube_url:
+                logger.error("Message does not contain a YouTube URL")
+                self.sqs.delete_message(
+                    QueueUrl=lane.queue_url,
+                    ReceiptHandle=receipt_handle
+                )
+                return False
+
+            # Extract video ID
+            video_id = self.downloader.extract_video_id(youtube_url)
+
+            ## Check if already processed
+            #if self.job_exists(video_id):
+            #    logger.info(f"Video {video_id} already processed, skipping")
+            #    self.sqs.delete_message(
+            #        QueueUrl=lane.queue_url,
+            #        ReceiptHandle=receipt_handle
+            #    )
+            #    return False
+
+            # Create job in tracker
+            self.job_tracker.create_job(
+                job_id=job_id,
+                video_id=video_id,
+                youtube_url=youtube_url,
+                phrase=custom_phrase
+            )
+
+            # Start processing the job
+            self.job_tracker.start_processing(job_id, self.worker_id)
+
+            # Process the video
+            logger.info(f"Processing video {video_id} (job {job_id}) with phrase '{custom_phrase}'")
+            result = self.process_video(job_id, youtube_url, custom_phrase, video_id,
+                                        receipt_handle=receipt_handle, quality=quality, mode=mode,
+                                        lane=lane)
+
+            # Mark job as completed
+            if result:
+                self.job_tracker.complete_job(job_id, timing=result.get("timing"))
+                audio_seconds = result["timing"].get("audio_duration") or 0
+
+                # Delete from queue
+                self.sqs.delete_message(
+                    QueueUrl=lane.queue_url,
+                    ReceiptHandle=receipt_handle
+                )
+
+                with self._jobs_lock:
+                    self.jobs_processed += 1
+                return True
+
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {str(e)}")
+            self.job_tracker.fail_job(job_id, str(e))
+
+            # Delete from queue
+            self.sqs.delete_message(
+                QueueUrl=lane.queue_url,
+                ReceiptHandle=receipt_handle
+            )
+        finally:
+            self._job_finished(audio_seconds)
+            self._job_heartbeat()
+        return False
 
     def job_exists(self, video_id):
         """Check if a job already exists for this video"""
@@ -374,53 +612,171 @@ class Worker:
             logger.error(f"Error checking if job exists: {str(e)}")
             return False
 
-    def process_video(self, job_id, youtube_url, phrase, video_id):
-        """Process a single video"""
+    def extend_visibility(self, receipt_handle, duration, queue_url=None):
+        """Size the SQS visibility timeout of a message to the video duration"""
+        queue_url = queue_url or self.queue_url
+        if not self.sqs or not queue_url or not receipt_handle or not duration:
+            return False
+
+        timeout = int(duration * VISIBILITY_SECONDS_PER_AUDIO_SECOND) + DEFAULT_VISIBILITY_TIMEOUT
+        timeout = min(timeout, MAX_VISIBILITY_TIMEOUT)
+
+        try:
+            self.sqs.change_message_visibility(
+                QueueUrl=queue_url,
+                ReceiptHandle=receipt_handle,
+                VisibilityTimeout=timeout
+            )
+            logger.info(f"Set visibility timeout to {timeout}s for {duration}s of audio")
+            return True
+        except Exception as e:
+            logger.error(f"Error changing message visibility: {str(e)}")
+            return False
+
+    def process_video(self, job_id, youtube_url, phrase, video_id, receipt_handle=None, quality=None, mode=None,
+                      lane=None):
+        """
+        Process a single video
+
+        quality is the message's optional model quality hint; mode
+        ('full', 'speculative' or 'keywords') overrides the worker's
+        --speculative and --keyword_spotting. lane is the Lane the
+        message came from.
+        """
+        queue_url = lane.queue_url if lane else self.queue_url
         # Create a video-specific temp directory
         video_temp_dir = os.path.join(self.temp_dir, video_id)
         os.makedirs(video_temp_dir, exist_ok=True)
 
+        # Per-stage wall/CPU timings, attached to the results and the job record
+        trace = JobTrace(job_id, video_id=video_id, worker_id=self.worker_id, trace_file=self.trace_file)
+        metrics.JOBS_IN_PROGRESS.inc()
+        if mode not in MODES:
+            mode = MODE_KEYWORDS if self.keyword_spotting else MODE_SPECULATIVE if self.speculative else MODE_FULL
+
         try:
             # Step 1: Download audio
             self.job_tracker.update_progress(job_id, completed_chunks=0, total_chunks=5)
             logger.info(f"Downloading audio from {youtube_url}")
 
-            audio_mp4 = self.downloader.download(youtube_url, video_temp_dir)
-            self.job_tracker.update_progress(job_id, completed_chunks=1)
-
-            # Step 2: Convert to WAV
-            logger.info("Converting audio to WAV")
-            audio_wav = self.downloader.convert_to_wav(audio_mp4, video_temp_dir)
-            self.job_tracker.update_progress(job_id, completed_chunks=2)
-
-            # Step 3: Segment audio and transcribe
-            # Using the Transcriber's methods directly - it handles segmentation internally
-            logger.info("Transcribing audio")
-
-            # Check if we can resume transcription
-            transcription = self.transcriber.resume_transcription(
-                audio_file=audio_wav,
-                job_id=job_id,
-                job_tracker=self.job_tracker,
-                video_id=video_id
-            )
+            cached_wav = self.audio_cache.get(video_id) if self.audio_cache else None
 
-            # Extract segments to text files for scanning
-            # We'll save each segment to a separate text file
-            segments_dir = os.path.join(video_temp_dir, "segments")
-            os.makedirs(segments_dir, exist_ok=True)
-
-            transcript_files = []
-            for i, segment in enumerate(transcription.get("segments", [])):
-                txt_file = os.path.join(segments_dir, f"segment_{i:03d}.txt")
-                with open(txt_file, "w", encoding="utf-8") as f:
-                    f.write(segment.get("text", ""))
-                transcript_files.append(txt_file)
+            # Progressive download when resolving the stream works (with the
+            # downloader's retries and breaker), a regular download otherwise
+            audio_stream = None
+            if not cached_wav and self.progressive and mode == MODE_FULL:
+                with trace.stage("download"):
+                    try:
+                        audio_stream = self.downloader.stream_audio(
+                            youtube_url, video_temp_dir, chunk_size=self.transcriber.chunk_size
+                        )
+                    except VideoUnavailableError:
+                        raise
+                    except Exception as e:
+                        logger.warning(f"Progressive download failed, falling back to a full download: {str(e)}")
+
+            if cached_wav:
+                # Retry or re-run of a video we already decoded: skip yt-dlp and ffmpeg
+                metadata = self.downloader.get_metadata(video_id) or {}
+                duration = metadata.get("duration")
+                trace.audio_duration = duration
+                self.job_tracker.update_progress(job_id, completed_chunks=2, metadata=metadata)
+                self.extend_visibility(receipt_handle, duration, queue_url)
+                model_decision = self.select_model(duration, quality, video_id)
+
+                logger.info("Transcribing cached audio")
+                with trace.stage("transcription"):
+                    transcription = self.transcribe_file(cached_wav, job_id, video_id, phrase, duration,
+                                                         trace, mode)
+            elif audio_stream is not None:
+                # Download, decode and transcription overlap: chunks are
+                # transcribed while the rest of the file is still downloading
+                # ("download" only covers resolving the stream here; the
+                # fetch itself overlaps the "transcription" stage)
+                metadata = self.downloader.get_metadata(video_id) or {}
+                duration = metadata.get("duration")
+                trace.audio_duration = duration
+                self.job_tracker.update_progress(job_id, completed_chunks=1, metadata=metadata)
+                self.extend_visibility(receipt_handle, duration, queue_url)
+                model_decision = self.select_model(duration, quality, video_id)
+
+                logger.info("Transcribing audio progressively")
+                with trace.stage("transcription"):
+                    transcription = self.transcriber.transcribe_stream(
+                        audio_stream,
+                        job_id=job_id,
+                        job_tracker=self.job_tracker,
+                        video_id=video_id,
+                        duration=duration,
+                        trace=trace
+                    )
+                # transcribe_stream closed the stream, so the download has ended
+                metrics.observe_download(audio_stream.bytes_downloaded, audio_stream.download_seconds or 0)
 
-            # Step 4: Scan transcripts for the phrase
-            logger.info(f"Scanning transcripts for phrase '{phrase}'")
-            scanner = PhraseScanner(phrase)
-            stats = scanner.scan_transcripts(transcript_files)
+                # The spooled WAV is only complete once ffmpeg reached the end of the
+                # download; transcribe_stream closes the stream early on a resume
+                if self.audio_cache and audio_stream.completed:
+                    self.audio_cache.put(video_id, audio_stream.wav_file)
+            else:
+                download_start = time.perf_counter()
+                with trace.stage("download"):
+                    audio_mp4 = self.downloader.download(youtube_url, video_temp_dir)
+                metrics.observe_download(os.path.getsize(audio_mp4), time.perf_counter() - download_start)
+
+                # Metadata was captured by the downloader, no extra yt-dlp call needed
+                metadata = self.downloader.get_metadata(video_id) or {}
+                duration = metadata.get("duration")
+                trace.audio_duration = duration
+                self.job_tracker.update_progress(job_id, completed_chunks=1, metadata=metadata)
+                self.extend_visibility(receipt_handle, duration, queue_url)
+                model_decision = self.select_model(duration, quality, video_id)
+
+                # Step 2: Convert to WAV
+                logger.info("Converting audio to WAV")
+                with trace.stage("convert"):
+                    audio_wav = self.downloader.convert_to_wav(audio_mp4, video_temp_dir)
+                self.job_tracker.update_progress(job_id, completed_chunks=2)
+
+                # Cache before transcribing so a failed transcription can be retried cheaply
+                if self.audio_cache:
+                    audio_wav = self.audio_cache.put(video_id, audio_wav) or audio_wav
+
+                # Step 3: Segment audio and transcribe
+                # Using the Transcriber's methods directly - it handles segmentation internally
+                logger.info("Transcribing audio")
+
+                # Check if we can resume transcription
+                with trace.stage("transcription"):
+                    transcription = self.transcribe_file(audio_wav, job_id, video_id, phrase, duration,
+                                                         trace, mode)
+
+            if mode == MODE_KEYWORDS:
+                # Keyword spotting already counted the phrase; there are no segments to scan
+                stats = transcription
+            else:
+                # Extract segments to text files for scanning
+                # We'll save each segment to a separate text file
+                segments_dir = os.path.join(video_temp_dir, "segments")
+                os.makedirs(segments_dir, exist_ok=True)
+
+                # Low-memory transcribers return a memory-mapped CompactTranscript
+                if isinstance(transcription, CompactTranscript):
+                    segment_texts = transcription.iter_segment_texts()
+                else:
+                    segment_texts = (segment.get("text", "") for segment in transcription.get("segments", []))
+
+                transcript_files = []
+                for i, text in enumerate(segment_texts):
+                    txt_file = os.path.join(segments_dir, f"segment_{i:03d}.txt")
+                    with open(txt_file, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    transcript_files.append(txt_file)
+
+                # Step 4: Scan transcripts for the phrase
+                logger.info(f"Scanning transcripts for phrase '{phrase}'")
+                with trace.stage("scan"):
+                    scanner = PhraseScanner(phrase)
+                    stats = scanner.scan_transcripts(transcript_files)
 
             # Add video metadata
             stats["video_id"] = video_id
@@ -428,25 +784,100 @@ class Worker:
             stats["job_id"] = job_id
             stats["phrase"] = phrase
             stats["processed_at"] = datetime.now().isoformat()
+            stats["metadata"] = metadata
+            stats["model"] = model_decision.to_dict()
+            stats["lane"] = lane.name if lane else None
+            if isinstance(transcription, dict) and "speculative" in transcription:
+                stats["speculative"] = transcription["speculative"]
+            stats["timing"] = trace.summary()
 
             # Save results to S3
-            self.save_results(stats, video_id)
+            with trace.stage("upload"):
+                self.save_results(stats, video_id, metadata)
+
+            # The job record and trace file also get the results upload itself
+            stats["timing"] = trace.summary()
+            trace.write("completed")
+            metrics.observe_job("completed", stats["timing"])
 
             # Clean up
-            logger.info(f"Completed processing video {video_id}")
+            logger.info(f"Completed processing video {video_id} "
+                        f"(wall {stats['timing']['total_wall']:.1f}s, "
+                        f"RTF {stats['timing']['real_time_factor']})")
 
             return stats
 
         except Exception as e:
             logger.error(f"Error processing video {video_id}: {str(e)}")
+            trace.write("failed")
+            metrics.observe_job("failed")
             raise
         finally:
+            metrics.JOBS_IN_PROGRESS.dec()
             # Clean up temp directory to save space
             try:
                 shutil.rmtree(video_temp_dir)
             except:
                 pass
 
+    def transcribe_file(self, audio_file, job_id, video_id, phrase, duration, trace, mode=MODE_FULL):
+        """
+        Transcribe a local audio file: fully (resumable), as a speculative
+        draft for the phrase, or only spot the phrase (returns scan results)
+        """
+        if mode == MODE_KEYWORDS:
+            return self.transcriber.spot_keywords(
+                audio_file,
+                job_id=job_id,
+                job_tracker=self.job_tracker,
+                video_id=video_id,
+                phrase=phrase,
+                trace=trace,
+                verify=self.kws_verify,
+                min_score=self.kws_min_score,
+                accept_score=self.kws_accept_score
+            )
+        if mode == MODE_SPECULATIVE:
+            return self.transcriber.transcribe_speculative(
+                audio_file,
+                job_id=job_id,
+                job_tracker=self.job_tracker,
+                video_id=video_id,
+                phrase=phrase,
+                duration=duration,
+                trace=trace,
+                draft_model=self.draft_model
+            )
+        return self.transcriber.resume_transcription(
+            audio_file=audio_file,
+            job_id=job_id,
+            job_tracker=self.job_tracker,
+            video_id=video_id,
+            duration=duration,
+            trace=trace
+        )
+
+    def select_model(self, duration, quality=None, video_id=None):
+        """
+        Pick the model and beam size for a job and switch the transcriber to it
+
+        A video with chunk checkpoints keeps the model that wrote them, so a
+        resumed job reuses them instead of starting over (not with
+        --concurrent_jobs above 1, where jobs share one model; the
+        transcriber then discards checkpoints of another model).
+        """
+        decision = self.model_policy.decide(duration=duration, queue_depth=self.queue_depth, quality=quality)
+        pin = video_id and self.concurrent_jobs == 1
+        recorded = self.transcriber.load_checkpoint_model_from_s3(video_id) if pin else None
+        if (recorded and (recorded.get("model"), recorded.get("beam_size")) != (decision.model, decision.beam_size)
+                and self.transcriber.get_completed_segments(video_id)):
+            decision.model, decision.beam_size = recorded["model"], recorded.get("beam_size")
+            decision.reasons.append("resuming checkpoints of an earlier attempt")
+        logger.info(f"Using model {decision.model} (beam {decision.beam_size})"
+                    f"{': ' + '; '.join(decision.reasons) if decision.reasons else ''}")
+        self.transcriber.use_model(decision.model, decision.beam_size)
+        return decision
+
     def upload_transcription(self, txt_file, video_id):
         """Upload a transcription file to S3"""
         segment_name = os.path.basename(txt_file)
@@ -465,7 +896,7 @@ class Worker:
             logger.error(f"Error uploading to S3: {str(e)}")
             return False
 
-    def save_results(self, results, video_id):
+    def save_results(self, results, video_id, metadata=None):
         """Save analysis results to S3"""
         # Create a unique results file with timestamp
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -473,18 +904,20 @@ class Worker:
 
         try:
             # Convert results to JSON
-            results_json = json.dumps(results, indent=2)
+            results_json = json.dumps(results)
 
             # Upload to S3
-            self.s3.put_object(
+            put_encoded_object(
+                self.s3,
                 Body=results_json,
                 Bucket=self.s3_bucket,
                 Key=s3_key,
-                ContentType="application/json"
+                ContentType="application/json",
+                encoding=self.s3_encoding
             )
 
             # Update the master video list
-            self.update_video_list(video_id)
+            self.update_video_list(video_id, metadata)
 
             logger.info(f"Results saved to s3://{self.s3_bucket}/{s3_key}")
             return True
@@ -493,7 +926,11 @@ class Worker:
             return False
 
     def get_video_title(self, video_id):
-        """Get the title of a YouTube video using yt-dlp"""
+        """Get the title of a YouTube video, from the metadata cache or yt-dlp"""
+        metadata = self.downloader.get_metadata(video_id)
+        if metadata and metadata.get("title"):
+            return metadata["title"]
+
         logger.info(f"Attempting to get title for video {video_id}")
         try:
             # Try to get video title using yt-dlp
@@ -509,7 +946,7 @@ class Worker:
             logger.error(f"Error getting video title: {str(e)}")
             return f"YouTube Video {video_id}"
 
-    def update_video_list(self, video_id):
+    def update_video_list(self, video_id, metadata=None):
         """Update the youtube_transcriber_2.json file with the new video ID and metadata"""
         logger.info(f"Updating youtube_transcriber_2.json with video {video_id}")
         video_list_key = "youtube_transcriber_2.json"
@@ -517,16 +954,17 @@ class Worker:
         try:
             # Try to get the existing video list
             try:
-                response = self.s3.get_object(Bucket=self.s3_bucket, Key=video_list_key)
-                video_list = json.loads(response['Body'].read().decode('utf-8'))
+                body = get_decoded_object(self.s3, Bucket=self.s3_bucket, Key=video_list_key)
+                video_list = json.loads(body.decode('utf-8'))
                 logger.info(f"Retrieved existing video list with {len(video_list['videos'])} videos")
             except self.s3.exceptions.NoSuchKey:
                 # If the file doesn't exist yet, create an empty structure
                 logger.info("No existing video list found, creating new one")
                 video_list = {"videos": []}
 
-            # Get video title from YouTube
-            video_title = self.get_video_title(video_id)
+            # Get video title from the job's metadata, falling back to YouTube
+            metadata = metadata or {}
+            video_title = metadata.get("title") or self.get_video_title(video_id)
 
             # Check if video ID is already in the list
             existing_video = next((item for item in video_list["videos"] if item["id"] == video_id), None)
@@ -537,7 +975,10 @@ class Worker:
                     "id": video_id,
                     "title": video_title,
                     "processed_at": datetime.now().isoformat(),
-                    "thumbnail": f"https://img.youtube.com/vi/{video_id}/mqdefault.jpg"
+                    "thumbnail": f"https://img.youtube.com/vi/{video_id}/mqdefault.jpg",
+                    "duration": metadata.get("duration"),
+                    "channel": metadata.get("channel"),
+                    "upload_date": metadata.get("upload_date")
                 }
 
                 video_list["videos"].append(new_video)
@@ -570,10 +1011,14 @@ class Worker:
             # Update heartbeat with inactive status
             heartbeat = {
                 "worker_id": self.worker_id,
+                "pod_id": self.pod_id,
                 "hostname": socket.gethostname(),
                 "last_heartbeat": datetime.now().isoformat(),
                 "status": "shutdown",
-                "jobs_processed": self.jobs_processed
+                "jobs_processed": self.jobs_processed,
+                # Kept so the autoscaler's throughput estimate still counts this worker
+                "audio_seconds_processed": round(self.audio_seconds_processed, 1),
+                "busy_seconds": round(self.get_busy_seconds(), 1)
             }
 
             self.s3.put_object(
@@ -607,7 +1052,7 @@ def parse_arguments():
         "--queue_url", "-q",
         type=str,
         required=True,
-        help="URL of the SQS queue to pull YouTube URLs from"
+        help="URL of the SQS queue to pull YouTube URLs from (the 'normal' lane)"
     )
     parser.add_argument(
         "--region", "-r",
@@ -638,6 +1083,219 @@ def parse_arguments():
         action="store_true",
         help="Use CPU instead of GPU for transcription."
     )
+    parser.add_argument(
+        "--download_backend",
+        type=str,
+        choices=[BACKEND_LIBRARY, BACKEND_SUBPROCESS],
+        default=BACKEND_LIBRARY,
+        help=f"Run yt-dlp in-process or as a subprocess per video. (Default: '{BACKEND_LIBRARY}')"
+    )
+    parser.add_argument(
+        "--range_connections",
+        type=int,
+        default=0,
+        help="Fetch audio as this many parallel byte ranges (0 disables). (Default: 0)"
+    )
+    parser.add_argument(
+        "--progressive",
+        action="store_true",
+        help="Start transcribing chunks while the audio is still downloading."
+    )
+    parser.add_argument(
+        "--audio_cache_dir",
+        type=str,
+        default=None,
+        help="Directory for the decoded audio cache. (Default: '<temp_dir>/.audio_cache')"
+    )
+    parser.add_argument(
+        "--audio_cache_gb",
+        type=float,
+        default=DEFAULT_AUDIO_CACHE_GB,
+        help=f"Maximum size of the audio cache in GB, 0 disables it. (Default: {DEFAULT_AUDIO_CACHE_GB})"
+    )
+    parser.add_argument(
+        "--s3_encoding",
+        type=str,
+        choices=[ENCODING_GZIP, ENCODING_ZSTD, ENCODING_NONE],
+        default=DEFAULT_ENCODING,
+        help=f"Content encoding for transcripts, results and job records in S3. (Default: '{DEFAULT_ENCODING}')"
+    )
+    parser.add_argument(
+        "--trace_file",
+        type=str,
+        default=None,
+        help="Append per-job stage timings to this JSON-lines file."
+    )
+    parser.add_argument(
+        "--metrics_port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics on this port at /metrics (0 disables). (Default: 0)"
+    )
+    parser.add_argument(
+        "--low_memory",
+        action="store_true",
+        help="Spill finished chunks to disk so memory use does not grow with video length."
+    )
+    parser.add_argument(
+        "--vad_prepass",
+        action="store_true",
+        help="Detect speech over the whole file first and only transcribe chunks that contain speech."
+    )
+    parser.add_argument(
+        "--vad_backend",
+        type=str,
+        choices=VAD_BACKENDS,
+        default=VAD_BACKEND_AUTO,
+        help=f"Speech detector for --vad_prepass. (Default: '{VAD_BACKEND_AUTO}')"
+    )
+    parser.add_argument(
+        "--cpu_compute_type",
+        type=str,
+        choices=(COMPUTE_AUTO,) + CPU_COMPUTE_TYPES,
+        default=COMPUTE_AUTO,
+        help=f"Compute type with --cpu; 'auto' benchmarks each on startup. (Default: '{COMPUTE_AUTO}')"
+    )
+    parser.add_argument(
+        "--cpu_concurrency",
+        type=int,
+        default=int(os.environ.get("CPU_CONCURRENCY", 1)),
+        help="Number of CPU worker processes sharing this host's cores. (Default: $CPU_CONCURRENCY or 1)"
+    )
+    parser.add_argument(
+        "--cpu_slot",
+        type=int,
+        default=int(os.environ.get("CPU_SLOT", 0)),
+        help="This worker's index among --cpu_concurrency workers. (Default: $CPU_SLOT or 0)"
+    )
+    parser.add_argument(
+        "--no_pin_threads",
+        action="store_true",
+        help="Do not pin the CPU worker to its share of the cores."
+    )
+    parser.add_argument(
+        "--cpu_benchmark_audio",
+        type=str,
+        default=None,
+        help="Short speech clip for the startup compute type benchmark. (Default: synthetic audio)"
+    )
+    parser.add_argument(
+        "--cpu_profile_file",
+        type=str,
+        default=None,
+        help="Append the chosen CPU profile and benchmark timings to this JSON-lines file."
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="small.en",
+        help="WhisperX model, or the default rung with --adaptive_model. (Default: 'small.en')"
+    )
+    parser.add_argument(
+        "--beam_size",
+        type=int,
+        default=5,
+        help="Decoding beam size for --model. (Default: 5)"
+    )
+    parser.add_argument(
+        "--adaptive_model",
+        action="store_true",
+        help="Choose model and beam size per job from video length, queue backlog and quality hints."
+    )
+    parser.add_argument(
+        "--model_ladder",
+        type=str,
+        default=DEFAULT_LADDER,
+        help=f"Comma-separated model:beam rungs, fastest first, for --adaptive_model. (Default: '{DEFAULT_LADDER}')"
+    )
+    parser.add_argument(
+        "--backlog_high",
+        type=int,
+        default=DEFAULT_BACKLOG_HIGH,
+        help=f"Queue depth at which --adaptive_model degrades to faster models. (Default: {DEFAULT_BACKLOG_HIGH})"
+    )
+    parser.add_argument(
+        "--backlog_low",
+        type=int,
+        default=DEFAULT_BACKLOG_LOW,
+        help=f"Queue depth at or below which --adaptive_model upgrades. (Default: {DEFAULT_BACKLOG_LOW})"
+    )
+    parser.add_argument(
+        "--loaded_models",
+        type=int,
+        default=2,
+        help="Whisper models kept in memory so --adaptive_model can switch back without reloading. (Default: 2)"
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Draft with a small model and only re-transcribe around phrase candidates and unreliable parts."
+    )
+    parser.add_argument(
+        "--draft_model",
+        type=str,
+        default=DEFAULT_DRAFT_MODEL,
+        help=f"Model for --speculative drafts. (Default: '{DEFAULT_DRAFT_MODEL}')"
+    )
+    parser.add_argument(
+        "--keyword_spotting",
+        action="store_true",
+        help="Count the phrase by keyword spotting on the alignment model instead of transcribing."
+    )
+    parser.add_argument(
+        "--kws_verify",
+        type=str,
+        choices=VERIFY_MODES,
+        default=VERIFY_UNCERTAIN,
+        help=f"Keyword spotting hits to verify with the Whisper model. (Default: '{VERIFY_UNCERTAIN}')"
+    )
+    parser.add_argument(
+        "--kws_min_score",
+        type=float,
+        default=DEFAULT_MIN_SCORE,
+        help=f"Minimum keyword spotting score for a hit. (Default: {DEFAULT_MIN_SCORE})"
+    )
+    parser.add_argument(
+        "--kws_accept_score",
+        type=float,
+        default=DEFAULT_ACCEPT_SCORE,
+        help=f"Keyword spotting score from which hits are trusted without verification. "
+             f"(Default: {DEFAULT_ACCEPT_SCORE})"
+    )
+    parser.add_argument(
+        "--concurrent_jobs",
+        type=int,
+        default=int(os.environ.get("CONCURRENT_JOBS", 1)),
+        help="Jobs processed in parallel, sharing Whisper inference batches. (Default: $CONCURRENT_JOBS or 1)"
+    )
+    parser.add_argument(
+        "--inference_batch_size",
+        type=int,
+        default=DEFAULT_INFERENCE_BATCH_SIZE,
+        help=f"Speech segments per Whisper batch. (Default: {DEFAULT_INFERENCE_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--batch_wait",
+        type=float,
+        default=DEFAULT_MAX_WAIT_SECONDS,
+        help=f"Seconds a segment waits for a shared batch to fill with --concurrent_jobs. "
+             f"(Default: {DEFAULT_MAX_WAIT_SECONDS})"
+    )
+    parser.add_argument(
+        "--lane",
+        action="append",
+        default=[],
+        help="Extra priority lane as 'name,weight,queue_url' (repeatable), e.g. 'high,8,<url>' and "
+             "'long,1,<url>'; a lane named 'normal' replaces --queue_url's. Lanes share the worker's audio "
+             "seconds by weight."
+    )
+    parser.add_argument(
+        "--starvation_seconds",
+        type=float,
+        default=DEFAULT_STARVATION_SECONDS,
+        help=f"Longest a lane with messages is passed over for other lanes. "
+             f"(Default: {DEFAULT_STARVATION_SECONDS})"
+    )
     return parser.parse_args()
 
 
@@ -654,7 +1312,42 @@ def main():
         s3_bucket=args.s3_bucket,
         batch_size=args.batch_size,
         poll_interval=args.poll_interval,
-        use_gpu=not args.cpu
+        use_gpu=not args.cpu,
+        download_backend=args.download_backend,
+        range_connections=args.range_connections,
+        progressive=args.progressive,
+        audio_cache_dir=args.audio_cache_dir,
+        audio_cache_gb=args.audio_cache_gb,
+        s3_encoding=args.s3_encoding,
+        trace_file=args.trace_file,
+        metrics_port=args.metrics_port,
+        low_memory=args.low_memory,
+        vad_prepass=args.vad_prepass,
+        vad_backend=args.vad_backend,
+        cpu_compute_type=args.cpu_compute_type,
+        cpu_concurrency=args.cpu_concurrency,
+        cpu_slot=args.cpu_slot,
+        pin_threads=not args.no_pin_threads,
+        cpu_benchmark_audio=args.cpu_benchmark_audio,
+        cpu_profile_file=args.cpu_profile_file,
+        model_name=args.model,
+        beam_size=args.beam_size,
+        adaptive_model=args.adaptive_model,
+        model_ladder=args.model_ladder,
+        backlog_high=args.backlog_high,
+        backlog_low=args.backlog_low,
+        loaded_models=args.loaded_models,
+        speculative=args.speculative,
+        draft_model=args.draft_model,
+        keyword_spotting=args.keyword_spotting,
+        kws_verify=args.kws_verify,
+        kws_min_score=args.kws_min_score,
+        kws_accept_score=args.kws_accept_score,
+        concurrent_jobs=args.concurrent_jobs,
+        inference_batch_size=args.inference_batch_size,
+        batch_wait=args.batch_wait,
+        lanes=args.lane,
+        starvation_seconds=args.starvation_seconds
     )
 
     # Start worker